@@ -0,0 +1,95 @@
+"""Startup time of `import datalabs`.
+
+Each measure imports datalabs in a fresh interpreter, the median of the
+measures is reported along with the heavy optional dependencies (spacy,
+nltk, ...) that got imported, which should be none of them:
+
+    python benchmarks/benchmark_import.py --max-seconds 2
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RESULTS_BASEPATH, RESULTS_FILENAME = os.path.split(__file__)
+RESULTS_FILE_PATH = os.path.join(
+    RESULTS_BASEPATH, "results", RESULTS_FILENAME.replace(".py", ".json")
+)
+
+# dependencies only needed by some operations, see `datalabs/operations`
+HEAVY_MODULES = (
+    "pymongo",
+    "spacy",
+    "nltk",
+    "lexicalrichness",
+    "sklearn",
+    "sacrebleu",
+    "compare_mt",
+    "jieba",
+)
+
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import datalabs
+duration = time.perf_counter() - start
+print(json.dumps({"duration": duration, "modules": sorted(sys.modules)}))
+"""
+
+
+def measure_import():
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def benchmark_import(n_runs: int = 5):
+    measures = [measure_import() for _ in range(n_runs)]
+    modules = set(measures[0]["modules"])
+    return {
+        "import datalabs": statistics.median(
+            measure["duration"] for measure in measures
+        ),
+        "heavy_modules": [
+            module
+            for module in HEAVY_MODULES
+            if any(name.split(".")[0] == module for name in modules)
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n-runs", type=int, default=5)
+    parser.add_argument(
+        "--max-seconds",
+        type=float,
+        default=None,
+        help="fail if the median import time is above this limit",
+    )
+    args = parser.parse_args()
+
+    results = benchmark_import(args.n_runs)
+    os.makedirs(os.path.dirname(RESULTS_FILE_PATH), exist_ok=True)
+    with open(RESULTS_FILE_PATH, "wb") as f:
+        f.write(json.dumps(results).encode("utf-8"))
+    print(json.dumps(results, indent=2))
+
+    if results["heavy_modules"]:
+        sys.exit(f"import datalabs imported {results['heavy_modules']}")
+    if args.max_seconds is not None and results["import datalabs"] > args.max_seconds:
+        sys.exit(
+            f"import datalabs took {results['import datalabs']:.2f}s, "
+            f"more than {args.max_seconds}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,491 @@
+"""Throughput of the operations applied to synthetic datasets.
+
+Synthetic datasets of each task (text classification, text matching,
+summarization, sequence labeling and knowledge graphs) are generated once
+per size, in batches and straight to arrow files, so sizes up to 10M rows
+don't have to fit in memory. Every featurizing, editing, preprocessing,
+aggregating and prompting operation that can be imported is then applied to
+the datasets having its processed fields, in each `apply` mode, with each
+number of processes, and row by row or batched (the batch implementations
+and the token cache of the operations having them). Each measure runs in a
+fresh interpreter, which reports the wall time, the rows per second, the
+increase of its peak RSS during the application (the imports and the
+loading of the dataset excluded) and the peak RSS of the worker processes:
+
+    python benchmarks/benchmark_operations.py --sizes 1000 100000 \\
+        --modes realtime memory --num-proc 1 4 --batched 0 1 \\
+        --baseline baseline.json
+
+The results are written to `benchmarks/results/benchmark_operations.json`.
+With `--baseline`, the rows per second are compared to the ones of a previous
+run, and the script fails if any measure is slower by more than
+`--tolerance`. `--save-baseline` writes the results as a new baseline.
+"""
+
+import argparse
+import importlib
+import itertools
+import json
+import os
+import pkgutil
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+RESULTS_BASEPATH, RESULTS_FILENAME = os.path.split(__file__)
+RESULTS_FILE_PATH = os.path.join(
+    RESULTS_BASEPATH, "results", RESULTS_FILENAME.replace(".py", ".json")
+)
+
+# e.g. the sizes of a nightly run, the default is the first one
+SIZES = (1000, 10000, 100000, 1000000, 10000000)
+MODES = ("realtime", "memory", "local")
+# the package and the type (`OperationFunction._type`) of each kind of
+# operation, e.g. "TopicClassificationPrompting" is a prompting operation
+OPERATION_PACKAGES = {
+    "featurizing": ("datalabs.operations.featurize", "Featurizing"),
+    "editing": ("datalabs.operations.edit", "Editing"),
+    "preprocessing": ("datalabs.operations.preprocess", "Preprocessing"),
+    "aggregating": ("datalabs.operations.aggregate", "Aggregating"),
+    "prompting": ("datalabs.operations.prompt", "Prompting"),
+}
+# subpackages of data files and models, not operations
+SKIPPED_SUBMODULES = ("plugins", "pre_models", "resources", "utils")
+
+LABELS = ("World", "Sports", "Business", "Science")
+PAIR_LABELS = ("contradiction", "entailment", "neutral")
+# the tags of `aggregate.sequence_labeling.tag_id2text`
+N_TAGS = 13
+VOCABULARY_SIZE = 20000
+GENERATION_BATCH_SIZE = 100000
+
+# the columns of the synthetic dataset of each task and the tasks of the
+# operations applied to it
+TASKS = {
+    "text-classification": {
+        "columns": ("text", "label"),
+        "operation_tasks": (
+            "text-classification",
+            "topic-classification",
+            "sentiment-classification",
+        ),
+    },
+    "text-matching": {
+        "columns": ("text1", "text2", "label"),
+        "operation_tasks": ("text-matching", "natural-language-inference"),
+    },
+    "summarization": {
+        "columns": ("text", "summary"),
+        "operation_tasks": ("summarization",),
+    },
+    "sequence-labeling": {
+        "columns": ("tokens", "tags"),
+        "operation_tasks": ("sequence-labeling", "named-entity-recognition"),
+    },
+    "kg-link-prediction": {
+        "columns": ("head", "link", "tail"),
+        "operation_tasks": ("kg-link-prediction",),
+    },
+}
+
+
+# Synthetic datasets
+
+
+def _words(rng: np.random.Generator) -> pa.Array:
+    """a vocabulary of random lowercase words"""
+    lengths = rng.integers(2, 10, size=VOCABULARY_SIZE)
+    letters = rng.integers(ord("a"), ord("z") + 1, size=int(lengths.sum()))
+    text = letters.astype(np.uint8).tobytes().decode("ascii")
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    return pa.array([text[start:end] for start, end in zip(offsets, offsets[1:])])
+
+
+def _token_lists(
+    rng: np.random.Generator, words: pa.Array, n_rows: int, low: int, high: int
+) -> pa.ListArray:
+    """lists of `low` to `high` words drawn with a Zipf-like distribution"""
+    lengths = rng.integers(low, high, size=n_rows)
+    indices = (rng.zipf(1.3, size=int(lengths.sum())) - 1) % len(words)
+    offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int32)
+    return pa.ListArray.from_arrays(pa.array(offsets), words.take(pa.array(indices)))
+
+
+def _texts(rng, words, n_rows, low, high) -> pa.Array:
+    return pc.binary_join(_token_lists(rng, words, n_rows, low, high), " ")
+
+
+def generate_batch(
+    task: str, rng: np.random.Generator, words: pa.Array, n_rows: int
+) -> Dict[str, pa.Array]:
+    """the columns of `n_rows` random samples of a task"""
+    if task == "text-classification":
+        return {
+            "text": _texts(rng, words, n_rows, 5, 60),
+            "label": pa.array(rng.integers(0, len(LABELS), size=n_rows)),
+        }
+    if task == "text-matching":
+        return {
+            "text1": _texts(rng, words, n_rows, 5, 40),
+            "text2": _texts(rng, words, n_rows, 3, 20),
+            "label": pa.array(rng.integers(0, len(PAIR_LABELS), size=n_rows)),
+        }
+    if task == "summarization":
+        return {
+            "text": _texts(rng, words, n_rows, 100, 400),
+            "summary": _texts(rng, words, n_rows, 10, 40),
+        }
+    if task == "sequence-labeling":
+        tokens = _token_lists(rng, words, n_rows, 5, 40)
+        tags = rng.integers(0, N_TAGS, size=len(tokens.values))
+        return {
+            "tokens": tokens,
+            "tags": pa.ListArray.from_arrays(tokens.offsets, pa.array(tags)),
+        }
+    if task == "kg-link-prediction":
+        entities = words.slice(0, VOCABULARY_SIZE // 2)
+        links = words.slice(VOCABULARY_SIZE // 2, 50)
+        return {
+            "head": entities.take(pa.array(rng.integers(0, len(entities), n_rows))),
+            "link": links.take(pa.array(rng.integers(0, len(links), n_rows))),
+            "tail": entities.take(pa.array(rng.integers(0, len(entities), n_rows))),
+        }
+    raise ValueError(f"unknown task {task}")
+
+
+def get_info(task: str):
+    """the features, task template and language of a synthetic dataset"""
+    from datalabs import DatasetInfo
+    from datalabs.features import ClassLabel, Features, Sequence, Value
+    from datalabs.tasks.kg_prediction import KGPrediction
+    from datalabs.tasks.sequence_labeling import SequenceLabeling
+    from datalabs.tasks.summarization import Summarization
+    from datalabs.tasks.text_classification import TextClassification
+    from datalabs.tasks.text_pair_classification import TextPairClassification
+
+    if task == "text-classification":
+        features = Features(
+            {"text": Value("string"), "label": ClassLabel(names=LABELS)}
+        )
+        template = TextClassification(labels=LABELS)
+    elif task == "text-matching":
+        features = Features(
+            {
+                "text1": Value("string"),
+                "text2": Value("string"),
+                "label": ClassLabel(names=PAIR_LABELS),
+            }
+        )
+        template = TextPairClassification(labels=PAIR_LABELS)
+    elif task == "summarization":
+        features = Features({"text": Value("string"), "summary": Value("string")})
+        template = Summarization()
+    elif task == "sequence-labeling":
+        features = Features(
+            {
+                "tokens": Sequence(Value("string")),
+                "tags": Sequence(ClassLabel(num_classes=N_TAGS)),
+            }
+        )
+        template = SequenceLabeling()
+    else:
+        features = Features(
+            {"head": Value("string"), "link": Value("string"), "tail": Value("string")}
+        )
+        template = KGPrediction()
+    return DatasetInfo(features=features, task_templates=[template], languages=["en"])
+
+
+def generate_dataset(task: str, n_rows: int, data_dir: str, seed: int = 0) -> str:
+    """write a synthetic dataset to an arrow file (once) and return its path"""
+    from datalabs.arrow_writer import ArrowWriter
+
+    path = os.path.join(data_dir, f"{task}-{n_rows}.arrow")
+    if os.path.exists(path):
+        return path
+    rng = np.random.default_rng(seed)
+    words = _words(rng)
+    features = get_info(task).features
+    with ArrowWriter(features=features, path=path + ".incomplete") as writer:
+        for offset in range(0, n_rows, GENERATION_BATCH_SIZE):
+            n_batch_rows = min(GENERATION_BATCH_SIZE, n_rows - offset)
+            batch = generate_batch(task, rng, words, n_batch_rows)
+            writer.write_table(pa.table(batch).cast(pa.schema(features.type)))
+        writer.finalize()
+    os.replace(path + ".incomplete", path)
+    return path
+
+
+# Operations
+
+
+def iter_operations(kinds) -> Iterator[Tuple[str, str, str, object]]:
+    """the (kind, module, name, operation) of the operations that can be
+    imported, the modules that can't be imported are reported"""
+    operations_dir = os.path.dirname(
+        importlib.import_module("datalabs.operations").__file__
+    )
+    seen = set()
+    for kind in kinds:
+        package_name, operation_type = OPERATION_PACKAGES[kind]
+        module_names = [package_name] + [
+            f"{package_name}.{module_info.name}"
+            for module_info in pkgutil.iter_modules(
+                [os.path.join(operations_dir, package_name.split(".")[-1])]
+            )
+            if module_info.name not in SKIPPED_SUBMODULES
+        ]
+        for module_name in module_names:
+            try:
+                module = importlib.import_module(module_name)
+            except Exception as error:
+                print(f"skipping {module_name}: {error!r}", file=sys.stderr)
+                continue
+            for name, value in vars(module).items():
+                if (
+                    id(value) not in seen
+                    and operation_type in str(getattr(value, "_type", ""))
+                    and hasattr(value, "processed_fields")
+                ):
+                    seen.add(id(value))
+                    yield kind, module_name, name, value
+
+
+def applies_to(operation, task: str) -> bool:
+    """whether an operation can be applied to the synthetic dataset of a task"""
+    spec = TASKS[task]
+    if not set(operation.processed_fields or ()) <= set(spec["columns"]):
+        return False
+    operation_tasks = [
+        operation_task.strip() for operation_task in str(operation.task).split(",")
+    ]
+    return "Any" in operation_tasks or any(
+        operation_task in spec["operation_tasks"] for operation_task in operation_tasks
+    )
+
+
+# Measures
+
+
+def _peak_rss_mb(who=resource.RUSAGE_SELF) -> float:
+    # ru_maxrss is in KB on linux, the workers of a pool are children
+    return resource.getrusage(who).ru_maxrss / 1024
+
+
+def run_measure(spec: Dict) -> Dict:
+    """apply an operation to a synthetic dataset, in this process"""
+    from datalabs import Dataset
+    from datalabs.utils.apply_cache import apply_cache
+
+    module = importlib.import_module(spec["module"])
+    operation = getattr(module, spec["name"])
+    dataset = Dataset.from_file(spec["path"], info=get_info(spec["task"]))
+    rss_before_mb = _peak_rss_mb()
+
+    # caching stays enabled for the token cache, but the results are not
+    # loaded from the apply cache, and are written to a temporary one
+    with tempfile.TemporaryDirectory() as cache_dir:
+        apply_cache.cache_dir = cache_dir
+        start = time.perf_counter()
+        result = dataset.apply(
+            operation,
+            mode=spec["mode"],
+            num_proc=spec["num_proc"],
+            batched=spec.get("batched", False),
+            load_from_cache_file=False,
+        )
+        if spec["mode"] == "realtime" and not isinstance(result, Dataset):
+            for _ in result:
+                pass
+        wall_time = time.perf_counter() - start
+    peak_rss_mb = _peak_rss_mb()
+    return {
+        "wall_time": wall_time,
+        "rows_per_sec": dataset.num_rows / wall_time if wall_time > 0 else None,
+        "peak_rss_mb": peak_rss_mb,
+        "rss_before_mb": rss_before_mb,
+        "rss_increase_mb": peak_rss_mb - rss_before_mb,
+        "workers_peak_rss_mb": _peak_rss_mb(resource.RUSAGE_CHILDREN),
+    }
+
+
+def measure(spec: Dict, timeout: Optional[float]) -> Dict:
+    """run a measure in a fresh interpreter"""
+    try:
+        process = subprocess.run(
+            [sys.executable, __file__, "--run", json.dumps(spec)],
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
+    except subprocess.TimeoutExpired:
+        return {"error": f"timeout after {timeout}s"}
+    if process.returncode != 0:
+        # the last line of the traceback, not the logs printed after it
+        lines = [
+            line
+            for line in process.stderr.strip().splitlines()
+            if "Error" in line or "Exception" in line
+        ]
+        return {"error": lines[-1] if lines else f"exit code {process.returncode}"}
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def result_key(result: Dict) -> str:
+    # the measures of the baselines without the batched axis are row by row
+    return "/".join(
+        [
+            str(result[name])
+            for name in ("task", "size", "kind", "operation", "mode", "num_proc")
+        ]
+        + [str(result.get("batched", False))]
+    )
+
+
+def compare(results: List[Dict], baseline: List[Dict], tolerance: float) -> List[str]:
+    """the measures slower than their baseline by more than `tolerance`"""
+    baseline_speeds = {
+        result_key(result): result.get("rows_per_sec") for result in baseline
+    }
+    regressions = []
+    for result in results:
+        key = result_key(result)
+        speed, baseline_speed = result.get("rows_per_sec"), baseline_speeds.get(key)
+        if baseline_speed is None:
+            continue
+        if speed is None:
+            regressions.append(f"{key}: {result.get('error')}")
+        elif speed < (1 - tolerance) * baseline_speed:
+            regressions.append(
+                f"{key}: {speed:.1f} rows/s, {baseline_speed:.1f} in the baseline"
+            )
+    return regressions
+
+
+def benchmark_operations(args) -> List[Dict]:
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix="datalabs-benchmark-")
+    os.makedirs(data_dir, exist_ok=True)
+    operations = [
+        (kind, module_name, name, operation)
+        for kind, module_name, name, operation in iter_operations(args.kinds)
+        if not args.operations or name in args.operations
+    ]
+
+    results = []
+    for task in args.tasks:
+        for size in args.sizes:
+            path = None
+            for kind, module_name, name, operation in operations:
+                if not applies_to(operation, task):
+                    continue
+                path = path or generate_dataset(task, size, data_dir)
+                # aggregating operations are applied to whole datasets
+                batched_values = (
+                    [False]
+                    if kind == "aggregating"
+                    else sorted({bool(batched) for batched in args.batched})
+                )
+                for mode, num_proc, batched in itertools.product(
+                    args.modes, args.num_proc, batched_values
+                ):
+                    spec = {
+                        "task": task,
+                        "path": path,
+                        "module": module_name,
+                        "name": name,
+                        "mode": mode,
+                        "num_proc": num_proc,
+                        "batched": batched,
+                    }
+                    result = {
+                        "task": task,
+                        "size": size,
+                        "kind": kind,
+                        "operation": name,
+                        "module": module_name,
+                        "mode": mode,
+                        "num_proc": num_proc,
+                        "batched": batched,
+                        **measure(spec, args.timeout),
+                    }
+                    print(json.dumps(result), flush=True)
+                    results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", nargs="+", default=list(TASKS), choices=list(TASKS))
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=int,
+        default=[SIZES[0]],
+        help=f"numbers of rows of the datasets, e.g. {' '.join(map(str, SIZES))}",
+    )
+    parser.add_argument(
+        "--kinds",
+        nargs="+",
+        default=list(OPERATION_PACKAGES),
+        choices=list(OPERATION_PACKAGES),
+    )
+    parser.add_argument(
+        "--operations", nargs="+", default=None, help="names of the operations"
+    )
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES)
+    parser.add_argument("--num-proc", nargs="+", type=int, default=[1])
+    parser.add_argument(
+        "--batched",
+        nargs="+",
+        type=int,
+        default=[0],
+        choices=[0, 1],
+        help="apply the operations row by row (0) and/or batched (1)",
+    )
+    parser.add_argument(
+        "--data-dir", default=None, help="where the synthetic datasets are kept"
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=3600, help="timeout of each measure"
+    )
+    parser.add_argument("--baseline", default=None, help="results to compare with")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="relative slowdown above which a measure is a regression",
+    )
+    parser.add_argument(
+        "--save-baseline", default=None, help="write the results as a baseline"
+    )
+    parser.add_argument("--run", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run is not None:
+        print(json.dumps(run_measure(json.loads(args.run))))
+        return
+
+    results = benchmark_operations(args)
+    os.makedirs(os.path.dirname(RESULTS_FILE_PATH), exist_ok=True)
+    with open(RESULTS_FILE_PATH, "wb") as f:
+        f.write(json.dumps(results).encode("utf-8"))
+    if args.save_baseline is not None:
+        with open(args.save_baseline, "wb") as f:
+            f.write(json.dumps(results).encode("utf-8"))
+
+    if args.baseline is not None:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            sys.exit("regressions:\n" + "\n".join(regressions))
+
+
+if __name__ == "__main__":
+    main()
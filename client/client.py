@@ -1,7 +1,8 @@
 import json
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 import requests
+from uploader import DatasetUploader
 from utils_datalab import (
     generate_db_metadata_from_sdk,
     get_info,
@@ -29,8 +30,13 @@ class Client:
         feature_func=None,
         data_typology="textdataset",
         end_point_add_dataset="https://datalab.nlpedia.ai/api/upload_new_dataset",
+        end_point_upload_chunks=None,
     ):
         self._end_point_add_dataset = end_point_add_dataset
+        # the endpoint of the chunked uploads (see `uploader.py`), if the
+        # server has one, otherwise the whole dataset is POSTed at once to
+        # `end_point_add_dataset`
+        self._end_point_upload_chunks = end_point_upload_chunks
 
         self.user_name = user_name
         self.password = password
@@ -92,11 +98,23 @@ class Client:
             raise ConnectionError("[Error on metric:")
         print(response.status_code)
 
-    def add_dataset_from_sdk(self):
+    def add_dataset_from_sdk(
+        self,
+        chunk_size: int = 1000,
+        num_workers: int = 4,
+        checkpoint_path: Optional[str] = None,
+    ):
         """
         This method of introducing new datasets assumes that we have finished
         the dataloader of the dataset to be added
         in the folder: https://github.com/ExpressAI/DataLab/tree/main/datasets
+
+        If the server has an endpoint of chunked uploads
+        (`end_point_upload_chunks`), the samples are streamed to it by chunks
+        of `chunk_size` samples, `num_workers` chunks at a time (see
+        `uploader.py`), and an interrupted upload is resumed from
+        `checkpoint_path` if given. Otherwise, the metadata and the samples are
+        POSTed in one request to `end_point_add_dataset`.
         """
 
         # get metadata and dataset information from sdk by passing
@@ -119,12 +137,38 @@ class Client:
             data_typology=self.data_typology,
         )
 
-        # reformat the sample information for db
         MAX_NUMBER_OF_SAMPLES = 100000
+        if self._end_point_upload_chunks is None:
+            self._add_dataset(metadata_db, dataset_sdk, MAX_NUMBER_OF_SAMPLES)
+            return
+
+        # the samples are read from the arrow tables of the splits, chunk by
+        # chunk, as {"split_name", "features"} lines
+        uploader = DatasetUploader(
+            self._end_point_upload_chunks,
+            credentials={
+                "user_name": self.user_name,
+                "password": self.password,
+                "role": self.role,
+                "status": self.status,
+            },
+            chunk_size=chunk_size,
+            num_workers=num_workers,
+            checkpoint_path=checkpoint_path,
+        )
+        upload_id = uploader.upload(
+            metadata_db, dataset_sdk, max_samples=MAX_NUMBER_OF_SAMPLES
+        )
+        print(f"uploaded {self.dataset_name_db} ({upload_id})")
+
+    def _add_dataset(self, metadata_db, dataset_sdk, max_samples):
+        """POST the metadata and the samples of a dataset in one request"""
+
+        # reformat the sample information for db
         samples_db = []
         for split in dataset_sdk.keys():
             for idx, sample in enumerate(dataset_sdk[split]):
-                if idx > MAX_NUMBER_OF_SAMPLES:
+                if idx > max_samples:
                     break
                 samples_db.append({"split_name": split, "features": sample})
 
@@ -0,0 +1,242 @@
+"""Streaming upload of the samples of a dataset to the DataLab server.
+
+The samples are read from the arrow tables of the splits (memory-mapped from
+the cache for datasets loaded with `load_dataset`), `chunk_size` rows at a
+time (only the indices of these rows being taken for a dataset with an
+indices mapping), so the memory used doesn't depend on the size of the
+dataset. Each chunk is POSTed as gzip'd NDJSON: a header line, then one
+`{"split_name", "features"}` line per sample. The header identifies the
+upload and the chunk:
+
+    {"upload_id": "...", "chunk": 3, "n_chunks": 42, "user_name": "...", ...}
+
+The server serves this protocol on its own endpoint (`end_point_upload_chunks`
+of `Client`), the endpoint receiving a whole dataset in one JSON request
+doesn't accept it.
+The first chunk also carries the metadata of the dataset, and is sent before
+the other ones, which are sent concurrently over a pool of connections.
+Failed requests are retried with an exponential backoff, and the chunks
+acknowledged by the server are recorded in a checkpoint file, so an
+interrupted upload can be resumed by running it again:
+
+    uploader = DatasetUploader(end_point, credentials, checkpoint_path="upload.json")
+    uploader.upload(metadata, dataset_dict)
+"""
+
+from concurrent.futures import as_completed, ThreadPoolExecutor
+import gzip
+import json
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional
+import uuid
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from datalabs.operations.aggregate.arrow_compute import get_rows
+from datalabs.utils.checkpoint import Checkpoint
+
+# the status codes of the requests that are retried
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class Chunk(NamedTuple):
+    index: int
+    split_name: str
+    offset: int
+    length: int
+
+
+def serialize_chunk(header: Dict[str, Any], split_name: str, rows: List[Dict]) -> bytes:
+    """the gzip'd NDJSON body of a chunk"""
+    lines = [json.dumps(header, separators=(",", ":"), ensure_ascii=False)]
+    lines.extend(
+        json.dumps(
+            {"split_name": split_name, "features": row},
+            separators=(",", ":"),
+            ensure_ascii=False,
+            default=str,
+        )
+        for row in rows
+    )
+    return gzip.compress(("\n".join(lines) + "\n").encode("utf8"), compresslevel=6)
+
+
+def upload_key(
+    metadata: Dict, dataset_dict: Mapping[str, Any], chunks: List[Chunk]
+) -> Dict[str, Any]:
+    """the key of the checkpoint of an upload: the dataset (its name and the
+    fingerprints of its splits) and its chunks"""
+    return {
+        "dataset_name": metadata.get("dataset_name"),
+        "sub_dataset": metadata.get("sub_dataset"),
+        "fingerprints": {
+            split_name: getattr(dataset, "_fingerprint", None)
+            for split_name, dataset in dataset_dict.items()
+        },
+        "plan": [[chunk.split_name, chunk.offset, chunk.length] for chunk in chunks],
+    }
+
+
+class DatasetUploader:
+    """
+    Parameters
+    end_point: the url the chunks are POSTed to
+    credentials: e.g. the user name, password, role and status, added to the
+    header of each chunk
+    chunk_size: number of samples per chunk
+    num_workers: number of chunks sent concurrently
+    max_retries: number of retries of a failed request
+    backoff_factor: the n-th retry waits `backoff_factor * 2 ** (n - 1)`
+    seconds
+    checkpoint_path: the file the progress of the upload is saved to
+    timeout: timeout of each request, in seconds
+    """
+
+    def __init__(
+        self,
+        end_point: str,
+        credentials: Optional[Mapping[str, Any]] = None,
+        chunk_size: int = 1000,
+        num_workers: int = 4,
+        max_retries: int = 5,
+        backoff_factor: float = 0.5,
+        checkpoint_path: Optional[str] = None,
+        timeout: float = 60,
+    ):
+        self.end_point = end_point
+        self.credentials = dict(credentials or {})
+        self.chunk_size = chunk_size
+        self.num_workers = num_workers
+        self.checkpoint_path = checkpoint_path
+        self.timeout = timeout
+
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES,
+            # the server keeps one copy of each chunk of an upload, so
+            # sending a chunk again is safe
+            allowed_methods=None,
+            raise_on_status=False,
+        )
+        self.session = requests.Session()
+        self.session.mount(
+            "http://", HTTPAdapter(pool_maxsize=num_workers, max_retries=retry)
+        )
+        self.session.mount(
+            "https://", HTTPAdapter(pool_maxsize=num_workers, max_retries=retry)
+        )
+
+    def chunks(
+        self, dataset_dict: Mapping[str, Any], max_samples: Optional[int] = None
+    ) -> List[Chunk]:
+        """the chunks of the splits, at most `max_samples` samples per split"""
+        chunks = []
+        for split_name, dataset in dataset_dict.items():
+            num_rows = dataset.num_rows
+            if max_samples is not None:
+                num_rows = min(num_rows, max_samples)
+            for offset in range(0, num_rows, self.chunk_size):
+                chunks.append(
+                    Chunk(
+                        len(chunks),
+                        split_name,
+                        offset,
+                        min(self.chunk_size, num_rows - offset),
+                    )
+                )
+        return chunks
+
+    def _send(
+        self,
+        dataset,
+        chunk: Chunk,
+        upload_id: str,
+        n_chunks: int,
+        metadata: Optional[Dict] = None,
+    ):
+        header = {
+            "upload_id": upload_id,
+            "chunk": chunk.index,
+            "n_chunks": n_chunks,
+            **self.credentials,
+        }
+        if metadata is not None:
+            header["metadata"] = metadata
+        rows = get_rows(dataset, chunk.offset, chunk.length).to_pylist()
+        response = self.session.post(
+            self.end_point,
+            data=serialize_chunk(header, chunk.split_name, rows),
+            headers={
+                "Content-Type": "application/x-ndjson",
+                "Content-Encoding": "gzip",
+            },
+            timeout=self.timeout,
+        )
+        if response.status_code != 200:
+            raise ConnectionError(
+                f"chunk {chunk.index} of upload {upload_id} failed: "
+                f"{response.status_code} {response.text}"
+            )
+
+    def upload(
+        self,
+        metadata: Dict,
+        dataset_dict: Mapping[str, Any],
+        max_samples: Optional[int] = None,
+    ) -> str:
+        """
+        upload the samples of the splits of a dataset, and return the id of
+        the upload
+        Parameters:
+          - metadata: the metadata of the dataset, sent with the first chunk
+          - dataset_dict: the splits, `Dataset`s or arrow tables
+          - max_samples: maximum number of samples per split
+        """
+        chunks = self.chunks(dataset_dict, max_samples=max_samples)
+        checkpoint = Checkpoint(self.checkpoint_path).load(
+            upload_key(metadata, dataset_dict, chunks)
+        )
+        # a new upload, unless the same dataset is being uploaded again
+        upload_id = checkpoint.data.setdefault("upload_id", uuid.uuid4().hex)
+        todo = [chunk for chunk in chunks if chunk.index not in checkpoint.done]
+        n_chunks = len(chunks)
+
+        # the first chunk opens the upload with the metadata
+        if chunks and chunks[0] in todo:
+            first = todo.pop(0)
+            self._send(
+                dataset_dict[first.split_name],
+                first,
+                upload_id,
+                n_chunks,
+                metadata=metadata,
+            )
+            checkpoint.mark_done(first.index)
+
+        with ThreadPoolExecutor(max_workers=self.num_workers) as executor:
+            futures = {
+                executor.submit(
+                    self._send,
+                    dataset_dict[chunk.split_name],
+                    chunk,
+                    upload_id,
+                    n_chunks,
+                ): chunk
+                for chunk in todo
+            }
+            # the chunks sent are recorded even if others fail
+            errors = []
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as error:
+                    errors.append(error)
+                else:
+                    checkpoint.mark_done(futures[future].index)
+        if errors:
+            raise errors[0]
+
+        checkpoint.remove()
+        return upload_id
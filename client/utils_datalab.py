@@ -6,6 +6,7 @@ from datalabs import load_dataset
 from datalabs.operations.aggregate.text_classification import (
     get_features_dataset_level as get_features_dataset_level_text_classification,
 )
+from datalabs.operations.pipeline import Pipeline
 from datalabs.operations.preprocess.general import tokenize
 from datalabs.utils.more_features import get_features_dataset, prefix_dict_key
 
@@ -142,13 +143,13 @@ def get_info(
         # if split_name == 'train':
         #     continue
 
-        # get sample-level advanced features
-        dataset[split_name] = dataset[split_name].apply(
-            tokenize, num_proc=multiprocessing.cpu_count(), mode="memory"
+        # get sample-level advanced features and dataset-level features
+        # with one pass over the split
+        pipeline = Pipeline([tokenize, feature_func]).add(
+            get_features_dataset_level_text_classification, prefix="avg"
         )
-
         dataset[split_name] = dataset[split_name].apply(
-            feature_func, num_proc=multiprocessing.cpu_count(), mode="memory"
+            pipeline, num_proc=multiprocessing.cpu_count(), mode="memory"
         )
         all_features = asdict(dataset[split_name]._info)["features"]
 
@@ -173,11 +174,7 @@ def get_info(
         # if split_name == "train":
         #     continue
 
-        # calculate dataset-level features
-        dataset[split_name] = dataset[split_name].apply(
-            get_features_dataset_level_text_classification, mode="memory", prefix="avg"
-        )
-
+        # dataset-level features
         features_dataset = get_features_dataset(dataset[split_name]._stat)
 
         for attr, feat_info in features_dataset.items():
@@ -16,7 +16,7 @@
 # Lint as: python3
 """ Simple Dataset wrapping an Arrow Table."""
 
-from collections import Counter, UserDict
+from collections import Counter, deque, UserDict
 from collections.abc import Iterable, Mapping
 import contextlib
 import copy
@@ -28,7 +28,6 @@ import json
 from math import ceil, floor
 import os
 from pathlib import Path
-import re
 import shutil
 import tempfile
 from typing import (
@@ -76,7 +75,12 @@ from datalabs.formatting import (
     query_table,
 )
 from datalabs.info import DatasetInfo, MongoDBClient
+from datalabs.operations.aggregate.arrow_compute import get_table
+from datalabs.operations.aggregate.engine import aggregate, is_fused
 from datalabs.operations.data import TextData
+from datalabs.operations.operation import OperationFunction
+from datalabs.operations.pipeline import Pipeline
+from datalabs.operations.prompt.template import PromptTemplate
 from datalabs.search import IndexableMixin
 from datalabs.splits import NamedSplit, Split
 from datalabs.table import (
@@ -91,9 +95,13 @@ from datalabs.table import (
 from datalabs.tasks import TaskTemplate
 from datalabs.tasks.text_classification import TextClassification
 from datalabs.utils import logging
+from datalabs.utils.apply_cache import apply_cache
+from datalabs.utils.checkpoint import Checkpoint
 from datalabs.utils.deprecation_utils import deprecated
 from datalabs.utils.file_utils import estimate_dataset_size
 from datalabs.utils.info_utils import is_small_dataset
+from datalabs.utils.profiling import profiler
+from datalabs.utils.token_cache import token_cache
 from datalabs.utils.typing import PathLike
 
 # import tqdm
@@ -703,6 +711,73 @@ def _check_table(table) -> Table:
         )
 
 
+_apply_worker_state = {}
+
+
+def _init_profiler(profiling: bool):
+    # the records of the parent process (when forked) are not sent back
+    profiler.reset()
+    profiler.enabled = profiling
+
+
+def _init_apply_worker(dataset, func, profiling=False):
+    """Initializer of the processes of :meth:`Dataset._apply_sharded`"""
+    _init_profiler(profiling)
+    _apply_worker_state["dataset"] = dataset
+    _apply_worker_state["func"] = func
+    if isinstance(func, OperationFunction):
+        func.warm_resources()
+
+
+def _apply_on_shard(shard: Tuple[int, int]):
+    offset, length = shard
+    dataset = _apply_worker_state["dataset"]
+    columns = dataset._apply_on_rows(_apply_worker_state["func"], offset, length)
+    with profiler.stage("build"):
+        table = pa.Table.from_pydict(columns)
+    return table, profiler.state()
+
+
+def _init_pipeline_worker(dataset, pipeline, profiling=False):
+    """Initializer of the processes of :meth:`Dataset.apply_pipeline`"""
+    _init_profiler(profiling)
+    _apply_worker_state["dataset"] = dataset
+    _apply_worker_state["pipeline"] = pipeline
+    pipeline.warm_resources()
+
+
+def _apply_pipeline_on_shard(shard: Tuple[int, int]):
+    offset, length = shard
+    dataset = _apply_worker_state["dataset"]
+    pipeline = _apply_worker_state["pipeline"]
+    accumulators = pipeline.new_accumulators()
+    with profiler.stage("fetch"):
+        batch = dataset._getitem(slice(offset, offset + length), decoded=False)
+    outputs = dataset._apply_pipeline_on_batch(
+        pipeline, batch, accumulators, offset=offset
+    )
+    with profiler.stage("build"):
+        table = pa.Table.from_pydict(outputs)
+    return table, accumulators, profiler.state()
+
+
+def _batch_outputs(outputs: Iterable[dict], batch_size: int) -> Iterator[dict]:
+    """Group the outputs of an operation, one dict per sample, into dicts of
+    columns of at most ``batch_size`` rows."""
+    columns = {}
+    num_rows = 0
+    for output in outputs:
+        for attr_name, value in output.items():
+            columns.setdefault(attr_name, []).append(value)
+        num_rows += 1
+        if num_rows == batch_size:
+            yield columns
+            columns = {}
+            num_rows = 0
+    if num_rows > 0:
+        yield columns
+
+
 class NonExistentDatasetError(Exception):
     """Used when we expect the existence of a dataset"""
 
@@ -723,16 +798,22 @@ class Dataset(DatasetInfoMixin, IndexableMixin, TensorflowDatasetMixin, TextData
                 return {}
 
     def __schema_load(self):
-        filename = self.cache_files[0]["filename"]
-        (filepath, filename) = os.path.split(filename)
-        (filename, extent) = os.path.splitext(filename)
-        path = os.path.join(filepath, filename + ".json")
+        if len(self.cache_files) == 0:
+            return
+        path = self.__schema_path()
         obj = self.__load_json(path)
         if obj.__len__():
             from datalabs.features import Value
 
             for item in obj:
-                self.info.features[item] = Value(obj[item])
+                if item in self._data.column_names:
+                    self.info.features.update(
+                        Features.from_arrow_schema(
+                            pa.schema([self._data.schema.field(item)])
+                        )
+                    )
+                elif obj[item] is not None:
+                    self.info.features[item] = Value(obj[item])
 
     def __init__(
         self,
@@ -751,6 +832,7 @@ class Dataset(DatasetInfoMixin, IndexableMixin, TensorflowDatasetMixin, TextData
             _check_table(indices_table) if indices_table is not None else None
         )
         maybe_register_dataset_for_temp_dir_deletion(self)
+        self.__load_sidecars()
 
         self._format_type: Optional[str] = None
         self._format_kwargs: dict = {}
@@ -777,7 +859,7 @@ class Dataset(DatasetInfoMixin, IndexableMixin, TensorflowDatasetMixin, TextData
                 self._fingerprint = metadata["fingerprint"]
 
         # Infer features if None
-        inferred_features = Features.from_arrow_schema(arrow_table.schema)
+        inferred_features = Features.from_arrow_schema(self._data.schema)
         if self.info.features is None:
             self.info.features = inferred_features
         else:  # make sure the nested columns are in the right order
@@ -831,7 +913,54 @@ class Dataset(DatasetInfoMixin, IndexableMixin, TensorflowDatasetMixin, TextData
     #         else:
     #             yield func(sample)
 
-    def apply_basic(self, func, prefix="", num_proc=1):
+    def aggregate(
+        self, funcs, mode="realtime", prefix="", num_proc=1, load_from_cache_file=True
+    ):
+        """Compute several aggregating operations with one pass over the
+        dataset, e.g. all the statistics of a dashboard.
+
+        Args:
+            funcs: aggregating operations declared with
+                :func:`datalabs.operations.aggregate.accumulate`
+            mode (str): "local" also writes the statistics to the cache
+                directory
+            prefix (str): prefix of the names of the statistics
+            num_proc (int): number of processes, each of them scans a
+                contiguous shard of the dataset
+            load_from_cache_file (bool): reuse the statistics of a previous
+                computation on this dataset, only the operations missing from
+                the cache are computed
+        """
+        keys = [apply_cache.key(self, func, "stat") for func in funcs]
+        results = [
+            apply_cache.load_stat(key)
+            if key is not None and load_from_cache_file
+            else None
+            for key in keys
+        ]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            computed = aggregate(self, [funcs[i] for i in missing], num_proc=num_proc)
+            for i, result in zip(missing, computed):
+                results[i] = result
+                if keys[i] is not None:
+                    apply_cache.save_stat(keys[i], result)
+
+        for result in results:
+            self.__update_stat(result, prefix=prefix, mode=mode)
+        return self
+
+    def __update_stat(self, result, prefix="", mode="realtime"):
+        result_new = {}
+        for attr_name, value in result.items():
+            attr_name = prefix + "_" + attr_name if prefix != "" else attr_name
+            result_new[attr_name] = value
+
+        self._stat.update(result_new)
+        if mode == "local":
+            self.__write_stat()
+
+    def apply_basic(self, func, prefix="", num_proc=1, batched=False, batch_size=1000):
         # if isinstance(func, str):
         #     if self._info.task_templates[0].task_category == "text-classification":
         #
@@ -844,52 +973,11 @@ class Dataset(DatasetInfoMixin, IndexableMixin, TensorflowDatasetMixin, TextData
 
         # Prompting
         if isinstance(func, str):
-            for sample in self.__iter__():
-                # prompt could be : '{{text}} \n\nWhich section
-                # of a newspaper would this article likely appear
-                # in? ||| \n{{answers[label] }}'
-                template = self._info.prompts[func]["template"]
-                template_text = template.split("|||")[0]
-                template_text_slots = re.findall("\{\{(.*?)\}\}", template_text)  # noqa
-                for slot_key in template_text_slots:
-                    slot_value = sample[slot_key]
-                    template_text = template_text.replace(
-                        "{{" + slot_key + "}}", slot_value
-                    )
-                prompted_text = template_text
-
-                template_answer = template.split("|||")[1].replace(
-                    "{{answers[label] }}", "{{answers[label]}}"
-                )
-                template_answer_slots = re.findall(
-                    "\{\{(.*?)\}\}", template_answer  # noqa
-                )  # noqa
-                for slot_key in template_answer_slots:
-                    if slot_key == "answers[label]":
-                        labels = self._info.task_templates[0].labels
-                        # labels_to_answers = dict(zip(range(len(labels)), labels))
-                        slot_values = self._info.prompts[func]["answers"][
-                            labels[sample["label"]]
-                        ]
-                        # {'World': ['World News'], 'Sports': ['Sports'],
-                        # 'Business': ['Business'], 'Science and Technology':
-                        # ['Science and Technology']}
-                        template_answer = template_answer.replace(
-                            "{{" + slot_key + "}}", slot_values[0]
-                        )
-                    elif slot_key in sample.keys():
-                        slot_value = sample[slot_key]
-                        template_answer = template_answer.replace(
-                            "{{" + slot_key + "}}", slot_value
-                        )
-                    else:
-                        raise ValueError("answer can not be found")
-
-                prompted_answer = template_answer
-                yield {
-                    "prompted_text": prompted_text,
-                    "prompted_answer": prompted_answer,
-                }
+            # prompt could be : '{{text}} \n\nWhich section
+            # of a newspaper would this article likely appear
+            # in? ||| \n{{answers[label] }}'
+            for table in self._apply_prompt_batched(func, batch_size=batch_size):
+                yield from table.to_pylist()
         # elif func._type == 'Aggregating':
         #     yield func(self[func.processed_fields[0]])
 
@@ -903,13 +991,22 @@ class Dataset(DatasetInfoMixin, IndexableMixin, TensorflowDatasetMixin, TextData
         elif func._type.find("Inference") != -1:
             yield func(self)
 
+        elif batched:
+            for columns in self._apply_batched(func, batch_size=batch_size):
+                for values in zip(*columns.values()):
+                    yield dict(zip(columns.keys(), values))
+
         elif func._type == "Preprocessing":
             task = self._info.task_templates[0].task
             language = self._info.languages[0]
             func.resources = {"task_type": task, "language": language}
             for sample in self.__iter__():
                 yield func(sample[func.processed_fields[0]])
-        elif func._type in ["Editing", "Featurizing", "OperationFunction"]:
+        elif func._type == "Editing":
+            for row, sample in enumerate(self.__iter__()):
+                columns = func.transform([sample[func.processed_fields[0]]], offset=row)
+                yield {attr_name: values[0] for attr_name, values in columns.items()}
+        elif func._type in ["Featurizing", "OperationFunction"]:
             for sample in self.__iter__():
                 yield func(sample[func.processed_fields[0]])
         elif func._type in [
@@ -925,7 +1022,40 @@ class Dataset(DatasetInfoMixin, IndexableMixin, TensorflowDatasetMixin, TextData
             for sample in self.__iter__():
                 yield func(sample)
 
-    def apply(self, func, mode="realtime", prefix="", num_proc=1):
+    def apply(
+        self,
+        func,
+        mode="realtime",
+        prefix="",
+        num_proc=1,
+        batched=False,
+        batch_size=1000,
+        load_from_cache_file=True,
+    ):
+        """Apply an operation to the dataset.
+
+        Args:
+            func: an operation (e.g., a featurizing or editing function), a
+                :class:`datalabs.operations.pipeline.Pipeline` of operations
+                (see :meth:`apply_pipeline`) or the name of a prompt of this
+                dataset
+            mode (str): "realtime" returns a generator over the outputs,
+                "memory" adds the outputs as new columns of an in-memory
+                dataset, and "local" writes them to the cache file
+            prefix (str): prefix of the names of the generated columns
+            num_proc (int): number of processes
+            batched (bool): feed the operation with columns of
+                ``batch_size`` rows instead of one sample at a time.
+                Operations registering a columnar implementation
+                (see :meth:`OperationFunction.batch`) are called once per
+                batch, the others row by row within each batch
+            batch_size (int): number of rows per batch if ``batched=True``
+            load_from_cache_file (bool): reuse the generated columns
+                (``mode="memory"``) or the statistics of a previous
+                application of the same operation to this dataset, see
+                :class:`datalabs.utils.apply_cache.ApplyCache`. The results
+                are computed again and cached if ``False``
+        """
 
         if isinstance(func, str):
             map = {
@@ -933,182 +1063,505 @@ class Dataset(DatasetInfoMixin, IndexableMixin, TensorflowDatasetMixin, TextData
                 "memory": self.apply_memory,
                 "local": self.apply_local,
             }
-            return map[mode](func, prefix=prefix, num_proc=num_proc)
+            return map[mode](
+                func, prefix=prefix, num_proc=num_proc, batch_size=batch_size
+            )
+        elif isinstance(func, Pipeline):
+            return self.apply_pipeline(
+                func, mode=mode, num_proc=num_proc, batch_size=batch_size
+            )
         elif func._type.find("Aggregating") != -1 or func._type.find("AutoEval") != -1:
 
-            result = next(self.apply_basic(func))
-
-            result_new = {}
-            for attr_name, value in result.items():
-                attr_name = prefix + "_" + attr_name if prefix != "" else attr_name
-                result_new[attr_name] = value
+            key = apply_cache.key(self, func, "stat")
+            result = None
+            if key is not None and load_from_cache_file:
+                result = apply_cache.load_stat(key)
+            if result is None:
+                if is_fused(func):
+                    result = func(self, num_proc=num_proc)
+                else:
+                    result = next(self.apply_basic(func))
+                if key is not None:
+                    with profiler.stage("write"):
+                        apply_cache.save_stat(key, result)
 
-            self._stat.update(result_new)
-            if mode == "local":
-                self.__write_stat()
+            self.__update_stat(result, prefix=prefix, mode=mode)
             return self
+        elif mode == "memory":
+            return self.apply_memory(
+                func,
+                prefix=prefix,
+                num_proc=num_proc,
+                batched=batched,
+                batch_size=batch_size,
+                load_from_cache_file=load_from_cache_file,
+            )
         else:
             map = {
                 "realtime": self.apply_basic,
-                "memory": self.apply_memory,
                 "local": self.apply_local,
             }
-            return map[mode](func, prefix=prefix, num_proc=num_proc)
+            return map[mode](
+                func,
+                prefix=prefix,
+                num_proc=num_proc,
+                batched=batched,
+                batch_size=batch_size,
+            )
 
-    def apply_memory(self, func, prefix="", num_proc=1):
-        result = self
-        attr_columns = []
-        if func._type.find("Inference") != -1:
-            attr_columns = next(self.apply_basic(func))
+    def _apply_on_batch(
+        self, func, batch: Dict[str, List], offset: int = 0
+    ) -> Dict[str, List]:
+        """Apply ``func`` to a batch given as a dict of columns, starting at
+        row ``offset`` of the dataset, and return its outputs as a dict of
+        columns."""
+        if func._type in [
+            "Editing",
+            "Featurizing",
+            "OperationFunction",
+            "Preprocessing",
+        ]:
+            return func.call_batch(batch[func.processed_fields[0]], offset=offset)
 
+        samples = [dict(zip(batch.keys(), values)) for values in zip(*batch.values())]
+        if isinstance(func, OperationFunction) and func.supports_batch:
+            # operations on whole samples, e.g. SummarizationFeaturizing
+            return func.call_batch(samples)
+        if func._type in [
+            "TopicClassificationPrompting",
+            "SentimentClassificationPrompting",
+            "NLIPrompting",
+        ]:
+            labels = self._info.task_templates[0].labels
+            labels_to_answers = dict(zip(range(len(labels)), labels))
+            outputs = [func(sample, labels_to_answers) for sample in samples]
         else:
-
-            if num_proc == 1:
-                attr_columns = [item for item in self.apply_basic(func)]
-            elif num_proc > 1:
-
-                def process_each(index):
-                    sample = self._getitem(index, decoded=False)
-                    if func._type in ["Editing", "Featurizing", "OperationFunction"]:
-                        return func(sample[func.processed_fields[0]])
-                    elif func._type == "Preprocessing":
-                        task = self._info.task_templates[0].task
-                        language = self._info.languages[0]
-                        func.resources = {"task_type": task, "language": language}
-                        return func(sample[func.processed_fields[0]])
-                    elif func._type in [
-                        "TopicClassificationPrompting",
-                        "SentimentClassificationPrompting",
-                        "NLIPrompting",
-                    ]:
-                        labels = self._info.task_templates[0].labels
-                        labels_to_answers = dict(zip(range(len(labels)), labels))
-                        return func(sample, labels_to_answers)
-                    else:
-                        return func(sample)
-
-                print("Calculating features ... ")
-                with Pool(processes=num_proc) as pool:
-                    attr_columns = pool.map(process_each, range(self.num_rows))
-
-                # attr_columns = p_map(process_each, range(self.num_rows),
-                # num_cpus=num_proc)
-
-                # with Pool(processes=num_proc) as pool:
-                #     progress_bar = tqdm(total=self.num_rows)
-                #     attr_columns = tqdm(pool.imap(process_each, range(self.num_rows)))
-                # import multiprocessing
-                # with multiprocessing.Pool() as p:
-                #     attr_columns = list(tqdm.tqdm(p.imap(process_each,
-                #     range(self.num_rows)), total=self.num_rows))
-                #     pool.close()
-                #     pool.join()
-                # for v in attr_columns:
-                #     print(v)
-
-                # from tqdm.contrib.concurrent import process_map  # or thread_map
-                # attr_columns = process_map(process_each,
-                # range(self.num_rows), max_workers=num_proc)
-
-        attr_names = attr_columns[0].keys()
-        for attr_name in attr_names:
-            if prefix == "":
-                result = result.add_column(
-                    attr_name, [item[attr_name] for item in attr_columns]
-                )
+            outputs = [func(sample) for sample in samples]
+
+        columns = {}
+        for output in outputs:
+            for attr_name, value in output.items():
+                columns.setdefault(attr_name, []).append(value)
+        return columns
+
+    def _apply_pipeline_on_batch(
+        self, pipeline: Pipeline, batch: Dict[str, List], accumulators, offset=0
+    ) -> Dict[str, List]:
+        """Run the stages of ``pipeline`` on a batch given as a dict of
+        columns, starting at row ``offset`` of the dataset, update the
+        ``accumulators`` of its aggregating stages and return the columns to
+        write."""
+        batch = dict(batch)
+        outputs = {}
+        for stage in pipeline.transforms:
+            if stage.field is None:
+                with profiler.stage("call"):
+                    columns = self._apply_on_batch(
+                        stage.operation, batch, offset=offset
+                    )
+            elif stage.field in batch:
+                with profiler.stage("call"):
+                    columns = stage.operation.call_batch(
+                        batch[stage.field], offset=offset
+                    )
             else:
-                result = result.add_column(
-                    prefix + "_" + attr_name, [item[attr_name] for item in attr_columns]
+                raise ValueError(
+                    f"{stage.name} is applied to {stage.field}, which is neither "
+                    f"a column of the dataset nor generated by a previous stage "
+                    f"(available: {list(batch.keys())})"
                 )
+            for attr_name, values in columns.items():
+                attr_name = stage.prefixed(attr_name)
+                batch[attr_name] = values
+                if stage.output:
+                    outputs[attr_name] = values
+
+        if pipeline.aggregations:
+            samples = [
+                dict(zip(batch.keys(), values)) for values in zip(*batch.values())
+            ]
+            pipeline.update(accumulators, samples)
+        return outputs
+
+    def apply_pipeline(
+        self, pipeline: Pipeline, mode="memory", num_proc=1, batch_size=1000
+    ):
+        """Compute all the stages of a pipeline with one pass over the dataset.
+
+        Each batch of ``batch_size`` rows goes through all the stages, so the
+        columns generated by a stage (e.g. tokens) are computed once for all
+        the following ones. The output columns are streamed to temporary
+        arrow files and added to the returned dataset, the statistics of the
+        aggregating stages are added to its ``_stat``.
+
+        Args:
+            pipeline (:class:`datalabs.operations.pipeline.Pipeline`): the
+                operations
+            mode (str): "local" also writes the statistics to the cache
+                directory
+            num_proc (int): number of processes, each batch is a task
+            batch_size (int): number of rows per batch
+        """
+        dataset = self.flatten_indices() if self._indices is not None else self
+        for stage in pipeline.stages:
+            dataset._set_preprocessing_resources(stage.operation)
+        accumulators = pipeline.new_accumulators()
+        shards = [
+            (offset, min(batch_size, dataset.num_rows - offset))
+            for offset in range(0, dataset.num_rows, batch_size)
+        ]
+
+        def batches():
+            if num_proc <= 1:
+                for offset, length in shards:
+                    with profiler.stage("fetch"):
+                        batch = dataset._getitem(
+                            slice(offset, offset + length), decoded=False
+                        )
+                    yield dataset._apply_pipeline_on_batch(
+                        pipeline, batch, accumulators, offset=offset
+                    )
+                return
+            with Pool(
+                processes=num_proc,
+                initializer=_init_pipeline_worker,
+                initargs=(dataset, pipeline, profiler.enabled),
+            ) as pool:
+                # the shards are merged in order, so e.g. the values of
+                # frequencies are kept in the order of their first occurrence
+                pending = deque()
+
+                def merge_first():
+                    table, shard_accumulators, profile = pending.popleft().get()
+                    pipeline.merge(accumulators, shard_accumulators)
+                    profiler.merge(profile)
+                    return table
+
+                for shard in shards:
+                    pending.append(pool.apply_async(_apply_pipeline_on_shard, (shard,)))
+                    if len(pending) >= 2 * num_proc:
+                        yield merge_first()
+                while pending:
+                    yield merge_first()
+
+        cache_file_prefix = os.path.join(
+            get_temporary_cache_files_directory(),
+            f"pipeline-{generate_random_fingerprint()}",
+        )
+        column_tables = dataset.__write_columns(
+            batches(),
+            "",
+            lambda attr_name: f"{cache_file_prefix}-{attr_name}.arrow",
+        )
+        result = dataset
+        if column_tables:
+            table, info = dataset.__add_column_tables(column_tables)
+            result = Dataset(table, info=info, split=self.split)
+        result._stat = dict(self._stat)
+        if pipeline.aggregations:
+            result.__update_stat(pipeline.results(accumulators), mode=mode)
         return result
 
-    def apply_local(self, func, prefix="", num_proc=1):
-        # result = self
+    def _prompt_template(self, name: str) -> PromptTemplate:
+        """The compiled template of the prompt ``name`` of the dataset"""
+        prompt = self._info.prompts[name]
+        template = PromptTemplate(prompt["template"])
+        if template.uses_answers:
+            # e.g. {'World': ['World News'], 'Sports': ['Sports'], ...}
+            labels = self._info.task_templates[0].labels
+            answers = [prompt["answers"].get(label) for label in labels]
+            template.answer_choices = pa.array(
+                [answer[0] if answer else None for answer in answers], pa.string()
+            )
+        return template
+
+    def _apply_prompt_batched(self, name: str, batch_size=1000):
+        """Yield the prompted texts and answers of the prompt ``name`` as
+        arrow tables, one per batch of ``batch_size`` rows."""
+        template = self._prompt_template(name)
+        with profiler.stage("fetch"):
+            table = get_table(self, template.fields)
+        for offset in range(0, self.num_rows, batch_size):
+            with profiler.stage("call"):
+                columns = template.render(table.slice(offset, batch_size))
+            with profiler.stage("build"):
+                rendered = pa.table(columns)
+            yield rendered
+
+    def _uses_tokens(self, func) -> bool:
+        """Whether ``func`` is computed from the cached tokens of its
+        processed field"""
+        return (
+            getattr(func, "tokens_func", None) is not None
+            and func._type in ["Editing", "Featurizing", "OperationFunction"]
+            and token_cache.key(self, func.processed_fields[0]) is not None
+        )
+
+    def _apply_on_rows(self, func, offset: int, length: int) -> Dict[str, List]:
+        """Apply ``func`` to ``length`` rows from ``offset`` and return its
+        outputs as a dict of columns."""
+        if self._uses_tokens(func):
+            with profiler.stage("fetch"):
+                tokens = token_cache.get(self, func.processed_fields[0])
+            with profiler.stage("call"):
+                return func.call_tokens(tokens.slice(offset, length))
+        with profiler.stage("fetch"):
+            batch = self._getitem(slice(offset, offset + length), decoded=False)
+        with profiler.stage("call"):
+            return self._apply_on_batch(func, batch, offset=offset)
+
+    def _set_preprocessing_resources(self, func):
+        if func._type == "Preprocessing":
+            task = self._info.task_templates[0].task
+            language = self._info.languages[0]
+            func.resources = {"task_type": task, "language": language}
+
+    def _apply_batched(self, func, batch_size=1000):
+        """Yield the outputs of ``func`` as dicts of columns, one per batch of
+        ``batch_size`` rows."""
+        self._set_preprocessing_resources(func)
+        for offset in range(0, self.num_rows, batch_size):
+            yield self._apply_on_rows(
+                func, offset, min(batch_size, self.num_rows - offset)
+            )
+
+    def _apply_sharded(self, func, batch_size=1000, num_proc=2):
+        """Yield the outputs of ``func`` as arrow tables, one per shard of
+        ``batch_size`` rows, computed by a pool of ``num_proc`` processes.
 
+        The dataset and the operation are sent once to each worker (a
+        memory-mapped table is pickled as the path of its cache file, and
+        reopened by the worker), then each task is only a row range. At most
+        ``2 * num_proc`` shards are in flight and the results are yielded in
+        order, so the memory used doesn't depend on the number of rows.
+        """
+        self._set_preprocessing_resources(func)
+        if self._uses_tokens(func):
+            # tokenized once, the workers read the cached tokens
+            token_cache.get(self, func.processed_fields[0])
+        shards = [
+            (offset, min(batch_size, self.num_rows - offset))
+            for offset in range(0, self.num_rows, batch_size)
+        ]
+        with Pool(
+            processes=num_proc,
+            initializer=_init_apply_worker,
+            initargs=(self, func, profiler.enabled),
+        ) as pool:
+            pending = deque()
+
+            def merge_first():
+                table, profile = pending.popleft().get()
+                profiler.merge(profile)
+                return table
+
+            for shard in shards:
+                pending.append(pool.apply_async(_apply_on_shard, (shard,)))
+                if len(pending) >= 2 * num_proc:
+                    yield merge_first()
+            while pending:
+                yield merge_first()
+
+    def __write_columns(self, batches, prefix, path_for_column):
+        """Stream the batches (dicts of columns or arrow tables) of generated
+        columns to one arrow file per column and return the memory-mapped
+        column tables."""
+        writers = {}
+        for batch in batches:
+            attr_names = (
+                batch.column_names if isinstance(batch, pa.Table) else batch.keys()
+            )
+            for attr_name_origin in attr_names:
+                attr_name = (
+                    prefix + "_" + attr_name_origin
+                    if prefix != ""
+                    else attr_name_origin
+                )
+                if attr_name not in writers:
+                    writers[attr_name] = ArrowWriter(
+                        path=path_for_column(attr_name) + ".incomplete",
+                        with_metadata=False,
+                    )
+                with profiler.stage("write"):
+                    if isinstance(batch, pa.Table):
+                        writers[attr_name].write_table(
+                            pa.table({attr_name: batch[attr_name_origin]})
+                        )
+                    else:
+                        writers[attr_name].write_batch(
+                            {attr_name: batch[attr_name_origin]}
+                        )
+
+        column_tables = []
+        for attr_name, writer in writers.items():
+            with profiler.stage("write"):
+                num_examples, _ = writer.finalize()
+            if num_examples != self.num_rows:
+                raise ValueError(
+                    f"{num_examples} values were generated for column "
+                    f"{attr_name} but the dataset has {self.num_rows} rows"
+                )
+            # Replace (not overwrite) previous versions of the column since they
+            # may still be memory-mapped
+            path = path_for_column(attr_name)
+            os.replace(path + ".incomplete", path)
+            column_tables.append(MemoryMappedTable.from_file(path))
+        return column_tables
+
+    def __add_column_tables(self, column_tables):
+        table = self._data
+        column_names = [
+            name for column_table in column_tables for name in column_table.column_names
+        ]
+        replaced_columns = [name for name in column_names if name in table.column_names]
+        if replaced_columns:
+            table = table.drop(replaced_columns)
+        with profiler.stage("build"):
+            table = ConcatenationTable.from_tables([table] + column_tables, axis=1)
+
+        info = self.info.copy()
+        for column_table in column_tables:
+            info.features.update(Features.from_arrow_schema(column_table.schema))
+        return table, info
+
+    def apply_memory(
+        self,
+        func,
+        prefix="",
+        num_proc=1,
+        batched=False,
+        batch_size=1000,
+        load_from_cache_file=True,
+    ):
+        key = (
+            None
+            if isinstance(func, str)
+            else apply_cache.key(self, func, "columns", prefix=prefix)
+        )
+        # the generated columns are aligned with the rows of the indices mapping
+        dataset = self.flatten_indices() if self._indices is not None else self
+        if key is not None and load_from_cache_file:
+            column_table = apply_cache.load_columns(key)
+            if column_table is not None:
+                table, info = dataset.__add_column_tables([column_table])
+                return Dataset(table, info=info, split=self.split, fingerprint=key)
+
+        result, attr_names = dataset.__apply_memory(
+            func,
+            prefix=prefix,
+            num_proc=num_proc,
+            batched=batched,
+            batch_size=batch_size,
+        )
+        if key is not None:
+            with profiler.stage("write"):
+                apply_cache.save_columns(key, result._data.table.select(attr_names))
+            # the same fingerprint as the dataset loaded from the cache
+            result = Dataset(
+                result._data, info=result.info, split=self.split, fingerprint=key
+            )
+        return result
+
+    def __apply_memory(self, func, prefix, num_proc, batched, batch_size):
+        """Return the dataset with the outputs of ``func`` as new columns and
+        the names of these columns."""
+        result = self
         attr_columns = []
+        if isinstance(func, str):
+            batches = self._apply_prompt_batched(func, batch_size=batch_size)
+        elif num_proc > 1:
+            batches = self._apply_sharded(
+                func, batch_size=batch_size, num_proc=num_proc
+            )
+
+        if isinstance(func, str) or num_proc > 1:
+            # the outputs are written progressively to temporary arrow files
+            # instead of being gathered in memory
+            cache_file_prefix = os.path.join(
+                get_temporary_cache_files_directory(),
+                f"apply-{generate_random_fingerprint()}",
+            )
+            column_tables = self.__write_columns(
+                batches,
+                prefix,
+                lambda attr_name: f"{cache_file_prefix}-{attr_name}.arrow",
+            )
+            table, info = self.__add_column_tables(column_tables)
+            attr_names = [
+                name
+                for column_table in column_tables
+                for name in column_table.column_names
+            ]
+            return Dataset(table, info=info, split=self.split), attr_names
 
-        if func._type.find("Inference") != -1:
+        elif func._type.find("Inference") != -1:
             attr_columns = next(self.apply_basic(func))
+
+        elif batched:
+            columns = {}
+            for batch in self._apply_batched(func, batch_size=batch_size):
+                for attr_name, values in batch.items():
+                    columns.setdefault(attr_name, []).extend(values)
+            attr_names = []
+            for attr_name, column in columns.items():
+                attr_name = prefix + "_" + attr_name if prefix != "" else attr_name
+                with profiler.stage("build"):
+                    result = result.add_column(attr_name, column)
+                attr_names.append(attr_name)
+            return result, attr_names
+
         else:
-            if num_proc == 1:
-                attr_columns = [item for item in self.apply_basic(func)]
-            elif num_proc > 1:
-                batch_count = ceil(self.num_rows / num_proc)
-
-                def process_batch(index):
-                    range_limit = range(
-                        index * batch_count,
-                        min((index + 1) * batch_count, self.num_rows),
-                    )
+            attr_columns = [item for item in self.apply_basic(func)]
+
+        attr_names = []
+        for attr_name in attr_columns[0].keys():
+            values = [item[attr_name] for item in attr_columns]
+            if prefix != "":
+                attr_name = prefix + "_" + attr_name
+            with profiler.stage("build"):
+                result = result.add_column(attr_name, values)
+            attr_names.append(attr_name)
+        return result, attr_names
+
+    def apply_local(self, func, prefix="", num_proc=1, batched=False, batch_size=1000):
+        """Write the outputs of ``func`` next to the cache file of the dataset.
+
+        Each generated column is streamed batch by batch into its own
+        sidecar arrow file and attached to the memory-mapped table as a
+        horizontal block: the existing columns are never rewritten.
+        """
+        if self.__table_path() is None:
+            raise ValueError(
+                "apply(mode='local') requires a dataset backed by a cache file"
+            )
+        if self._indices is not None:
+            raise ValueError(
+                "apply(mode='local') can't be used on a dataset with an indices "
+                "mapping, please call `flatten_indices` first"
+            )
 
-                    if func._type in ["Editing", "Featurizing", "OperationFunction"]:
-                        return [
-                            func(
-                                self._getitem(index, decoded=False)[
-                                    func.processed_fields[0]
-                                ]
-                            )
-                            for index in range_limit
-                        ]
-                    elif func._type == "Preprocessing":
-                        task = self._info.task_templates[0].task
-                        language = self._info.languages[0]
-                        func.resources = {"task_type": task, "language": language}
-                        return [
-                            func(
-                                self._getitem(index, decoded=False)[
-                                    func.processed_fields[0]
-                                ]
-                            )
-                            for index in range_limit
-                        ]
-                    elif func._type in [
-                        "TopicClassificationPrompting",
-                        "SentimentClassificationPrompting",
-                        "NLIPrompting",
-                    ]:
-                        labels = self._info.task_templates[0].labels
-                        labels_to_answers = dict(zip(range(len(labels)), labels))
-                        return [
-                            func(self._getitem(index, decoded=False), labels_to_answers)
-                            for index in range_limit
-                        ]
-                    else:
-                        return [
-                            func(self._getitem(index, decoded=False))
-                            for index in range_limit
-                        ]
-
-                with Pool(processes=num_proc) as pool:
-                    attr_columns = []
-                    temp_columns = pool.map(
-                        process_batch, range(num_proc)
-                    )  # TODO(Pengfei): this is a little strange
-                    for items in temp_columns:
-                        attr_columns += items
-
-        attr_names = attr_columns[0].keys()
-        pa_table = self.__load_disk()
-        column_dict = {}
-
-        for attr_name in attr_names:
-            attr_name_origin = attr_name
-            attr_name = prefix + "_" + attr_name if prefix != "" else attr_name
-            if attr_name in pa_table.column_names:
-                pa_table = pa_table.drop([attr_name])
-            items = [item[attr_name_origin] for item in attr_columns]
-            pa_table = pa_table.append_column(attr_name, pa.array(items))
-            column_dict[attr_name] = items
-        self.__write_disk(pa_table)
-
-        column_table = InMemoryTable.from_pydict(column_dict)
-        inferred_feature = Features.from_arrow_schema(column_table.schema)
-        table = MemoryMappedTable(pa_table, self.__table_path())
-        info = self.info.copy()
-        info.features.update(inferred_feature)
-        self.__schema_backup(attr_name, inferred_feature[attr_name].dtype)
+        if isinstance(func, str):
+            batches = self._apply_prompt_batched(func, batch_size=batch_size)
+        elif func._type.find("Inference") != -1:
+            attr_columns = next(self.apply_basic(func))
+            batches = _batch_outputs(attr_columns, len(attr_columns))
+        elif num_proc > 1:
+            batches = self._apply_sharded(
+                func, batch_size=batch_size, num_proc=num_proc
+            )
+        elif batched:
+            batches = self._apply_batched(func, batch_size=batch_size)
+        else:
+            batches = _batch_outputs(self.apply_basic(func), batch_size)
+
+        column_tables = self.__write_columns(batches, prefix, self.__sidecar_path)
+        table, info = self.__add_column_tables(column_tables)
+        for column_table in column_tables:
+            features = Features.from_arrow_schema(column_table.schema)
+            for attr_name, feature in features.items():
+                self.__schema_backup(attr_name, getattr(feature, "dtype", None))
 
-        return Dataset(table, info=info, split=self.split, indices_table=self._indices)
+        return Dataset(table, info=info, split=self.split)
 
     def __table_path(self):
         return None if len(self.cache_files) == 0 else self.cache_files[0]["filename"]
@@ -1125,42 +1578,47 @@ class Dataset(DatasetInfoMixin, IndexableMixin, TensorflowDatasetMixin, TextData
     def __write_stat(self):
         dirname = os.path.dirname(self.__table_path())
         path = os.path.join(dirname, "stat.json")
-        with open(path, "w") as obj_file:
+        with profiler.stage("write"), open(path, "w") as obj_file:
             json.dump(self._stat, obj_file)
 
-    def __load_disk(self):
+    def __schema_path(self):
         filename = self.__table_path()
-        mapfile = pa.memory_map(filename, "r")
-        return pa.ipc.open_stream(mapfile).read_all()
+        (filepath, filename) = os.path.split(filename)
+        (filename, extent) = os.path.splitext(filename)
+        return os.path.join(filepath, filename + ".json")
 
-    def __write_disk(self, pa_table):
-        filename = self.__table_path()
-        schema = pa_table.schema.serialize()
-        batches = list(map(lambda batch: batch.serialize(), pa_table.to_batches()))
-        eof = b"\xFF\xFF\xFF\xFF\x00\x00\x00\x00"
-
-        total = schema.size + len(eof)
-        for batch in batches:
-            total += batch.size
-        mapfile = pa.memory_map(filename, "r+")
-        mapfile.resize(total)
-        mapfile.seek(0)
-
-        mapfile.write(schema)
-        for batch in batches:
-            mapfile.write(batch)
-        mapfile.write(eof)
-
-    def __schema_backup(self, field, dtype=None):
+    def __sidecar_path(self, column_name):
         filename = self.__table_path()
         (filepath, filename) = os.path.split(filename)
         (filename, extent) = os.path.splitext(filename)
-        path = os.path.join(filepath, filename + ".json")
+        return os.path.join(filepath, f"{filename}-{column_name}{extent}")
+
+    def __load_sidecars(self):
+        """Attach the columns written by ``apply(mode="local")`` to the table."""
+        if self.__table_path() is None or not os.path.exists(self.__schema_path()):
+            return
+        column_tables = []
+        for column_name in self.__load_json(self.__schema_path()):
+            sidecar_path = self.__sidecar_path(column_name)
+            if column_name in self._data.column_names or not os.path.exists(
+                sidecar_path
+            ):
+                continue
+            column_table = MemoryMappedTable.from_file(sidecar_path)
+            if column_table.num_rows == self._data.num_rows:
+                column_tables.append(column_table)
+        if column_tables:
+            self._data = ConcatenationTable.from_tables(
+                [self._data] + column_tables, axis=1
+            )
+
+    def __schema_backup(self, field, dtype=None):
+        path = self.__schema_path()
         obj = self.__load_json(path)
         if dtype is not None:
             obj[field] = dtype
         else:
-            del obj[field]
+            obj.pop(field, None)
         with open(path, "w") as obj_file:
             json.dump(obj, obj_file)
 
@@ -1170,12 +1628,34 @@ class Dataset(DatasetInfoMixin, IndexableMixin, TensorflowDatasetMixin, TextData
                 writer.write_table(self._data.table)
                 writer.finalize()
 
-    def write_db(self):
-        dataset_info = self._info._as_dict()
+    def write_db(self, batch_size=1000, num_workers=1, checkpoint_path=None):
+        """Write the metadata and the samples of the dataset to the database.
+
+        The samples are read from the arrow table by record batches and each
+        batch is written with one unordered ``insert_many`` (see
+        :mod:`datalabs.utils.mongodb_export`).
+
+        Args:
+            batch_size (int): number of samples per insertion
+            num_workers (int): number of batches written concurrently
+            checkpoint_path (str, optional): file the progress of the export
+                is saved to, an interrupted export is resumed from it
+        """
         client = MongoDBClient("cluster0")
-        client.insert_metadata(dataset_info)
-        for sample in self.__iter__():
-            client.insert_sample(self._info.builder_name, sample)
+        checkpoint = Checkpoint(checkpoint_path).load(
+            [self._fingerprint, self._info.builder_name, batch_size]
+        )
+        if "metadata" not in checkpoint.done:
+            client.insert_metadata(self._info._as_dict())
+            checkpoint.mark_done("metadata")
+        client.insert_samples(
+            self._info.builder_name,
+            self,
+            batch_size=batch_size,
+            num_workers=num_workers,
+            checkpoint=checkpoint,
+        )
+        checkpoint.remove()
 
     @classmethod
     def from_file(
@@ -2319,11 +2799,36 @@ class Dataset(DatasetInfoMixin, IndexableMixin, TensorflowDatasetMixin, TextData
         will be returned with the
         selected format.
         """
-        for index in range(self.num_rows):
-            yield self._getitem(
-                index,
-                decoded=False,
-            )
+        if self._format_type is not None or self._format_columns is not None:
+            for index in range(self.num_rows):
+                yield self._getitem(
+                    index,
+                    decoded=False,
+                )
+        else:
+            for batch in self._iter_batches():
+                columns = batch.keys()
+                for values in zip(*batch.values()):
+                    yield dict(zip(columns, values))
+
+    def _iter_batches(self, batch_size: int = 1000) -> Iterator[Dict[str, List]]:
+        """Iterate through the dataset by batches of python columns, without
+        any formatting.
+
+        The record batches of the underlying table are read once; if the
+        dataset has an indices mapping, the rows are gathered from the
+        table ``batch_size`` indices at a time.
+        """
+        if self._indices is None:
+            for record_batch in self._data.to_batches(max_chunksize=batch_size):
+                if record_batch.num_rows > 0:
+                    yield record_batch.to_pydict()
+        else:
+            indices = self._indices.column(0).to_numpy()
+            for offset in range(0, len(indices), batch_size):
+                yield self._data.fast_gather(
+                    indices[offset : offset + batch_size]
+                ).to_pydict()
 
     def __repr__(self):
         return (
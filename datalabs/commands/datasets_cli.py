@@ -17,6 +17,7 @@ from argparse import ArgumentParser
 from datalabs.commands.convert import ConvertCommand
 from datalabs.commands.dummy_data import DummyDataCommand
 from datalabs.commands.env import EnvironmentCommand
+from datalabs.commands.prefetch_prompts import PrefetchPromptsCommand
 from datalabs.commands.run_beam import RunBeamCommand
 from datalabs.commands.test import TestCommand
 from datalabs.utils.logging import set_verbosity_info
@@ -34,6 +35,7 @@ def main():
     TestCommand.register_subcommand(commands_parser)
     RunBeamCommand.register_subcommand(commands_parser)
     DummyDataCommand.register_subcommand(commands_parser)
+    PrefetchPromptsCommand.register_subcommand(commands_parser)
 
     # Let's go
     args = parser.parse_args()
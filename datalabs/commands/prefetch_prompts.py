@@ -0,0 +1,94 @@
+# coding=utf-8
+# Copyright 2020 The HuggingFace Datasets Authors and the DataLab Datasets Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from argparse import ArgumentParser, Namespace
+import os
+import re
+from typing import List
+
+from datalabs.commands import BaseDatasetsCLICommand
+from datalabs.utils.logging import get_logger
+from datalabs.utils.prompt_store import prompt_store
+
+# e.g. _PROMPT_URL = "https://raw.githubusercontent.com/.../prompts.json"
+PROMPT_URL_PATTERN = re.compile(r"""^_PROMPT_URL\s*=\s*["']([^"']+)["']""", re.M)
+
+
+def find_prompt_urls(datasets_dir: str) -> List[str]:
+    """the urls of the prompts of the dataset scripts of a directory, read
+    without running the scripts"""
+    urls = []
+    for root, _, filenames in sorted(os.walk(datasets_dir)):
+        for filename in sorted(filenames):
+            if not filename.endswith(".py"):
+                continue
+            with open(os.path.join(root, filename), encoding="utf-8") as file:
+                urls.extend(PROMPT_URL_PATTERN.findall(file.read()))
+    return urls
+
+
+def prefetch_prompts_command_factory(args: Namespace):
+    return PrefetchPromptsCommand(args.datasets_dir, args.urls, args.num_workers)
+
+
+class PrefetchPromptsCommand(BaseDatasetsCLICommand):
+    @staticmethod
+    def register_subcommand(parser: ArgumentParser):
+        prefetch_parser = parser.add_parser(
+            "prefetch-prompts",
+            help="Fetch the prompts of the datasets to the local prompt store, "
+            "e.g. before working offline.",
+        )
+        prefetch_parser.add_argument(
+            "--datasets_dir",
+            type=str,
+            default="datasets",
+            help="Directory of the dataset scripts declaring a _PROMPT_URL.",
+        )
+        prefetch_parser.add_argument(
+            "--urls", type=str, nargs="*", default=[], help="Other prompt urls."
+        )
+        prefetch_parser.add_argument(
+            "--num_workers",
+            type=int,
+            default=8,
+            help="Number of urls fetched concurrently.",
+        )
+        prefetch_parser.set_defaults(func=prefetch_prompts_command_factory)
+
+    def __init__(self, datasets_dir: str, urls: List[str], num_workers: int):
+        self._logger = get_logger("datalabs-cli/prefetch-prompts")
+        self._datasets_dir = datasets_dir
+        self._urls = urls
+        self._num_workers = num_workers
+
+    def run(self):
+        urls = list(self._urls)
+        if os.path.isdir(self._datasets_dir):
+            urls.extend(find_prompt_urls(self._datasets_dir))
+        results = prompt_store.prefetch(urls, num_workers=self._num_workers)
+        failed = {
+            url: result
+            for url, result in results.items()
+            if isinstance(result, Exception)
+        }
+        for url, result in results.items():
+            if url in failed:
+                self._logger.warning(f"Couldn't fetch {url}: {result}")
+            else:
+                self._logger.info(f"{result} prompts from {url}")
+        print(
+            f"{len(results) - len(failed)} of {len(results)} prompt urls stored "
+            f"in {prompt_store.cache_dir}"
+        )
+        return results
@@ -167,6 +167,20 @@ HF_METRICS_CACHE = Path(os.getenv("HF_METRICS_CACHE", DEFAULT_HF_METRICS_CACHE))
 DEFAULT_HF_MODULES_CACHE = os.path.join(HF_CACHE_HOME, "modules")
 HF_MODULES_CACHE = Path(os.getenv("HF_MODULES_CACHE", DEFAULT_HF_MODULES_CACHE))
 
+DEFAULT_HF_APPLY_CACHE = os.path.join(HF_DATASETS_CACHE, "apply")
+HF_APPLY_CACHE = Path(os.getenv("HF_APPLY_CACHE", DEFAULT_HF_APPLY_CACHE))
+# Size of the results of `Dataset.apply` kept on disk, least recently used
+# results are evicted beyond it
+HF_APPLY_CACHE_MAX_SIZE = int(os.getenv("HF_APPLY_CACHE_MAX_SIZE", 10 << 30))
+# Profile the operations applied by the process and write the summary to this
+# path at exit, see `datalabs.utils.profiling`
+HF_APPLY_PROFILE = os.getenv("HF_APPLY_PROFILE")
+
+DEFAULT_HF_PROMPTS_CACHE = os.path.join(HF_DATASETS_CACHE, "prompts")
+HF_PROMPTS_CACHE = Path(os.getenv("HF_PROMPTS_CACHE", DEFAULT_HF_PROMPTS_CACHE))
+# Seconds the prompts fetched from a url are used before being revalidated
+HF_PROMPTS_CACHE_TTL = float(os.getenv("HF_PROMPTS_CACHE_TTL", 24 * 3600))
+
 DOWNLOADED_DATASETS_DIR = "downloads"
 DEFAULT_DOWNLOADED_DATASETS_PATH = os.path.join(
     HF_DATASETS_CACHE, DOWNLOADED_DATASETS_DIR
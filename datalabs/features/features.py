@@ -105,7 +105,8 @@ class BucketInfo:
     """
     The class is used to define a dataclass for bucketing strategy
     Args:
-        _method: the bucket strategy
+        _method: the bucket strategy, one of
+            `datalabs.utils.bucketing.BUCKETING_METHODS`
         _number: the number of buckets to be bucketed
         _settting: hyper-paraterms of bucketing
     """
@@ -38,15 +38,15 @@ import os
 import re
 from typing import Any, List, Optional, Union
 
-import pymongo
-
 from datalabs import config
 from datalabs.features import ClassLabel, Features, Value
 from datalabs.prompt import Prompt
 from datalabs.splits import SplitDict
 from datalabs.tasks import task_template_from_dict, TaskTemplate
 from datalabs.utils import Version
+from datalabs.utils.checkpoint import Checkpoint
 from datalabs.utils.logging import get_logger
+from datalabs.utils.mongodb_export import export_samples
 from datalabs.utils.py_utils import unique_values
 
 logger = get_logger(__name__)
@@ -208,6 +208,10 @@ class MongoDBClientCore:
 
         self.cluster = cluster
         self.url = ""
+
+        # pymongo is only needed to access the database
+        import pymongo
+
         self.client = pymongo.MongoClient(self.url)
 
 
@@ -248,6 +252,24 @@ class MongoDBClient:
     def insert_sample(self, collection: str, sample: dict):
         self.__insert("dev_samples_of_dataset", collection, sample)
 
+    def insert_samples(
+        self,
+        collection: str,
+        dataset,
+        batch_size: int = 1000,
+        num_workers: int = 1,
+        checkpoint: Optional[Checkpoint] = None,
+    ) -> int:
+        """insert the rows of a dataset by batches, see `export_samples`"""
+        col = self.core.client["dev_samples_of_dataset"][collection]
+        return export_samples(
+            dataset,
+            col,
+            batch_size=batch_size,
+            num_workers=num_workers,
+            checkpoint=checkpoint,
+        )
+
 
 @dataclass
 class DatasetInfo:
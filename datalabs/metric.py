@@ -1,9 +1,4 @@
-from random import choices
-
-import numpy as np
-import scipy
-import sklearn.metrics
-from sklearn.metrics import accuracy_score
+from datalabs.utils import bootstrap
 
 
 class Metric:
@@ -11,19 +6,17 @@ class Metric:
         self._name = None
         self._n_samples = None
         self._eval_function = None
+        # vectorized form of the metric for the bootstrap, see
+        # `datalabs.utils.bootstrap.BootstrapMetric`
+        self._bootstrap_metric = None
         self._n_times = 1000
         self._sampling_rate = 0.8
+        self._seed = None
+        self._num_proc = 1
         self._results = None
         self._is_print_confidence_interval = False
 
     def get_confidence_interval(self, *args, **kwargs):
-        def mean_confidence_interval(data, confidence=0.95):
-            a = 1.0 * np.array(data)
-            n = len(a)
-            m, se = np.mean(a), scipy.stats.sem(a)
-            h = se * scipy.stats.t.ppf((1 + confidence) / 2.0, n - 1)
-            return m - h, m + h
-
         n_sampling = int(self._n_samples * self._sampling_rate)
         if n_sampling == 0:
             n_sampling = 1
@@ -31,24 +24,25 @@ class Metric:
         # print(f"n_sampling: {n_sampling}\n"
         #       f"self._n_samples {self._n_samples}\n")
 
-        performance_list = []
-        confidence_low, confidence_up = 0, 0
-        for i in range(self._n_times):
-            sample_index_list = choices(range(self._n_samples), k=n_sampling)
-            performance = self._eval_function(
-                np.array(args[0])[sample_index_list],
-                np.array(args[1])[sample_index_list],
-                **kwargs
+        if self._bootstrap_metric is not None:
+            performance_list = bootstrap.bootstrap(
+                self._bootstrap_metric.statistics(*args),
+                self._bootstrap_metric.compute,
+                n_sampling,
+                n_times=self._n_times,
+                seed=self._seed,
+                num_proc=self._num_proc,
             )
-            performance_list.append(performance)
-
-        if self._n_times != 1000:
-            confidence_low, confidence_up = mean_confidence_interval(performance_list)
         else:
-            performance_list.sort()
-            confidence_low = performance_list[24]
-            confidence_up = performance_list[974]
-        return confidence_low, confidence_up
+            performance_list = bootstrap.bootstrap_function(
+                self._eval_function,
+                args,
+                n_sampling,
+                n_times=self._n_times,
+                seed=self._seed,
+                **kwargs
+            )
+        return bootstrap.confidence_interval(performance_list)
 
     def _evaluate(self, *args, **kwargs):
 
@@ -71,16 +65,27 @@ class Metric:
 
 class Accuracy(Metric):
     def __init__(
-        self, true_labels, predicted_labels, is_print_confidence_interval=False
+        self,
+        true_labels,
+        predicted_labels,
+        is_print_confidence_interval=False,
+        seed=None,
+        num_proc=1,
     ):
         super(Accuracy, self).__init__()
         # Metric.__init__(self)
         self._name = self.__class__.__name__
         self._true_labels = true_labels
         self._predicted_labels = predicted_labels
+        # sklearn is only imported when a metric is used
+        from sklearn.metrics import accuracy_score
+
         self._eval_function = accuracy_score
+        self._bootstrap_metric = bootstrap.accuracy
         self._is_print_confidence_interval = is_print_confidence_interval
         self._n_samples = len(self._true_labels)
+        self._seed = seed
+        self._num_proc = num_proc
 
     def evaluate(self):
 
@@ -89,16 +94,26 @@ class Accuracy(Metric):
 
 class F1score(Metric):
     def __init__(
-        self, true_labels, predicted_labels, is_print_confidence_interval=False
+        self,
+        true_labels,
+        predicted_labels,
+        is_print_confidence_interval=False,
+        seed=None,
+        num_proc=1,
     ):
         super(F1score, self).__init__()
         # Metric.__init__(self)
         self._name = self.__class__.__name__
         self._true_labels = true_labels
         self._predicted_labels = predicted_labels
-        self._eval_function = sklearn.metrics.f1_score
+        from sklearn.metrics import f1_score
+
+        self._eval_function = f1_score
+        self._bootstrap_metric = bootstrap.micro_f1
         self._is_print_confidence_interval = is_print_confidence_interval
         self._n_samples = len(self._true_labels)
+        self._seed = seed
+        self._num_proc = num_proc
 
     def evaluate(self):
         # print(self._true_labels[0:10])
@@ -123,7 +138,12 @@ def hits(true_labels, predicted_labels):
 
 class Hits(Metric):
     def __init__(
-        self, true_labels, predicted_labels, is_print_confidence_interval=False
+        self,
+        true_labels,
+        predicted_labels,
+        is_print_confidence_interval=False,
+        seed=None,
+        num_proc=1,
     ):
         super(Hits, self).__init__()
         # Metric.__init__(self)
@@ -131,8 +151,11 @@ class Hits(Metric):
         self._true_labels = true_labels
         self._predicted_labels = predicted_labels
         self._eval_function = hits
+        self._bootstrap_metric = bootstrap.hits
         self._is_print_confidence_interval = is_print_confidence_interval
         self._n_samples = len(self._true_labels)
+        self._seed = seed
+        self._num_proc = num_proc
 
     def evaluate(self):
 
@@ -1,4 +1,5 @@
-from datalabs.operations.aggregate.aggregating import aggregating  # noqa
+from datalabs.operations.aggregate.aggregating import aggregating, Aggregating  # noqa
+from datalabs.operations.aggregate.engine import accumulate, aggregate  # noqa
 from datalabs.operations.aggregate.general import (  # noqa
     get_average_length,
     get_features_dataset_level,
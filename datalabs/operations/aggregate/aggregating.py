@@ -1,5 +1,8 @@
 from operation import text_operation, TextOperation
 
+from datalabs.operations.aggregate.engine import aggregate, is_fused
+from datalabs.utils.profiling import profiled
+
 
 class Aggregating(TextOperation):
     def __init__(
@@ -9,6 +12,37 @@ class Aggregating(TextOperation):
     ):
         super(Aggregating, self).__init__(*args, **kwargs)
         self._data_type = "TextData"
+        self.arrow_func = None
+
+    def arrow(self, arrow_func):
+        """
+        Register an arrow-native implementation of this operation, e.g.
+
+            @get_average_length.arrow
+            def get_average_length_arrow(dataset):
+                texts = get_table(dataset, ["text"]).column("text")
+                return {"average_length": length_stats(split_words(texts))["mean"]}
+
+        `arrow_func` receives the dataset and computes the same result with
+        `pyarrow.compute` on its arrow table, it's used instead of iterating
+        over the samples whenever the operation is applied to a dataset.
+        """
+        self.arrow_func = arrow_func
+        return arrow_func
+
+    @profiled(batched=True)
+    def __call__(self, samples, num_proc: int = 1):
+        """
+        Parameters
+        samples: the samples (or texts) to aggregate
+        num_proc: number of processes used to scan the samples, only for
+        operations declared with `accumulate`
+        """
+        if self.arrow_func is not None and hasattr(samples, "_data"):
+            return self.arrow_func(samples, **self.resources)
+        if is_fused(self):
+            return aggregate(samples, [self], num_proc=num_proc)[0]
+        return super(Aggregating, self).__call__(samples)
 
 
 class aggregating(text_operation):
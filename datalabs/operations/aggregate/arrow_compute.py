@@ -0,0 +1,98 @@
+"""Arrow-native building blocks of aggregating operations.
+
+They work on the columns of the (memory-mapped) arrow table of a dataset with
+`pyarrow.compute` kernels, so statistics such as lengths, vocabularies or
+label distributions are computed without materializing the rows as python
+objects. Splitting follows `str.split(" ")` (`split_words`) and `str.split()`
+(`split_tokens`) so the results are the same as the python implementations.
+"""
+
+import math
+from typing import Any, Dict, List, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+def get_table(dataset, columns: Optional[List[str]] = None) -> pa.Table:
+    """
+    the columns (all of them by default) of a dataset as an arrow table,
+    taking the indices mapping of the dataset (e.g. after `select` or
+    `shuffle`) into account
+    """
+    if isinstance(dataset, pa.Table):
+        return dataset if columns is None else dataset.select(columns)
+    table = dataset._data
+    table = table.table if hasattr(table, "table") else table
+    if columns is not None:
+        table = table.select(columns)
+    if getattr(dataset, "_indices", None) is not None:
+        table = table.take(dataset._indices.column(0))
+    return table
+
+
+def get_rows(
+    dataset, offset: int, length: int, columns: Optional[List[str]] = None
+) -> pa.Table:
+    """
+    the rows `offset` to `offset + length` of `get_table(dataset, columns)`,
+    only the indices of these rows being taken for a dataset with an indices
+    mapping, so that a dataset can be read batch by batch without building
+    the whole table in memory
+    """
+    if isinstance(dataset, pa.Table) or getattr(dataset, "_indices", None) is None:
+        return get_table(dataset, columns).slice(offset, length)
+    table = dataset._data
+    table = table.table if hasattr(table, "table") else table
+    if columns is not None:
+        table = table.select(columns)
+    return table.take(dataset._indices.slice(offset, length).column(0))
+
+
+def split_words(texts: pa.ChunkedArray) -> pa.ChunkedArray:
+    """same as `text.split(" ")` for each text"""
+    return pc.split_pattern(texts, pattern=" ")
+
+
+def split_tokens(texts: pa.ChunkedArray) -> pa.ChunkedArray:
+    """same as `text.split()` for each text, except that empty strings have
+    to be filtered out of the flattened tokens (see `count_tokens`)"""
+    return pc.utf8_split_whitespace(texts)
+
+
+def count_tokens(texts: pa.ChunkedArray) -> int:
+    """total number of tokens, i.e. `sum(len(text.split()) for text in texts)`"""
+    tokens = pc.list_flatten(split_tokens(texts))
+    return pc.sum(pc.not_equal(tokens, "")).as_py() or 0
+
+
+def length_stats(lists: pa.ChunkedArray) -> Dict[str, Any]:
+    """min, max and mean of the lengths of lists, e.g. the words of texts"""
+    lengths = pc.list_value_length(lists)
+    count = len(lengths)
+    min_max = pc.min_max(lengths).as_py()
+    # as the `Stats` accumulator, a sum of 0 and a nan mean if there is no list
+    total = pc.sum(lengths).as_py() if count != 0 else 0
+    return {
+        "min": min_max["min"],
+        "max": min_max["max"],
+        "mean": total / count if count != 0 else math.nan,
+        "sum": total,
+        "count": count,
+    }
+
+
+def frequencies(values: pa.ChunkedArray, sort: bool = False) -> Dict[Any, int]:
+    """
+    number of occurrences of each value, in the order of their first
+    occurrence or, if `sort`, by decreasing frequency (ties keep the order of
+    the first occurrence)
+    """
+    counts = pc.value_counts(values)
+    if sort:
+        counts = counts.take(
+            pc.array_sort_indices(counts.field("counts"), order="descending")
+        )
+    return dict(
+        zip(counts.field("values").to_pylist(), counts.field("counts").to_pylist())
+    )
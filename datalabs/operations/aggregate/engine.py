@@ -0,0 +1,298 @@
+"""Single-pass aggregation engine.
+
+An aggregating operation can describe its statistics as a set of mergeable
+accumulators instead of looping over the samples itself:
+
+    def get_length_features(sample):
+        return {"length": len(sample["text"].split(" "))}
+
+    def get_length_accumulators():
+        return {"length": Stats("length")}
+
+    @aggregating(name="get_average_length")
+    @accumulate(get_length_features, get_length_accumulators)
+    def get_average_length(stats):
+        return {"average_length": stats["length"]["mean"]}
+
+`get_length_features` is called once per sample and returns the values the
+accumulators are updated with, so texts are only split once. The decorated
+function receives the results of the accumulators once all the samples have
+been seen. Several such operations can be computed with one scan of the
+dataset (see `aggregate`), and the scan can be run over shards in parallel
+since the partial results of the accumulators are merged afterwards.
+"""
+
+from collections import Counter
+import math
+from multiprocessing import Pool
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from tqdm import tqdm
+
+
+class Accumulator:
+    """Mergeable accumulator of the values of one feature of the samples.
+
+    Parameters
+    key: the name of the feature (as returned by the features function of
+    the operation) this accumulator is updated with
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+
+    def update(self, features: Dict[str, Any]):
+        raise NotImplementedError
+
+    def merge(self, other: "Accumulator"):
+        """merge the partial result of a following shard into this one"""
+        raise NotImplementedError
+
+    def result(self) -> Any:
+        raise NotImplementedError
+
+
+class Count(Accumulator):
+    """Number of samples"""
+
+    def __init__(self, key: str = None):
+        super().__init__(key)
+        self.count = 0
+
+    def update(self, features: Dict[str, Any]):
+        self.count += 1
+
+    def merge(self, other: "Count"):
+        self.count += other.count
+
+    def result(self) -> int:
+        return self.count
+
+
+class Sum(Accumulator):
+    """Sum of the values"""
+
+    def __init__(self, key: str):
+        super().__init__(key)
+        self.total = 0
+
+    def update(self, features: Dict[str, Any]):
+        self.total += features[self.key]
+
+    def merge(self, other: "Sum"):
+        self.total += other.total
+
+    def result(self) -> Any:
+        return self.total
+
+
+class Stats(Accumulator):
+    """Minimum, maximum and mean of the values.
+
+    Parameters
+    many: whether the feature is a list of values rather than one value
+    """
+
+    def __init__(self, key: str, many: bool = False):
+        super().__init__(key)
+        self.many = many
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def update(self, features: Dict[str, Any]):
+        values = features[self.key] if self.many else (features[self.key],)
+        for value in values:
+            self.count += 1
+            self.total += value
+            if self.min is None or value < self.min:
+                self.min = value
+            if self.max is None or value > self.max:
+                self.max = value
+
+    def merge(self, other: "Stats"):
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+
+    def result(self) -> Dict[str, Any]:
+        return {
+            "min": self.min,
+            "max": self.max,
+            "mean": self.total / self.count if self.count != 0 else math.nan,
+            "sum": self.total,
+            "count": self.count,
+        }
+
+
+class Frequency(Accumulator):
+    """Number of occurrences of each value, e.g. a vocabulary, a label
+    distribution or a histogram. Values are kept in the order of their first
+    occurrence.
+
+    Parameters
+    many: whether the feature is a list of values rather than one value
+    """
+
+    def __init__(self, key: str, many: bool = False):
+        super().__init__(key)
+        self.many = many
+        self.counter = Counter()
+
+    def update(self, features: Dict[str, Any]):
+        if self.many:
+            self.counter.update(features[self.key])
+        else:
+            self.counter[features[self.key]] += 1
+
+    def merge(self, other: "Frequency"):
+        self.counter.update(other.counter)
+
+    def result(self) -> Dict[Any, int]:
+        return dict(self.counter)
+
+
+class Head(Accumulator):
+    """The first `limit` values, e.g. to keep sample-level information"""
+
+    def __init__(self, key: str, limit: int):
+        super().__init__(key)
+        self.limit = limit
+        self.values = []
+
+    def update(self, features: Dict[str, Any]):
+        if len(self.values) < self.limit:
+            self.values.append(features[self.key])
+
+    def merge(self, other: "Head"):
+        self.values.extend(other.values[: self.limit - len(self.values)])
+
+    def result(self) -> List[Any]:
+        return self.values
+
+
+def accumulate(
+    features: Callable[[Dict[str, Any]], Dict[str, Any]],
+    accumulators: Callable[[], Dict[str, Accumulator]],
+):
+    """
+    declare the per-sample features and the accumulators of the function of
+    an aggregating operation. It has to be applied before the operation
+    decorator.
+    Parameters:
+      - features: function computing the features of one sample
+      - accumulators: function returning new (empty) accumulators by name
+    """
+
+    def set_accumulators(func):
+        func.features = features
+        func.accumulators = accumulators
+        return func
+
+    return set_accumulators
+
+
+def get_accumulators(func: Callable) -> Optional[Tuple[Callable, Callable]]:
+    if not hasattr(func, "accumulators"):
+        return None
+    return func.features, func.accumulators
+
+
+def is_fused(operation) -> bool:
+    return get_accumulators(getattr(operation, "func", None)) is not None
+
+
+def _scan(
+    samples: Iterable, plans: List[Tuple[Callable, Callable]], progress: bool = True
+) -> List[Dict[str, Accumulator]]:
+    """Update the accumulators of all the plans with one pass over the samples"""
+    all_accumulators = [accumulators() for _, accumulators in plans]
+    steps = [
+        (features, list(accumulators.values()))
+        for (features, _), accumulators in zip(plans, all_accumulators)
+    ]
+    for sample in tqdm(samples, disable=not progress):
+        for features, accumulators in steps:
+            values = features(sample)
+            for accumulator in accumulators:
+                accumulator.update(values)
+    return all_accumulators
+
+
+def _scan_shard(args) -> List[Dict[str, Accumulator]]:
+    samples, plans = args
+    return _scan(samples, plans, progress=False)
+
+
+def _get_shard(samples, num_shards: int, index: int):
+    if hasattr(samples, "shard"):
+        return samples.shard(num_shards=num_shards, index=index, contiguous=True)
+    size = len(samples)
+    start = index * size // num_shards
+    end = (index + 1) * size // num_shards
+    return samples[start:end]
+
+
+def aggregate(samples: Iterable, operations: List, num_proc: int = 1) -> List[Any]:
+    """
+    compute several aggregating operations with one pass over the samples
+    Parameters:
+      - samples: a dataset, or any iterable of samples if num_proc is 1
+      - operations: aggregating operations declared with `accumulate`, the
+      ones with an arrow-native implementation (see `Aggregating.arrow`) are
+      computed on the arrow table of the dataset instead
+      - num_proc: number of processes, each of them scans a contiguous shard
+      of the samples
+    Returns:
+      - the results of the operations, in the same order
+    """
+    # operations with an arrow-native implementation don't need the scan
+    use_arrow = [
+        getattr(operation, "arrow_func", None) is not None and hasattr(samples, "_data")
+        for operation in operations
+    ]
+    scanned = [
+        operation for operation, arrow in zip(operations, use_arrow) if not arrow
+    ]
+
+    plans = []
+    for operation in scanned:
+        plan = get_accumulators(operation.func)
+        if plan is None:
+            raise ValueError(
+                f"{operation.name} doesn't declare its accumulators,"
+                f" it can't be fused with other aggregating operations"
+            )
+        plans.append(plan)
+
+    if len(plans) == 0:
+        all_accumulators = []
+    elif num_proc <= 1:
+        all_accumulators = _scan(samples, plans)
+    else:
+        shards = [(_get_shard(samples, num_proc, i), plans) for i in range(num_proc)]
+        with Pool(num_proc) as pool:
+            partial_results = pool.map(_scan_shard, shards)
+        # shards are contiguous, so merging in order keeps the first-seen order
+        all_accumulators = partial_results[0]
+        for partial_result in partial_results[1:]:
+            for accumulators, partial in zip(all_accumulators, partial_result):
+                for name, accumulator in accumulators.items():
+                    accumulator.merge(partial[name])
+
+    scanned_results = iter(all_accumulators)
+    results = []
+    for operation, arrow in zip(operations, use_arrow):
+        if arrow:
+            results.append(operation.arrow_func(samples, **operation.resources))
+            continue
+        accumulators = next(scanned_results)
+        stats = {
+            name: accumulator.result() for name, accumulator in accumulators.items()
+        }
+        results.append(operation.func(stats, **operation.resources))
+    return results
@@ -2,11 +2,12 @@ from typing import Dict, Iterator
 
 # nltk package for
 import numpy as np
-
-# sklearn is used for tfidf
-from sklearn.feature_extraction.text import TfidfVectorizer
+import pyarrow.compute as pc
 
 from datalabs.operations.aggregate.aggregating import aggregating
+from datalabs.operations.aggregate.arrow_compute import frequencies, length_stats
+from datalabs.operations.aggregate.engine import accumulate, Frequency, Stats
+from datalabs.utils.token_cache import token_cache
 
 
 @aggregating(
@@ -30,13 +31,27 @@ def get_features_dataset_level(texts: Iterator) -> int:
     return {"avg_length": np.average(lengths)}
 
 
+def get_words_features(sample) -> Dict:
+    words = sample["text"].split(" ")
+    return {"words": words, "length": len(words)}
+
+
+def get_average_length_accumulators() -> Dict:
+    return {"length": Stats("length")}
+
+
+def get_vocabulary_accumulators() -> Dict:
+    return {"vocabulary": Frequency("words", many=True)}
+
+
 @aggregating(
     name="get_average_length",
     contributor="datalab",
     task="Any",
     description="Get the average length of a list of texts",
 )
-def get_average_length(texts: Iterator) -> int:
+@accumulate(get_words_features, get_average_length_accumulators)
+def get_average_length(stats: Dict) -> int:
     """
     Package: python
     Input:
@@ -44,10 +59,12 @@ def get_average_length(texts: Iterator) -> int:
     Output:
         int
     """
-    lengths = []
-    for text in texts:
-        lengths.append(len(text["text"].split(" ")))
-    return {"average_length": np.average(lengths)}
+    return {"average_length": stats["length"]["mean"]}
+
+
+@get_average_length.arrow
+def get_average_length_arrow(dataset) -> Dict:
+    return {"average_length": length_stats(token_cache.get(dataset, "text"))["mean"]}
 
 
 @aggregating(
@@ -56,7 +73,8 @@ def get_average_length(texts: Iterator) -> int:
     task="Any",
     description="Get the vocabulary of a list of texts",
 )
-def get_vocabulary(texts: Iterator) -> Dict:
+@accumulate(get_words_features, get_vocabulary_accumulators)
+def get_vocabulary(stats: Dict) -> Dict:
     """
     Package: python
     Input:
@@ -64,17 +82,17 @@ def get_vocabulary(texts: Iterator) -> Dict:
     Output:
         int
     """
-    vocab = {}
-    for text in texts:
-        for w in text["text"].split(" "):
-            if w in vocab.keys():
-                vocab[w] += 1
-            else:
-                vocab[w] = 1
+    vocab = stats["vocabulary"]
     vocab_sorted = dict(sorted(vocab.items(), key=lambda item: item[1], reverse=True))
     return {"vocabulary": vocab_sorted}
 
 
+@get_vocabulary.arrow
+def get_vocabulary_arrow(dataset) -> Dict:
+    words = pc.list_flatten(token_cache.get(dataset, "text"))
+    return {"vocabulary": frequencies(words, sort=True)}
+
+
 @aggregating(
     name="get_tfidf",
     contributor="scikit-learn",
@@ -89,6 +107,9 @@ def get_tfidf(texts: Iterator) -> int:
     Output:
         dict
     """
+    # sklearn is used for tfidf
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
     vectorizer = TfidfVectorizer()
     tfidf = vectorizer.fit_transform(texts)
     words = vectorizer.get_feature_names()
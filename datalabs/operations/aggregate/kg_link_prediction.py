@@ -14,11 +14,8 @@
 # limitations under the License.
 
 
-from typing import Iterator
-
-from tqdm import tqdm
-
 from datalabs.operations.aggregate import Aggregating, aggregating
+from datalabs.operations.aggregate.engine import accumulate, Frequency
 
 
 class KGLinkPredictionAggregating(Aggregating):
@@ -65,36 +62,28 @@ print(next(res))
 """
 
 
+def get_statistics_features(sample):
+    return sample
+
+
+def get_statistics_accumulators():
+    return {
+        "head_fre": Frequency("head"),
+        "link_fre": Frequency("link"),
+        "tail_fre": Frequency("tail"),
+    }
+
+
 @kg_link_prediction_aggregating(
     name="get_statistics",
     contributor="datalab",
     task="kg-link-prediction",
     description="aggregation function",
 )
-def get_statistics(samples: Iterator):
-    dict_head = {}
-    dict_link = {}
-    dict_tail = {}
-
-    for sample in tqdm(samples):
-
-        if sample["tail"] not in dict_tail.keys():
-            dict_tail[sample["tail"]] = 1
-        else:
-            dict_tail[sample["tail"]] += 1
-
-        if sample["head"] not in dict_head.keys():
-            dict_head[sample["head"]] = 1
-        else:
-            dict_head[sample["head"]] += 1
-
-        if sample["link"] not in dict_link.keys():
-            dict_link[sample["link"]] = 1
-        else:
-            dict_link[sample["link"]] += 1
-
+@accumulate(get_statistics_features, get_statistics_accumulators)
+def get_statistics(stats):
     return {
-        "head_fre": dict_head,
-        "link_fre": dict_link,
-        "tail_fre": dict_tail,
+        "head_fre": stats["head_fre"],
+        "link_fre": stats["link_fre"],
+        "tail_fre": stats["tail_fre"],
     }
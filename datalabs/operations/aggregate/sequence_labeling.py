@@ -1,14 +1,22 @@
-from collections import Counter
-import json
 import os
-from typing import Any, Callable, Iterator, List, Mapping, Optional
-
-import numpy as np
-from tqdm import tqdm
+from typing import Any, Callable, List, Mapping, Optional
 
 from datalabs.operations.aggregate.aggregating import Aggregating, aggregating
+from datalabs.operations.aggregate.engine import (
+    accumulate,
+    Count,
+    Frequency,
+    Head,
+    Stats,
+    Sum,
+)
 from datalabs.operations.featurize import get_gender_bias
 from datalabs.operations.operation import dataset_operation, DatasetOperation
+from datalabs.utils.resource_registry import load_resource
+
+SPELL_CORRECTIONS_PATH = os.path.join(
+    os.path.dirname(__file__), "../edit/resources/spell_corrections.json"
+)
 
 
 class SequenceLabelingAggregating(Aggregating, DatasetOperation):
@@ -84,6 +92,81 @@ class sequence_labeling_aggregating(aggregating, dataset_operation):
             return tf_cls
 
 
+def get_statistics_features(sample):
+    tokens, tags = sample["tokens"], sample["tags"]
+    text = " ".join(tokens)
+
+    # grammar checker
+    common_misspellings = load_resource("lexicon", SPELL_CORRECTIONS_PATH)
+    spelling_errors = common_misspellings.count([word.lower() for word in tokens])
+
+    # gender bias
+    """
+    result = {
+    'word': {
+        'male': one_words_results['words_m'],
+        'female': one_words_results['words_f']
+    },
+    'single_name': {
+        'male': one_words_results['single_name_m'],
+        'female': one_words_results['single_name_f']
+    },
+    }
+    """
+    gender_result = get_gender_bias.func(text)
+    gender_info = gender_result["gender_bias_info"]
+
+    # average length
+    text_length = len(text.split(" "))
+
+    # convert tag-id to tag-text
+    tag_ts = tag_id2text(tags)
+    chunk = get_chunks(tag_ts)
+
+    return {
+        "tokens": tokens,
+        "tags": tag_ts,
+        "text_length": text_length,
+        "number_of_tokens": len(tokens),
+        "spelling_errors": spelling_errors,
+        "has_entity": int(len(chunk) != 0),
+        # sentences without entity are not taken into account
+        "entity_nums": [len(chunk)] if len(chunk) != 0 else [],
+        "entity_lengths": [eid - sid for _, sid, eid in chunk],
+        "word_male": gender_info["word"]["male"],
+        "word_female": gender_info["word"]["female"],
+        "single_name_male": gender_info["single_name"]["male"],
+        "single_name_female": gender_info["single_name"]["female"],
+        "sample_info": {
+            "tokens": text,
+            "tags": tag_ts,
+            "text_length": text_length,
+            "gender": gender_result,
+            # "hate_speech_class": class_,
+        },
+    }
+
+
+def get_statistics_accumulators():
+    return {
+        "number_of_samples": Count(),
+        "number_of_tokens": Sum("number_of_tokens"),
+        "spelling_errors": Sum("spelling_errors"),
+        "length": Stats("text_length"),
+        "label_distribution": Frequency("tags", many=True),
+        "vocabulary": Frequency("tokens", many=True),
+        "sentence_with_entity": Sum("has_entity"),
+        "entity_nums": Stats("entity_nums", many=True),
+        "entity_lengths": Stats("entity_lengths", many=True),
+        "entity_length_distribution": Frequency("entity_lengths", many=True),
+        "word_male": Sum("word_male"),
+        "word_female": Sum("word_female"),
+        "single_name_male": Sum("single_name_male"),
+        "single_name_female": Sum("single_name_female"),
+        "sample_infos": Head("sample_info", limit=10000),
+    }
+
+
 @sequence_labeling_aggregating(
     name="get_statistics",
     contributor="datalab",
@@ -92,7 +175,8 @@ class sequence_labeling_aggregating(aggregating, dataset_operation):
     " of a given sequence labeling datasets (e.g., named "
     "entity recognition)",
 )
-def get_statistics(samples: Iterator):
+@accumulate(get_statistics_features, get_statistics_accumulators)
+def get_statistics(stats):
     """
     Input:
     samples: [{
@@ -112,119 +196,15 @@ def get_statistics(samples: Iterator):
 
     """
 
-    scriptpath = os.path.dirname(__file__)
-    with open(
-        os.path.join(scriptpath, "../edit/resources/spell_corrections.json"), "r"
-    ) as file:
-        COMMON_MISSPELLINGS_DICT = json.loads(file.read())
-
-    # for hate speech
-    # from hatesonar import Sonar
-    # sonar = Sonar()
-
-    sample_infos = []
-    labels_to_number = {}
-    gender_results = []
-    vocab = {}
-    number_of_tokens = 0
-    # hatespeech = {
-    #     "hate_speech": {"ratio": 0, "texts": []},
-    #     "offensive_language": {"ratio": 0, "texts": []},
-    #     "neither": {"ratio": 0, "texts": []}}
-    spelling_errors = []
-
-    lengths = []
-    chunks = []
-    tag_texts = []
-    for sample in tqdm(samples):
-        tokens, tags = sample["tokens"], sample["tags"]
-        text = " ".join(tokens)
-        # grammar checker
-        for word in tokens:
-            # word_corrected = spell.correction(word)
-            if word.lower() in COMMON_MISSPELLINGS_DICT.keys():
-                spelling_errors.append((word, COMMON_MISSPELLINGS_DICT[word.lower()]))
-
-        # hataspeech
-        # results = sonar.ping(text=text)
-        # class_ = results['top_class']
-        # confidence = 0
-        # for value in results['classes']:
-        #     if value['class_name'] == class_:
-        #         confidence = value['confidence']
-        #         break
-        #
-        # hatespeech[class_]["ratio"] += 1
-        # if class_ != "neither":
-        #     hatespeech[class_]["texts"].append(text)
-
-        # update the number of tokens
-        number_of_tokens += len(tokens)
-
-        # update vocabulary
-        for w in tokens:
-
-            if w in vocab.keys():
-                vocab[w] += 1
-            else:
-                vocab[w] = 1
-
-        # gender bias
-        """
-        result = {
-        'word': {
-            'male': one_words_results['words_m'],
-            'female': one_words_results['words_f']
-        },
-        'single_name': {
-            'male': one_words_results['single_name_m'],
-            'female': one_words_results['single_name_f']
-        },
-        }
-        """
-        gender_result = get_gender_bias.func(text)
-        gender_results.append(gender_result["gender_bias_info"])
-
-        # average length
-        text_length = len(text.split(" "))
-        lengths.append(text_length)
-
-        # convert tag-id to tag-text
-        tag_ts = tag_id2text(tags)
-        tag_texts += tag_ts
-        chunk = get_chunks(tag_ts)
-        if len(chunk) != 0:
-            chunks.append(chunk)
-
-        # label imbalance
-        for label in tag_ts:
-            if label in labels_to_number.keys():
-                labels_to_number[label] += 1
-            else:
-                labels_to_number[label] = 1
-
-        sample_info = {
-            "tokens": text,
-            "tags": tag_ts,
-            "text_length": text_length,
-            "gender": gender_result,
-            # "hate_speech_class": class_,
-        }
-
-        if len(sample_infos) < 10000:
-            sample_infos.append(sample_info)
     # -------------------------- dataset-level ---------------------------
     # compute dataset-level gender_ratio
     gender_ratio = {
-        "word": {"male": 0, "female": 0},
-        "single_name": {"male": 0, "female": 0},
+        "word": {"male": stats["word_male"], "female": stats["word_female"]},
+        "single_name": {
+            "male": stats["single_name_male"],
+            "female": stats["single_name_female"],
+        },
     }
-    for result in gender_results:
-        res_word = result["word"]  # noqa
-        gender_ratio["word"]["male"] += result["word"]["male"]
-        gender_ratio["word"]["female"] += result["word"]["female"]
-        gender_ratio["single_name"]["male"] += result["single_name"]["male"]
-        gender_ratio["single_name"]["female"] += result["single_name"]["female"]
 
     n_gender = gender_ratio["word"]["male"] + gender_ratio["word"]["female"]
     gender_ratio["word"]["male"] /= n_gender
@@ -237,30 +217,27 @@ def get_statistics(samples: Iterator):
     gender_ratio["single_name"]["female"] /= n_gender
 
     # get vocabulary
+    vocab = stats["vocabulary"]
     vocab_sorted = dict(sorted(vocab.items(), key=lambda item: item[1], reverse=True))
 
-    # get ratio of hate_speech:offensive_language:neither
-    # for k, v in hatespeech.items():
-    #     hatespeech[k]["ratio"] /= len(samples)
-
     # other NER features...
 
-    label_distribution = dict(Counter(tag_texts))
-    avg_entityLen, avg_entity_nums_inSent, entity_lengths = get_avg_spanLen(chunks)
-    entity_length_distribution = dict(Counter(entity_lengths))
+    label_distribution = stats["label_distribution"]
+    labels_to_number = label_distribution
 
     res = {
         "dataset-level": {
             "entity_info": {
-                "avg_entity_length": avg_entityLen,
-                "avg_entity_on_sentence": avg_entity_nums_inSent,
-                "sentence_without_entity": len(samples) - len(chunks),
-                "entity_length_distribution": entity_length_distribution,
+                "avg_entity_length": stats["entity_lengths"]["mean"],
+                "avg_entity_on_sentence": stats["entity_nums"]["mean"],
+                "sentence_without_entity": stats["number_of_samples"]
+                - stats["sentence_with_entity"],
+                "entity_length_distribution": stats["entity_length_distribution"],
             },
             "length_info": {
-                "max_text_length": np.max(lengths),
-                "min_text_length": np.min(lengths),
-                "average_text_length": np.average(lengths),
+                "max_text_length": stats["length"]["max"],
+                "min_text_length": stats["length"]["min"],
+                "average_text_length": stats["length"]["mean"],
             },
             "label_info": {
                 "ratio": min(labels_to_number.values())
@@ -270,30 +247,16 @@ def get_statistics(samples: Iterator):
             },
             "gender_info": gender_ratio,
             "vocabulary_info": vocab_sorted,
-            "number_of_samples": len(samples),
-            "number_of_tokens": number_of_tokens,
+            "number_of_samples": stats["number_of_samples"],
+            "number_of_tokens": stats["number_of_tokens"],
             # "hatespeech_info": hatespeech,
         },
-        "sample-level": sample_infos,
+        "sample-level": stats["sample_infos"],
     }
 
     return res
 
 
-def get_avg_spanLen(chunks):
-    entity_lengths = []
-    entity_nums = []
-    for chunk in chunks:
-        entity_nums.append(len(chunk))
-        for ck in chunk:
-            tag, sid, eid = ck
-            entity_lengths.append(eid - sid)
-
-    avg_entityLen = np.mean(entity_lengths)
-    avg_entity_nums_inSent = np.mean(entity_nums)
-    return avg_entityLen, avg_entity_nums_inSent, entity_lengths
-
-
 def tag_id2text(tags):
     tag2text_dic = {
         0: "O",
@@ -1,9 +1,13 @@
-from typing import Any, Callable, Iterator, List, Mapping, Optional
-
-import numpy as np
-from tqdm import tqdm
+from typing import Any, Callable, List, Mapping, Optional
 
 from datalabs.operations.aggregate.aggregating import Aggregating, aggregating
+from datalabs.operations.aggregate.arrow_compute import (
+    count_tokens,
+    get_table,
+    length_stats,
+    split_words,
+)
+from datalabs.operations.aggregate.engine import accumulate, Count, Stats, Sum
 from datalabs.operations.featurize import *  # noqa
 from datalabs.operations.operation import dataset_operation, DatasetOperation
 
@@ -79,6 +83,24 @@ class summarization_aggregating(aggregating, dataset_operation):
             return tf_cls
 
 
+def get_statistics_features(sample):
+    text, summary = sample["text"], sample["summary"]
+    return {
+        "text_length": len(text.split(" ")),
+        "summary_length": len(summary.split(" ")),
+        "number_of_tokens": len(text.split()) + len(summary.split()),
+    }
+
+
+def get_statistics_accumulators():
+    return {
+        "number_of_samples": Count(),
+        "number_of_tokens": Sum("number_of_tokens"),
+        "text_length": Stats("text_length"),
+        "summary_length": Stats("summary_length"),
+    }
+
+
 @summarization_aggregating(
     name="get_statistics",
     contributor="datalab",
@@ -86,7 +108,8 @@ class summarization_aggregating(aggregating, dataset_operation):
     description="Calculate the overall statistics (e.g., density) "
     "of a given summarization dataset",
 )
-def get_statistics(samples: Iterator):
+@accumulate(get_statistics_features, get_statistics_accumulators)
+def get_statistics(stats):
     """
         Input:
         samples: [{
@@ -106,53 +129,23 @@ def get_statistics(samples: Iterator):
 
     """
 
-    summary_lengths = []
-    text_lengths = []
-    number_of_tokens = 0
-    vocab = {}
-
-    for sample in tqdm(samples):
-
-        text, summary = sample["text"], sample["summary"]
-
-        # average length of text
-        text_length = len(text.split(" "))
-        text_lengths.append(text_length)
-
-        # average length of summary
-        summary_length = len(summary.split(" "))
-        summary_lengths.append(summary_length)
-
-        # update the number of tokens
-        number_of_tokens += len(text.split())
-        number_of_tokens += len(summary.split())
-
-        # Others
-        # attr_json = get_all_features(sample)
-        # attr_jsons.append(attr_json)
-
-        # Vocabulary info
-        for w in (text + summary).split(" "):
-
-            if w in vocab.keys():
-                vocab[w] += 1
-            else:
-                vocab[w] = 1
+    text_lengths = stats["text_length"]
+    summary_lengths = stats["summary_length"]
 
     res = {
         "dataset-level": {
-            "average_text_length": np.average(text_lengths),
-            "average_summary_length": np.average(summary_lengths),
+            "average_text_length": text_lengths["mean"],
+            "average_summary_length": summary_lengths["mean"],
             "length_info": {
-                "max_text_length": np.max(text_lengths),
-                "min_text_length": np.min(text_lengths),
-                "average_text_length": np.average(text_lengths),
-                "max_summary_length": np.max(summary_lengths),
-                "min_summary_length": np.min(summary_lengths),
-                "average_summary_length": np.average(summary_lengths),
+                "max_text_length": text_lengths["max"],
+                "min_text_length": text_lengths["min"],
+                "average_text_length": text_lengths["mean"],
+                "max_summary_length": summary_lengths["max"],
+                "min_summary_length": summary_lengths["min"],
+                "average_summary_length": summary_lengths["mean"],
             },
-            "number_of_samples": len(samples),
-            "number_of_tokens": number_of_tokens,
+            "number_of_samples": stats["number_of_samples"],
+            "number_of_tokens": stats["number_of_tokens"],
             # "vocabulary_info": vocab_sorted,
             # "gender_info": gender_ratio,
             # "hatespeech_info": hatespeech,
@@ -162,3 +155,17 @@ def get_statistics(samples: Iterator):
     }
 
     return res
+
+
+@get_statistics.arrow
+def get_statistics_arrow(dataset):
+    table = get_table(dataset, ["text", "summary"])
+    texts, summaries = table.column("text"), table.column("summary")
+    return get_statistics.func(
+        {
+            "number_of_samples": len(table),
+            "number_of_tokens": count_tokens(texts) + count_tokens(summaries),
+            "text_length": length_stats(split_words(texts)),
+            "summary_length": length_stats(split_words(summaries)),
+        }
+    )
@@ -1,13 +1,23 @@
-import json
 import os
-from typing import Any, Callable, Iterator, List, Mapping, Optional
-
-import numpy as np
-from tqdm import tqdm
+from typing import Any, Callable, List, Mapping, Optional
 
 from datalabs.operations.aggregate.aggregating import Aggregating, aggregating
+from datalabs.operations.aggregate.arrow_compute import frequencies, get_table
+from datalabs.operations.aggregate.engine import (
+    accumulate,
+    Count,
+    Frequency,
+    Head,
+    Stats,
+    Sum,
+)
 from datalabs.operations.featurize.general import get_gender_bias
 from datalabs.operations.operation import dataset_operation, DatasetOperation
+from datalabs.utils.resource_registry import load_resource
+
+SPELL_CORRECTIONS_PATH = os.path.join(
+    os.path.dirname(__file__), "../edit/resources/spell_corrections.json"
+)
 
 
 class TextClassificationAggregating(Aggregating, DatasetOperation):
@@ -83,36 +93,53 @@ class text_classification_aggregating(aggregating, dataset_operation):
             return tf_cls
 
 
+def get_features_dataset_level_features(sample):
+    return {
+        "numerical_features": {
+            feature_name: value
+            for feature_name, value in sample.items()
+            if feature_name != "label" and isinstance(value, (int, float))
+        }
+    }
+
+
+def get_features_dataset_level_accumulators():
+    return {
+        "number_of_samples": Count(),
+        # the counter of a frequency sums the values of the dicts
+        "totals": Frequency("numerical_features", many=True),
+    }
+
+
 @text_classification_aggregating(
     name="get_features_dataset_level",
     contributor="datalab",
     task="text-classification",
     description="Get the average length of a list of texts",
 )
-def get_features_dataset_level(samples: Iterator):
+@accumulate(
+    get_features_dataset_level_features, get_features_dataset_level_accumulators
+)
+def get_features_dataset_level(stats):
     """
     Package: python
     Input:
-        texts: Iterator
+        stats: the sums of the numerical features of the samples
     Output:
-        int
+        dict: the average of each numerical feature
     """
+    return {
+        feature_name: total / stats["number_of_samples"]
+        for feature_name, total in stats["totals"].items()
+    }
 
-    res_info = {}
-    for sample in samples:
-        for feature_name, value in sample.items():
-            if feature_name == "label":
-                continue
-            if isinstance(value, int) or isinstance(value, float):
-                if feature_name not in res_info.keys():
-                    res_info[feature_name] = value
-                else:
-                    res_info[feature_name] += value
 
-    for feature_name, value in res_info.items():
-        res_info[feature_name] /= len(samples)
+def get_label_distribution_features(sample):
+    return {"label": sample["label"]}
 
-    return res_info
+
+def get_label_distribution_accumulators():
+    return {"label_distribution": Frequency("label")}
 
 
 @text_classification_aggregating(
@@ -123,7 +150,8 @@ def get_features_dataset_level(samples: Iterator):
     description="Calculate the label distribution of a given text"
     " classification dataset",
 )
-def get_label_distribution(samples: Iterator):
+@accumulate(get_label_distribution_features, get_label_distribution_accumulators)
+def get_label_distribution(stats):
     """
     Input:
     samples: [{
@@ -134,14 +162,7 @@ def get_label_distribution(samples: Iterator):
         dict:
         "label":n_samples
     """
-    labels_to_number = {}
-    for sample in samples:
-        text, label = sample["text"], sample["label"]  # noqa
-
-        if label in labels_to_number.keys():
-            labels_to_number[label] += 1
-        else:
-            labels_to_number[label] = 1
+    labels_to_number = stats["label_distribution"]
 
     res = {
         "imbalance_ratio": min(labels_to_number.values())
@@ -153,6 +174,76 @@ def get_label_distribution(samples: Iterator):
     return res
 
 
+@get_label_distribution.arrow
+def get_label_distribution_arrow(dataset):
+    labels = get_table(dataset, ["label"]).column("label")
+    return get_label_distribution.func(
+        {"label_distribution": frequencies(labels)},
+    )
+
+
+def get_statistics_features(sample):
+    text, label = sample["text"], sample["label"]
+    words = text.split(" ")
+
+    # grammar checker
+    common_misspellings = load_resource("lexicon", SPELL_CORRECTIONS_PATH)
+    spelling_errors = common_misspellings.count([word.lower() for word in words])
+
+    # gender bias
+    """
+    result = {
+    'word': {
+        'male': one_words_results['words_m'],
+        'female': one_words_results['words_f']
+    },
+    'single_name': {
+        'male': one_words_results['single_name_m'],
+        'female': one_words_results['single_name_f']
+    },
+    }
+    """
+    gender_result = get_gender_bias.func(text)
+    gender_info = gender_result["gender_bias_info"]
+
+    text_length = len(words)
+
+    return {
+        "label": label,
+        "words": words,
+        "text_length": text_length,
+        "number_of_tokens": len(text.split()),
+        "spelling_errors": spelling_errors,
+        "word_male": gender_info["word"]["male"],
+        "word_female": gender_info["word"]["female"],
+        "single_name_male": gender_info["single_name"]["male"],
+        "single_name_female": gender_info["single_name"]["female"],
+        "sample_info": {
+            "text": text,
+            "label": label,
+            "text_length": text_length,
+            "gender": gender_result,
+            # "hate_speech_class":class_,
+        },
+    }
+
+
+def get_statistics_accumulators():
+    return {
+        "number_of_samples": Count(),
+        "number_of_tokens": Sum("number_of_tokens"),
+        "spelling_errors": Sum("spelling_errors"),
+        "length": Stats("text_length"),
+        "label_distribution": Frequency("label"),
+        "vocabulary": Frequency("words", many=True),
+        "word_male": Sum("word_male"),
+        "word_female": Sum("word_female"),
+        "single_name_male": Sum("single_name_male"),
+        "single_name_female": Sum("single_name_female"),
+        "sample_infos": Head("sample_info", limit=10000),
+    }
+
+
 @text_classification_aggregating(
     name="get_statistics",
     contributor="datalab",
@@ -160,7 +251,8 @@ def get_label_distribution(samples: Iterator):
     description="Calculate the overall statistics (e.g., average length)"
     " of a given text classification dataset",
 )
-def get_statistics(samples: Iterator):
+@accumulate(get_statistics_features, get_statistics_accumulators)
+def get_statistics(stats):
     """
         Input:
         samples: [{
@@ -182,120 +274,16 @@ def get_statistics(samples: Iterator):
 
 
     """
-    # Grammar checker
-    # from spellchecker import SpellChecker
-    # spell = SpellChecker()
-    # spell = SpellChecker(distance=1)  # set at initialization
-
-    scriptpath = os.path.dirname(__file__)
-    with open(
-        os.path.join(scriptpath, "../edit/resources/spell_corrections.json"), "r"
-    ) as file:
-        COMMON_MISSPELLINGS_DICT = json.loads(file.read())
-
-    # print(COMMON_MISSPELLINGS_DICT)
-    # exit()
-
-    # for hate speech
-    # from hatesonar import Sonar
-    # sonar = Sonar()
-
-    sample_infos = []
-
-    labels_to_number = {}
-    lengths = []
-    gender_results = []
-    vocab = {}
-    number_of_tokens = 0
-    # hatespeech = {
-    #     "hate_speech": {"ratio": 0, "texts": []},
-    #     "offensive_language": {"ratio": 0, "texts": []},
-    #     "neither": {"ratio": 0, "texts": []},
-    # }
-    spelling_errors = []
-
-    for sample in tqdm(samples):
-        text, label = sample["text"], sample["label"]
-
-        # grammar checker
-        for word in text.split(" "):
-            # word_corrected = spell.correction(word)
-            if word.lower() in COMMON_MISSPELLINGS_DICT.keys():
-                spelling_errors.append((word, COMMON_MISSPELLINGS_DICT[word.lower()]))
-
-        # hataspeech
-        # results = sonar.ping(text=text)
-        # class_ = results['top_class']
-        # confidence = 0
-        # for value in results['classes']:
-        #     if value['class_name'] == class_:
-        #         confidence = value['confidence']
-        #         break
-        #
-        # hatespeech[class_]["ratio"] += 1
-        # if class_ != "neither":
-        #     hatespeech[class_]["texts"].append(text)
-
-        # update the number of tokens
-        number_of_tokens += len(text.split())
-
-        # update vocabulary
-        for w in text.split(" "):
-
-            if w in vocab.keys():
-                vocab[w] += 1
-            else:
-                vocab[w] = 1
-
-        # gender bias
-        """
-        result = {
-        'word': {
-            'male': one_words_results['words_m'],
-            'female': one_words_results['words_f']
-        },
-        'single_name': {
-            'male': one_words_results['single_name_m'],
-            'female': one_words_results['single_name_f']
-        },
-        }
-        """
-        gender_result = get_gender_bias.func(text)
-        gender_results.append(gender_result["gender_bias_info"])
-
-        # average length
-        text_length = len(text.split(" "))
-        lengths.append(text_length)
-
-        # label imbalance
-        if label in labels_to_number.keys():
-            labels_to_number[label] += 1
-        else:
-            labels_to_number[label] = 1
-
-        sample_info = {
-            "text": text,
-            "label": label,
-            "text_length": text_length,
-            "gender": gender_result,
-            # "hate_speech_class":class_,
-        }
-
-        if len(sample_infos) < 10000:
-            sample_infos.append(sample_info)
 
     # -------------------------- dataset-level ---------------------------
     # compute dataset-level gender_ratio
     gender_ratio = {
-        "word": {"male": 0, "female": 0},
-        "single_name": {"male": 0, "female": 0},
+        "word": {"male": stats["word_male"], "female": stats["word_female"]},
+        "single_name": {
+            "male": stats["single_name_male"],
+            "female": stats["single_name_female"],
+        },
     }
-    for result in gender_results:
-        res_word = result["word"]  # noqa
-        gender_ratio["word"]["male"] += result["word"]["male"]
-        gender_ratio["word"]["female"] += result["word"]["female"]
-        gender_ratio["single_name"]["male"] += result["single_name"]["male"]
-        gender_ratio["single_name"]["female"] += result["single_name"]["female"]
 
     n_gender = gender_ratio["word"]["male"] + gender_ratio["word"]["female"]
     if n_gender != 0:
@@ -316,19 +304,16 @@ def get_statistics(samples: Iterator):
         gender_ratio["single_name"]["female"] = 0
 
     # get vocabulary
+    vocab = stats["vocabulary"]
     vocab_sorted = dict(sorted(vocab.items(), key=lambda item: item[1], reverse=True))
 
-    # get ratio of hate_speech:offensive_language:neither
-    # for k,v in hatespeech.items():
-    #     hatespeech[k]["ratio"] /= len(samples)
-
-    # print(hatespeech)
+    labels_to_number = stats["label_distribution"]
     res = {
         "dataset-level": {
             "length_info": {
-                "max_text_length": np.max(lengths),
-                "min_text_length": np.min(lengths),
-                "average_text_length": np.average(lengths),
+                "max_text_length": stats["length"]["max"],
+                "min_text_length": stats["length"]["min"],
+                "average_text_length": stats["length"]["mean"],
             },
             "label_info": {
                 "ratio": min(labels_to_number.values())
@@ -338,12 +323,12 @@ def get_statistics(samples: Iterator):
             },
             "gender_info": gender_ratio,
             "vocabulary_info": vocab_sorted,
-            "number_of_samples": len(samples),
-            "number_of_tokens": number_of_tokens,
+            "number_of_samples": stats["number_of_samples"],
+            "number_of_tokens": stats["number_of_tokens"],
             # "hatespeech_info":hatespeech,
-            "spelling_errors": len(spelling_errors),
+            "spelling_errors": stats["spelling_errors"],
         },
-        "sample-level": sample_infos,
+        "sample-level": stats["sample_infos"],
     }
 
     return res
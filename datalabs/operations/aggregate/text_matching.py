@@ -1,10 +1,16 @@
-from typing import Any, Callable, Iterator, List, Mapping, Optional
+from typing import Any, Callable, List, Mapping, Optional
 
-import numpy as np
 import sacrebleu
-from tqdm import tqdm
 
 from datalabs.operations.aggregate.aggregating import Aggregating, aggregating
+from datalabs.operations.aggregate.engine import (
+    accumulate,
+    Count,
+    Frequency,
+    Head,
+    Stats,
+    Sum,
+)
 from datalabs.operations.featurize import get_gender_bias
 from datalabs.operations.operation import dataset_operation, DatasetOperation
 
@@ -89,6 +95,69 @@ def get_similarity_by_sacrebleu(text1, text2):
     return score
 
 
+def get_statistics_features(sample):
+    text1, text2, label = sample["text1"], sample["text2"], sample["label"]
+    words1 = text1.split(" ")
+    words2 = text2.split(" ")
+
+    similarity_of_text_pair = get_similarity_by_sacrebleu(text1, text2)
+
+    # Gender info
+    gender_result1 = get_gender_bias.func(text1)
+    gender_result2 = get_gender_bias.func(text2)
+    gender_info1 = gender_result1["gender_bias_info"]
+    gender_info2 = gender_result2["gender_bias_info"]
+
+    text1_divided_text2 = len(words1) / len(words2)
+
+    return {
+        "label": label,
+        "text1_length": len(words1),
+        "text2_length": len(words2),
+        "text1_divided_text2": text1_divided_text2,
+        "similarity_of_text_pair": similarity_of_text_pair,
+        "number_of_tokens": len(text1.split()) + len(text2.split()),
+        "words": (text1 + text2).split(" "),
+        "word_male": gender_info1["word"]["male"] + gender_info2["word"]["male"],
+        "word_female": gender_info1["word"]["female"] + gender_info2["word"]["female"],
+        "single_name_male": gender_info1["single_name"]["male"]
+        + gender_info2["single_name"]["male"],
+        "single_name_female": gender_info1["single_name"]["female"]
+        + gender_info2["single_name"]["female"],
+        "sample_info": {
+            "text1": text1,
+            "text2": text2,
+            "label": label,
+            "text1_length": len(words1),
+            "text2_length": len(words2),
+            "text1_gender": gender_result1,
+            "text2_gender": gender_result2,
+            # "text1_hate_speech_class":class_1,
+            # "text2_hate_speech_class":class_2,
+            "text1_divided_text2": text1_divided_text2,
+            "similarity_of_text_pair": similarity_of_text_pair,
+        },
+    }
+
+
+def get_statistics_accumulators():
+    return {
+        "number_of_samples": Count(),
+        "number_of_tokens": Sum("number_of_tokens"),
+        "text1_length": Stats("text1_length"),
+        "text2_length": Stats("text2_length"),
+        "text1_divided_text2": Stats("text1_divided_text2"),
+        "similarity_of_text_pair": Stats("similarity_of_text_pair"),
+        "label_distribution": Frequency("label"),
+        "vocabulary": Frequency("words", many=True),
+        "word_male": Sum("word_male"),
+        "word_female": Sum("word_female"),
+        "single_name_male": Sum("single_name_male"),
+        "single_name_female": Sum("single_name_female"),
+        "sample_infos": Head("sample_info", limit=10000),
+    }
+
+
 @text_matching_aggregating(
     name="get_statistics",
     contributor="datalab",
@@ -96,7 +165,8 @@ def get_similarity_by_sacrebleu(text1, text2):
     description="Calculate the overall statistics (e.g., average length) of a given "
     "text pair classification datasets. e,g. natural language inference",
 )
-def get_statistics(samples: Iterator):
+@accumulate(get_statistics_features, get_statistics_accumulators)
+def get_statistics(stats):
     """
         Input:
         samples: [{
@@ -116,122 +186,19 @@ def get_statistics(samples: Iterator):
     print(next(res))
 
     """
-    # for hate speech
-    # from hatesonar import Sonar
-    # sonar = Sonar()
-
-    sample_infos = []
-
-    text1_lengths = []
-    text2_lengths = []
-    labels_to_number = {}
-    vocab = {}
-    number_of_tokens = 0
-    gender_results = []
-    # hatespeech = {
-    #                  "hate_speech":{"ratio":0,"texts":[]},
-    #                     "offensive_language":{"ratio":0,"texts":[]},
-    #                     "neither":{"ratio":0,"texts":[]}}
-    text1_divided_text2 = []
-    similarities = []
-
-    for sample in tqdm(samples):
-
-        text1, text2, label = sample["text1"], sample["text2"], sample["label"]
-
-        similarity_of_text_pair = get_similarity_by_sacrebleu(text1, text2)
-        similarities.append(similarity_of_text_pair)
-
-        # average length of text1
-        text1_length = len(text1.split(" "))
-        text1_lengths.append(text1_length)
-
-        # average length of text2
-        text2_length = len(text2.split(" "))
-        text2_lengths.append(text2_length)
-
-        # text1/text2
-        text1_divided_text2.append(len(text1.split(" ")) / len(text2.split(" ")))
-
-        # label info
-        if label in labels_to_number.keys():
-            labels_to_number[label] += 1
-        else:
-            labels_to_number[label] = 1
-
-        # update the number of tokens
-        number_of_tokens += len(text1.split())
-        number_of_tokens += len(text2.split())
-
-        # Vocabulary info
-        for w in (text1 + text2).split(" "):
-
-            if w in vocab.keys():
-                vocab[w] += 1
-            else:
-                vocab[w] = 1
-
-        # Gender info
-        gender_result1 = get_gender_bias.func(text1)
-        gender_result2 = get_gender_bias.func(text2)
-        gender_results.append(gender_result1["gender_bias_info"])
-        gender_results.append(gender_result2["gender_bias_info"])
-
-        # hataspeech
-        # results = sonar.ping(text=text1)
-        # class_1 = results['top_class']
-        # confidence = 0
-        # for value in results['classes']:
-        #     if value['class_name'] == class_1:
-        #         confidence = value['confidence']
-        #         break
-        #
-        # hatespeech[class_1]["ratio"] += 1
-        # if class_1 != "neither":
-        #     hatespeech[class_1]["texts"].append(text1)
-
-        # results = sonar.ping(text=text2)
-        # class_2 = results['top_class']
-        # confidence = 0
-        # for value in results['classes']:
-        #     if value['class_name'] == class_2:
-        #         confidence = value['confidence']
-        #         break
-        #
-        # hatespeech[class_2]["ratio"] += 1
-        # if class_2 != "neither":
-        #     hatespeech[class_2]["texts"].append(text2)
-
-        sample_info = {
-            "text1": text1,
-            "text2": text2,
-            "label": label,
-            "text1_length": text1_length,
-            "text2_length": text2_length,
-            "text1_gender": gender_result1,
-            "text2_gender": gender_result2,
-            # "text1_hate_speech_class":class_1,
-            # "text2_hate_speech_class":class_2,
-            "text1_divided_text2": len(text1.split(" ")) / len(text2.split(" ")),
-            "similarity_of_text_pair": similarity_of_text_pair,
-        }
-        if len(sample_infos) < 10000:
-            sample_infos.append(sample_info)
     # ------------------ Dataset-level ----------------
     # get vocabulary
+    vocab = stats["vocabulary"]
     vocab_sorted = dict(sorted(vocab.items(), key=lambda item: item[1], reverse=True))
 
     # compute dataset-level gender_ratio
     gender_ratio = {
-        "word": {"male": 0, "female": 0},
-        "single_name": {"male": 0, "female": 0},
+        "word": {"male": stats["word_male"], "female": stats["word_female"]},
+        "single_name": {
+            "male": stats["single_name_male"],
+            "female": stats["single_name_female"],
+        },
     }
-    for result in gender_results:
-        res_word = result["word"]  # noqa
-        gender_ratio["word"]["male"] += result["word"]["male"]
-        gender_ratio["word"]["female"] += result["word"]["female"]
-        gender_ratio["single_name"]["male"] += result["single_name"]["male"]
-        gender_ratio["single_name"]["female"] += result["single_name"]["female"]
 
     n_gender = gender_ratio["word"]["male"] + gender_ratio["word"]["female"]
     if n_gender != 0:
@@ -251,20 +218,19 @@ def get_statistics(samples: Iterator):
         gender_ratio["single_name"]["male"] = 0
         gender_ratio["single_name"]["female"] = 0
 
-    # get ratio of hate_speech:offensive_language:neither
-    # for k,v in hatespeech.items():
-    #     hatespeech[k]["ratio"] /= 2* len(samples)
-
+    labels_to_number = stats["label_distribution"]
+    text1_lengths = stats["text1_length"]
+    text2_lengths = stats["text2_length"]
     res = {
         "dataset-level": {
             "length_info": {
-                "max_text1_length": np.max(text1_lengths),
-                "min_text1_length": np.min(text1_lengths),
-                "average_text1_length": np.average(text1_lengths),
-                "max_text2_length": np.max(text2_lengths),
-                "min_text2_length": np.min(text2_lengths),
-                "average_text2_length": np.average(text2_lengths),
-                "text1_divided_text2": np.average(text1_divided_text2),
+                "max_text1_length": text1_lengths["max"],
+                "min_text1_length": text1_lengths["min"],
+                "average_text1_length": text1_lengths["mean"],
+                "max_text2_length": text2_lengths["max"],
+                "min_text2_length": text2_lengths["min"],
+                "average_text2_length": text2_lengths["mean"],
+                "text1_divided_text2": stats["text1_divided_text2"]["mean"],
             },
             "label_info": {
                 "ratio": min(labels_to_number.values())
@@ -273,13 +239,13 @@ def get_statistics(samples: Iterator):
                 "distribution": labels_to_number,
             },
             "vocabulary_info": vocab_sorted,
-            "number_of_samples": len(samples),
-            "number_of_tokens": number_of_tokens,
+            "number_of_samples": stats["number_of_samples"],
+            "number_of_tokens": stats["number_of_tokens"],
             "gender_info": gender_ratio,
-            "average_similarity": np.average(similarities),
+            "average_similarity": stats["similarity_of_text_pair"]["mean"],
             # "hatespeech_info": hatespeech,
         },
-        "sample-level": sample_infos,
+        "sample-level": stats["sample_infos"],
     }
 
     return res
@@ -1,14 +1,170 @@
+"""Editing operations, i.e. perturbations of texts.
+
+An edit whose function needs expensive state (e.g. a lexicon, compiled
+rules or a spaCy pipeline) declares how to build it once with `setup`:
+
+    @editing(name="add_typo")
+    def add_typo(text, spell_errors, seed=0):
+        ...
+
+    @add_typo.setup
+    def setup_add_typo():
+        return {"spell_errors": load_resource("json", SPELL_ERRORS_PATH)}
+
+The state is built the first time the edit is applied by a process, kept
+for the other calls of this process, and passed to the edit function (and to
+its batch implementation) as keyword arguments.
+
+`Editing.transform` edits a batch of texts. Edits taking a `seed` can be
+seeded per row: the text at position `i` of a dataset is edited with a seed
+derived from the seed of the edit and `i`, so the edited dataset is the same
+whatever the batch size and the number of processes:
+
+    dataset.apply(add_typo.seeded(42), batched=True, num_proc=4)
+"""
+
+import inspect
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
 from operation import text_operation, TextOperation
 
+from datalabs.utils.profiling import profiled
+
+# the state built by the setup function of each edit in this process
+_setup_states: Dict[Callable, Dict[str, Any]] = {}
+_setup_lock = threading.Lock()
+
+
+def row_seed(seed: int, row: int) -> int:
+    """the seed of the row at position `row` of a dataset"""
+    return int(np.random.SeedSequence([seed, row]).generate_state(1)[0])
+
+
+def _takes(func: Optional[Callable], param_name: str) -> bool:
+    return func is not None and param_name in inspect.signature(func).parameters
+
 
 class Editing(TextOperation):
     def __init__(
         self,
         *args,
+        setup_func: Callable[[], Dict[str, Any]] = None,
+        seed: Optional[int] = None,
         **kwargs,
     ):
         super(Editing, self).__init__(*args, **kwargs)
         self._data_type = "TextData"
+        self.setup_func = setup_func
+        self.seed = seed
+        # resolved once instead of at each batch
+        self._takes_seed = _takes(self.func, "seed")
+        self._batch_takes_seeds = _takes(self.batch_func, "seeds")
+
+    def set(self, processed_fields):
+        edit = Editing(
+            name=self.name,
+            func=self.func,
+            resources=self.resources,
+            contributor=self.contributor,
+            task=self.task,
+            description=self.description,
+            processed_fields=processed_fields,
+            batch_func=self.batch_func,
+            setup_func=self.setup_func,
+            seed=self.seed,
+        )
+        edit.tokens_func = self.tokens_func
+        return edit
+
+    def batch(self, batch_func: Callable[..., Any]) -> Callable[..., Any]:
+        self._batch_takes_seeds = _takes(batch_func, "seeds")
+        return super(Editing, self).batch(batch_func)
+
+    def setup(
+        self, setup_func: Callable[[], Dict[str, Any]]
+    ) -> Callable[[], Dict[str, Any]]:
+        """
+        Register the one-time setup of this edit. `setup_func` takes no
+        argument and returns the keyword arguments (e.g. compiled rules)
+        passed to the edit function, it's called once per process.
+        """
+        self.setup_func = setup_func
+        return setup_func
+
+    @property
+    def state(self) -> Dict[str, Any]:
+        """the keyword arguments built by the setup of this edit"""
+        if self.setup_func is None:
+            return {}
+        state = _setup_states.get(self.setup_func)
+        if state is None:
+            with _setup_lock:
+                state = _setup_states.get(self.setup_func)
+                if state is None:
+                    state = self.setup_func()
+                    _setup_states[self.setup_func] = state
+        return state
+
+    def warm_resources(self):
+        super(Editing, self).warm_resources()
+        self.state
+
+    def seeded(self, seed: int) -> "Editing":
+        """a copy of this edit seeding each row of a dataset, see
+        `transform`"""
+        edit = self.set(self.processed_fields)
+        edit.seed = seed
+        return edit
+
+    @profiled(batched=True)
+    def transform(
+        self, texts: List[str], seed: Optional[int] = None, offset: int = 0
+    ) -> Dict[str, List[Any]]:
+        """
+        Parameters
+        texts: a batch of texts
+        seed: the seed of the edit, `self.seed` by default. If it's set, each
+        text is edited with the seed of its row (see `row_seed`), otherwise
+        with the default seed of the edit function
+        offset: the position of the first text in the dataset
+
+        Returns
+        A dict of output columns, computed with the batch implementation of
+        the edit if it has one (and it takes the `seeds` of the rows when they
+        are seeded)
+        """
+        seed = self.seed if seed is None else seed
+        kwargs = {**self.state, **self.resources}
+        seeds = None
+        if seed is not None and self._takes_seed:
+            seeds = [
+                row_seed(seed, offset + position) for position in range(len(texts))
+            ]
+
+        if self.batch_func is not None and (seeds is None or self._batch_takes_seeds):
+            if seeds is not None:
+                kwargs["seeds"] = seeds
+            return self.batch_func(texts, **kwargs)
+
+        columns: Dict[str, List[Any]] = {}
+        for position, text in enumerate(texts):
+            if seeds is not None:
+                kwargs["seed"] = seeds[position]
+            output = self.func(text, **kwargs)
+            if not isinstance(output, dict):
+                output = {self.name: output}
+            for attr_name, value in output.items():
+                columns.setdefault(attr_name, []).append(value)
+        return columns
+
+    def call_batch(self, xs: List[str], offset: int = 0) -> Dict[str, List[Any]]:
+        return self.transform(xs, offset=offset)
+
+    @profiled()
+    def __call__(self, x: str, **kwargs) -> Any:
+        return self.func(x, **self.state, **self.resources, **kwargs)
 
 
 class editing(text_operation):
@@ -1,10 +1,8 @@
 # checklist package for editing
 from checklist.perturb import Perturb
 
-# spacy package for editing
-import spacy
-
 from datalabs.operations.edit.editing import editing
+from datalabs.utils.resource_registry import load_resource, requires_resources
 
 
 @editing(
@@ -14,9 +12,10 @@ from datalabs.operations.edit.editing import editing
     description="strip the punctuation of a given text. For example, "
     "Input: I love this movie. How about you? Output: I love this movie. How about you",
 )
+@requires_resources(("spacy", "en_core_web_sm"))
 def strip_punctuation_checklist(text: str):
 
-    nlp = spacy.load("en_core_web_sm")
+    nlp = load_resource("spacy", "en_core_web_sm")
     pdata = nlp(text)
     return {"text_strip_punctuation": Perturb.strip_punctuation(pdata)}
 
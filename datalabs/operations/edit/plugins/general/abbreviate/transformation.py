@@ -1,12 +1,10 @@
-import json
 import os
 import os.path
 import random
 import sys
 
-import spacy
-
 from datalabs.operations.edit.editing import editing
+from datalabs.utils.resource_registry import load_resource, requires_resources
 
 sys.path.append(
     os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../../"))
@@ -19,18 +17,17 @@ sys.path.append(
     task="Any",
     description="Replaces a word or phrase with its abbreviated counterpart",
 )
+@requires_resources(("spacy", "en_core_web_sm"))
 def abbreviate(text, prob=0.5, seed=0, max_outputs=1):
     scriptpath = os.path.dirname(__file__)
-    with open(
-        os.path.join(scriptpath, "../../../resources/phrase_abbrev_dict.json"), "r"
-    ) as file:
-        phrase_abbrev_dict = json.loads(file.read())
-    with open(
-        os.path.join(scriptpath, "../../../resources/word_abbrev_dict.json"), "r"
-    ) as file:
-        word_abbrev_dict = json.loads(file.read())
-
-    spacy_nlp = spacy.load("en_core_web_sm")
+    phrase_abbrev_dict = load_resource(
+        "json", os.path.join(scriptpath, "../../../resources/phrase_abbrev_dict.json")
+    )
+    word_abbrev_dict = load_resource(
+        "json", os.path.join(scriptpath, "../../../resources/word_abbrev_dict.json")
+    )
+
+    spacy_nlp = load_resource("spacy", "en_core_web_sm")
     random.seed(seed)
     transf = []
     for _ in range(max_outputs):
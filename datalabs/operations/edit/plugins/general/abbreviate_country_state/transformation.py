@@ -1,11 +1,11 @@
 from collections import defaultdict
-import json
 import os
 import random
 import re
 import sys
 
 from datalabs.operations.edit.editing import editing
+from datalabs.utils.resource_registry import load_resource
 
 sys.path.append(
     os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../../"))
@@ -42,8 +42,7 @@ def abbreviate_country_state(
         "../../../resources/country_state_abbreviation.json",
     )
 
-    with open(abbr_file_path, "r") as file:
-        abbr_json = json.loads(file.read())
+    abbr_json = load_resource("json", abbr_file_path)
 
     country_abbr = {country["name"]: country["abbr"] for country in abbr_json}
     country_exp = {country["abbr"]: country["name"] for country in abbr_json}
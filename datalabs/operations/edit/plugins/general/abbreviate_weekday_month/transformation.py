@@ -1,9 +1,9 @@
-import json
 import os
 import re
 import sys
 
 from datalabs.operations.edit.editing import editing
+from datalabs.utils.resource_registry import load_resource
 
 sys.path.append(
     os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../../"))
@@ -46,11 +46,9 @@ def abbreviate_weekday_month(text: str, max_outputs=1):
         "../../../resources/weekday_month_exp_en.json",
     )
 
-    with open(abbreviations_path, "r") as file:
-        abbreviations = json.loads(file.read())
+    abbreviations = load_resource("json", abbreviations_path)
 
-    with open(expansions_path, "r") as file:
-        expansions = json.loads(file.read())
+    expansions = load_resource("json", expansions_path)
 
     perturbed_texts = weekday_month_abbreviate(
         text=text,
@@ -1,9 +1,9 @@
-import json
 import os
 import random
 import sys
 
 from datalabs.operations.edit.editing import editing
+from datalabs.utils.resource_registry import load_resource
 
 sys.path.append(
     os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../../"))
@@ -16,28 +16,27 @@ Base Class for implementing the different input transformations
 """
 
 
+SPELL_ERRORS_PATH = os.path.join(
+    os.path.dirname(__file__), "../../../resources/spell_errors.json"
+)
+
+
 def generate_sentence(sentence, spell_errors, prob_of_typo, seed):
+    # a generator of its own, reseeded for each word, so the edit neither
+    # depends on nor changes the global random state
+    rng = random.Random()
     output = []
     for word in sentence.split():
-        random.seed(seed)
-        if (
-            word.lower() in list(spell_errors.keys())
-            and random.choice(range(0, 100)) <= prob_of_typo
-        ):
-            output.append(random.choice(spell_errors[word.lower()]))
+        rng.seed(seed)
+        if word.lower() in spell_errors and rng.choice(range(0, 100)) <= prob_of_typo:
+            output.append(rng.choice(spell_errors[word.lower()]))
         else:
             output.append(word)
     output = " ".join(output)
     return output
 
 
-def generate_sentences(text, prob=0.1, seed=0, max_outputs=1):
-
-    scriptpath = os.path.dirname(__file__)
-    with open(
-        os.path.join(scriptpath, "../../../resources/spell_errors.json"), "r"
-    ) as file:
-        spell_errors = json.loads(file.read())
+def generate_sentences(text, spell_errors, prob=0.1, seed=0, max_outputs=1):
 
     prob_of_typo = int(prob * 100)
 
@@ -54,10 +53,11 @@ def generate_sentences(text, prob=0.1, seed=0, max_outputs=1):
     task="Any",
     description="this function adds a typo into a text",
 )
-def add_typo(text: str, seed=0, max_outputs=2):
+def add_typo(text: str, spell_errors, seed=0, max_outputs=2):
 
     perturbed_texts = generate_sentences(
         text=text,
+        spell_errors=spell_errors,
         prob=0.20,
         seed=seed,
         max_outputs=max_outputs,
@@ -66,6 +66,11 @@ def add_typo(text: str, seed=0, max_outputs=2):
     return {"text_add_typo": perturbed_texts[0]}
 
 
+@add_typo.setup
+def setup_add_typo():
+    return {"spell_errors": load_resource("json", SPELL_ERRORS_PATH)}
+
+
 # sentence = "Andrew finally returned the French book to Chris that I bought last week"
 # perturbed = add_typo(text=sentence)
 # print(perturbed)
@@ -1,8 +1,8 @@
-import json
 import os.path
 import sys
 
 from datalabs.operations.edit.editing import editing
+from datalabs.utils.resource_registry import load_resource
 
 sys.path.append(
     os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../../"))
@@ -27,14 +27,12 @@ def britishize_americanize(text: str):
     """
 
     scriptpath = os.path.dirname(__file__)
-    with open(
-        os.path.join(scriptpath, "../../../resources/american_spellings.json"), "r"
-    ) as file:
-        american_spellings_dict = json.loads(file.read())
-    with open(
-        os.path.join(scriptpath, "../../../resources/british_spellings.json"), "r"
-    ) as file:
-        british_spellings_dict = json.loads(file.read())
+    american_spellings_dict = load_resource(
+        "json", os.path.join(scriptpath, "../../../resources/american_spellings.json")
+    )
+    british_spellings_dict = load_resource(
+        "json", os.path.join(scriptpath, "../../../resources/british_spellings.json")
+    )
 
     # Creating a custom vocab dictionary consisting of totally different
     # words for same context
@@ -3,9 +3,8 @@ import os
 import random
 import sys
 
-import spacy
-
 from datalabs.operations.edit.editing import editing
+from datalabs.utils.resource_registry import load_resource, requires_resources
 
 sys.path.append(
     os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../../"))
@@ -79,9 +78,10 @@ def create_ents_dict(doc):
     "a sentence with instances of less populous and less"
     " well-known cities.",
 )
+@requires_resources(("spacy", "en_core_web_sm"))
 def change_city_name(text: str, seed=None):
 
-    spacy_nlp = spacy.load("en_core_web_sm")
+    spacy_nlp = load_resource("spacy", "en_core_web_sm")
     doc = spacy_nlp(text)
 
     scriptpath = os.path.dirname(__file__)
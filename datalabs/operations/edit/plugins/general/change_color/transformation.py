@@ -1,4 +1,3 @@
-import json
 import os
 import random
 import sys
@@ -7,6 +6,7 @@ import nltk
 from nltk.tokenize.treebank import TreebankWordDetokenizer
 
 from datalabs.operations.edit.editing import editing
+from datalabs.utils.resource_registry import load_resource
 
 sys.path.append(
     os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../../"))
@@ -30,8 +30,9 @@ def get_(big_list, small_list):
 def change_color(text: str, max_outputs=1, seed=0, mapping: dict = None):
 
     scriptpath = os.path.dirname(__file__)
-    with open(os.path.join(scriptpath, "../../../resources/colors.json"), "r") as file:
-        colors_dict = json.loads(file.read())
+    colors_dict = load_resource(
+        "json", os.path.join(scriptpath, "../../../resources/colors.json")
+    )
 
     color_names = [color["name"] for color in colors_dict.values()]
 
@@ -42,11 +43,8 @@ def change_color(text: str, max_outputs=1, seed=0, mapping: dict = None):
 
     # Detokenize sentence
     detokenizer = TreebankWordDetokenizer()
-    try:
-        words = nltk.word_tokenize(text)
-    except LookupError:
-        nltk.download("punkt")
-        words = nltk.word_tokenize(text)
+    load_resource("nltk", "tokenizers/punkt")
+    words = nltk.word_tokenize(text)
     text = detokenizer.detokenize(words)
 
     # Detect colors in a given sentence
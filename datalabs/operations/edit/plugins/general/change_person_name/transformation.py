@@ -2,9 +2,9 @@ import os
 import sys
 
 from checklist.perturb import Perturb
-import spacy
 
 from datalabs.operations.edit.editing import editing
+from datalabs.utils.resource_registry import load_resource, requires_resources
 
 sys.path.append(
     os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../../"))
@@ -17,9 +17,10 @@ sys.path.append(
     task="Any",
     description="Changes person named entities",
 )
+@requires_resources(("spacy", "en_core_web_sm"))
 def change_person_name(text: str, max_outputs=1):
 
-    spacy_nlp = spacy.load("en_core_web_sm")
+    spacy_nlp = load_resource("spacy", "en_core_web_sm")
     perturbed = Perturb.perturb([spacy_nlp(text)], Perturb.change_names, nsamples=1)
 
     # print(perturbed.data)
@@ -1,10 +1,8 @@
-import json
 import os
 import sys
 
-import spacy
-
 from datalabs.operations.edit.editing import editing
+from datalabs.utils.resource_registry import load_resource, requires_resources
 
 sys.path.append(
     os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../../"))
@@ -17,15 +15,15 @@ sys.path.append(
     task="Any",
     description="This transformation perturbs text to correct common misspellings",
 )
+@requires_resources(("spacy", "en_core_web_sm"))
 def correct_typo(text: str):
 
     scriptpath = os.path.dirname(__file__)
-    with open(
-        os.path.join(scriptpath, "../../../resources/spell_corrections.json"), "r"
-    ) as file:
-        COMMON_MISSPELLINGS_DICT = json.loads(file.read())
+    COMMON_MISSPELLINGS_DICT = load_resource(
+        "json", os.path.join(scriptpath, "../../../resources/spell_corrections.json")
+    )
 
-    spacy_nlp = spacy.load("en_core_web_sm")
+    spacy_nlp = load_resource("spacy", "en_core_web_sm")
 
     doc = spacy_nlp(text)
 
@@ -1,10 +1,10 @@
-import json
 import os
 import random
 import sys
 from typing import List
 
 from datalabs.operations.edit.editing import editing
+from datalabs.utils.resource_registry import load_resource
 
 sys.path.append(
     os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../../"))
@@ -64,11 +64,9 @@ def emojify(
         os.path.dirname(os.path.abspath(__file__)), "../../../resources/text2icon.json"
     )
 
-    with open(text2emoji_path, "r") as file:
-        text2emoji = json.loads(file.read())
+    text2emoji = load_resource("json", text2emoji_path)
 
-    with open(text2icon_path, "r") as file:
-        text2icon = json.loads(file.read())
+    text2icon = load_resource("json", text2icon_path)
 
     perturbed_texts = emoji2icon(
         text=text,
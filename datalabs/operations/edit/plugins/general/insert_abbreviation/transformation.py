@@ -4,6 +4,7 @@ import sys
 import grammaire
 
 from datalabs.operations.edit.editing import editing
+from datalabs.utils.resource_registry import load_resource
 
 sys.path.append(
     os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../../"))
@@ -31,18 +32,11 @@ def load_rules(file):
 )
 def insert_abbreviation(
     text: str,
+    grammar_en,
     max_outputs=1,
     seed=0,
 ):
 
-    current_path = os.path.realpath(__file__).replace(
-        os.path.basename(__file__), "../../../resources/"
-    )
-    rulefile_en = f"{current_path}replacement_rules_en.txt"
-    rules_en = load_rules(rulefile_en)
-    # First we compile our rules...
-    grammar_en = grammaire.compile(rules_en)
-
     results = grammaire.parse(text, grammar_en)
     # We now replace the strings with their label
     perturbed_texts = text
@@ -62,6 +56,16 @@ def insert_abbreviation(
     return {"text_insert_abbreviation": perturbed_texts}
 
 
+@insert_abbreviation.setup
+def setup_insert_abbreviation():
+    current_path = os.path.realpath(__file__).replace(
+        os.path.basename(__file__), "../../../resources/"
+    )
+    rulefile_en = f"{current_path}replacement_rules_en.txt"
+    # the rules are compiled once per process
+    return {"grammar_en": load_resource("grammaire", rulefile_en)}
+
+
 # sentence = "Make sure you've gone online to download one of
 # the vouchers - it's definitely not worth paying full price for!"
 # perturbed = insert_abbreviation(text=sentence)
@@ -2,35 +2,30 @@ import os
 import random
 import sys
 
-from checklist.editor import Editor
 import numpy as np
-import spacy
 
 from datalabs.operations.edit.editing import editing
+from datalabs.utils.resource_registry import load_resource, requires_resources
+from datalabs.utils.spacy_loader import spacy_loader
 
 sys.path.append(
     os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../../"))
 )
 
 
-@editing(
-    name="replace_hypernyms",
-    contributor="xl_augmenter",
-    task="Any",
-    description=" This operation makes lexical substitutions using"
-    " hypernyms of the common nouns in a sentence when possible.",
-)
-def replace_hypernyms(text: str, n=1, seed=0, max_outputs=1):
-    nlp = spacy.load("en_core_web_sm")
-    editor = Editor()
+# the pos tags (token.pos_) are set by the tagger and the attribute_ruler
+SPACY_DISABLE = ("parser", "ner", "lemmatizer")
+
+
+def replace_hypernyms_doc(text: str, doc, n=1, seed=0, max_outputs=1):
+    editor = load_resource("checklist_editor")
 
     np.random.seed(seed)
     words = []
     perturbed_texts = []
-    tokens = nlp(text)
     # Shuffle the tokens list so that all noun (and not just the beginning nouns)
     # have a fair chance at being picked.
-    shuf_tokens = list(tokens)
+    shuf_tokens = list(doc)
     random.seed(0)  # To get the same output as in test.json
     random.shuffle(shuf_tokens)
     for token in shuf_tokens:
@@ -38,17 +33,54 @@ def replace_hypernyms(text: str, n=1, seed=0, max_outputs=1):
             words.append(token)
             hyp_list = editor.hypernyms(text, token.text)
             for hyp in hyp_list:
-                # Replace the noun with the hyponym
+                # Replace the noun with the hypernym
                 perturbed_texts.append(text.replace(token.text, hyp))
             if len(perturbed_texts) >= max_outputs:
                 break
     perturbed_texts = (
         perturbed_texts[:max_outputs] if len(perturbed_texts) > 0 else [text]
     )
+    return perturbed_texts
+
+
+@editing(
+    name="replace_hypernyms",
+    contributor="xl_augmenter",
+    task="Any",
+    description=" This operation makes lexical substitutions using"
+    " hypernyms of the common nouns in a sentence when possible.",
+)
+@requires_resources(("spacy", "en_core_web_sm"), ("checklist_editor",))
+def replace_hypernyms(text: str, n=1, seed=0, max_outputs=1):
+    nlp = load_resource("spacy", "en_core_web_sm")
+
+    tokens = nlp(text, disable=SPACY_DISABLE)
+    perturbed_texts = replace_hypernyms_doc(
+        text, tokens, n=n, seed=seed, max_outputs=max_outputs
+    )
     # return perturbed_texts
     return {"text_replace_hypernyms": perturbed_texts[0]}
 
 
+@replace_hypernyms.batch
+def replace_hypernyms_batch(
+    texts, n=1, seed=0, max_outputs=1, batch_size=256, n_process=1
+):
+    docs = spacy_loader.pipe(
+        texts,
+        "en_core_web_sm",
+        disable=SPACY_DISABLE,
+        batch_size=batch_size,
+        n_process=n_process,
+    )
+    return {
+        "text_replace_hypernyms": [
+            replace_hypernyms_doc(text, doc, n=n, seed=seed, max_outputs=max_outputs)[0]
+            for text, doc in zip(texts, docs)
+        ]
+    }
+
+
 # sentence = "Andrew finally returned the French book to Chris that I bought last week."
 # perturbed = replace_hypernyms(text=sentence)
 # print(perturbed)
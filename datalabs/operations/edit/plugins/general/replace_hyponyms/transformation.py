@@ -2,35 +2,30 @@ import os
 import random
 import sys
 
-from checklist.editor import Editor
 import numpy as np
-import spacy
 
 from datalabs.operations.edit.editing import editing
+from datalabs.utils.resource_registry import load_resource, requires_resources
+from datalabs.utils.spacy_loader import spacy_loader
 
 sys.path.append(
     os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../../"))
 )
 
 
-@editing(
-    name="replace_hyponyms",
-    contributor="xl_augmenter",
-    task="Any",
-    description="This operation makes lexical substitutions using hyponyms "
-    "of the common nouns in a sentence when possible",
-)
-def replace_hyponyms(text: str, n=1, seed=0, max_outputs=1):
-    nlp = spacy.load("en_core_web_sm")
-    editor = Editor()
+# the pos tags (token.pos_) are set by the tagger and the attribute_ruler
+SPACY_DISABLE = ("parser", "ner", "lemmatizer")
+
+
+def replace_hyponyms_doc(text: str, doc, n=1, seed=0, max_outputs=1):
+    editor = load_resource("checklist_editor")
 
     np.random.seed(seed)
     words = []
     perturbed_texts = []
-    tokens = nlp(text)
     # Shuffle the tokens list so that all noun (and not just the beginning nouns)
     # have a fair chance at being picked.
-    shuf_tokens = list(tokens)
+    shuf_tokens = list(doc)
     random.seed(0)  # To get the same output as in test.json
     random.shuffle(shuf_tokens)
     for token in shuf_tokens:
@@ -45,9 +40,45 @@ def replace_hyponyms(text: str, n=1, seed=0, max_outputs=1):
     perturbed_texts = (
         perturbed_texts[:max_outputs] if len(perturbed_texts) > 0 else [text]
     )
+    return perturbed_texts
 
-    return {"text_replace_hyponyms": perturbed_texts[0]}
+
+@editing(
+    name="replace_hyponyms",
+    contributor="xl_augmenter",
+    task="Any",
+    description="This operation makes lexical substitutions using hyponyms "
+    "of the common nouns in a sentence when possible",
+)
+@requires_resources(("spacy", "en_core_web_sm"), ("checklist_editor",))
+def replace_hyponyms(text: str, n=1, seed=0, max_outputs=1):
+    nlp = load_resource("spacy", "en_core_web_sm")
+
+    tokens = nlp(text, disable=SPACY_DISABLE)
+    perturbed_texts = replace_hyponyms_doc(
+        text, tokens, n=n, seed=seed, max_outputs=max_outputs
+    )
     # return perturbed_texts
+    return {"text_replace_hyponyms": perturbed_texts[0]}
+
+
+@replace_hyponyms.batch
+def replace_hyponyms_batch(
+    texts, n=1, seed=0, max_outputs=1, batch_size=256, n_process=1
+):
+    docs = spacy_loader.pipe(
+        texts,
+        "en_core_web_sm",
+        disable=SPACY_DISABLE,
+        batch_size=batch_size,
+        n_process=n_process,
+    )
+    return {
+        "text_replace_hyponyms": [
+            replace_hyponyms_doc(text, doc, n=n, seed=seed, max_outputs=max_outputs)[0]
+            for text, doc in zip(texts, docs)
+        ]
+    }
 
 
 # sentence = "Andrew finally returned the French book to Chris that I bought last week."
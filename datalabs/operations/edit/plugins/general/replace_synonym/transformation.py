@@ -2,12 +2,11 @@ import os
 import re
 import sys
 
-import nltk
 from nltk.corpus import wordnet
 import numpy as np
-import spacy
 
 from datalabs.operations.edit.editing import editing
+from datalabs.utils.resource_registry import load_resource
 
 sys.path.append(
     os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../../"))
@@ -32,17 +31,13 @@ def untokenize(words):
     return step6.strip()
 
 
-@editing(
-    name="replace_synonym",
-    contributor="xl_augmenter",
-    task="Any",
-    description="Inserting synonyms of random words excluding"
-    " punctuations and stopwords.",
-)
-def replace_synonym(text, seed=42, prob=0.5, max_outputs=1):
-    nlp = spacy.load("en_core_web_sm")
-    nltk.download("wordnet")
-    np.random.seed(seed)
+# the pos tags (token.pos_) are set by the tagger and the attribute_ruler
+SPACY_DISABLE = ("parser", "ner", "lemmatizer")
+
+
+def replace_synonym_doc(doc, seed=42, prob=0.5, max_outputs=1):
+    # same draws as seeding the global generator, without changing it
+    rng = np.random.RandomState(seed)
     upos_wn_dict = {
         "VERB": "v",
         "NOUN": "n",
@@ -50,7 +45,6 @@ def replace_synonym(text, seed=42, prob=0.5, max_outputs=1):
         "ADJ": "s",
     }
 
-    doc = nlp(text)
     results = []
     for _ in range(max_outputs):
         result = []
@@ -63,8 +57,8 @@ def replace_synonym(text, seed=42, prob=0.5, max_outputs=1):
                 syns = wordnet.synsets(word, pos=wn_pos)
                 syns = [syn.name().split(".")[0] for syn in syns]
                 syns = [syn for syn in syns if syn.lower() != word.lower()]
-                if len(syns) > 0 and np.random.random() < prob:
-                    result.append(np.random.choice(syns).replace("_", " "))
+                if len(syns) > 0 and rng.random_sample() < prob:
+                    result.append(rng.choice(syns).replace("_", " "))
                 else:
                     result.append(word)
 
@@ -74,10 +68,59 @@ def replace_synonym(text, seed=42, prob=0.5, max_outputs=1):
             # make sure there is no dup in results
             results.append(result)
 
+    return results
+
+
+@editing(
+    name="replace_synonym",
+    contributor="xl_augmenter",
+    task="Any",
+    description="Inserting synonyms of random words excluding"
+    " punctuations and stopwords.",
+)
+def replace_synonym(text, nlp, seed=42, prob=0.5, max_outputs=1):
+    doc = nlp(text, disable=SPACY_DISABLE)
+    results = replace_synonym_doc(doc, seed=seed, prob=prob, max_outputs=max_outputs)
+
     return {"text_replace_synonym": results[0]}
     # return results
 
 
+@replace_synonym.batch
+def replace_synonym_batch(
+    texts,
+    nlp,
+    seed=42,
+    prob=0.5,
+    max_outputs=1,
+    batch_size=256,
+    n_process=1,
+    seeds=None,
+):
+    """`seeds`: the seed of each text, `seed` for all of them by default"""
+    docs = nlp.pipe(
+        texts,
+        disable=list(SPACY_DISABLE),
+        batch_size=batch_size,
+        n_process=n_process,
+    )
+    seeds = seeds or [seed] * len(texts)
+    return {
+        "text_replace_synonym": [
+            replace_synonym_doc(doc, seed=doc_seed, prob=prob, max_outputs=max_outputs)[
+                0
+            ]
+            for doc, doc_seed in zip(docs, seeds)
+        ]
+    }
+
+
+@replace_synonym.setup
+def setup_replace_synonym():
+    load_resource("nltk", "corpora/wordnet")
+    return {"nlp": load_resource("spacy", "en_core_web_sm")}
+
+
 # sentence = "The hooligans in balaclavas have attempted to steal jewellery."
 # perturbed = replace_synonym(text=sentence)
 # print(perturbed)
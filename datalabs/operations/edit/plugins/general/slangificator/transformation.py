@@ -3,9 +3,8 @@ import os
 import random
 import sys
 
-import spacy
-
 from datalabs.operations.edit.editing import editing
+from datalabs.utils.resource_registry import load_resource, requires_resources
 
 sys.path.append(
     os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../../"))
@@ -72,6 +71,7 @@ def slangifyPoS(
     " nouns, adjectives, and adverbs) of the original text with their"
     " corresponding slang. ",
 )
+@requires_resources(("spacy", "en_core_web_sm"))
 def slangificator(
     text,
     probReplaceNoun=1.0,
@@ -82,7 +82,7 @@ def slangificator(
 ):
     pathDic = os.path.dirname(os.path.abspath(__file__))
 
-    nlp = spacy.load("en_core_web_sm")  # get an instance of the tokenizer
+    nlp = load_resource("spacy", "en_core_web_sm")  # get an instance of the tokenizer
 
     # Load dictionaries
     fin = open(os.path.join(pathDic, "../../../resources/Slang_Nouns.txt"), "r")
@@ -1,4 +1,42 @@
-from datalabs.operations.featurize.general import *  # noqa
-from datalabs.operations.featurize.nlp_featurize import nlp_featurizing  # noqa
-from datalabs.operations.featurize.summarization import *  # noqa
-from datalabs.operations.featurize.text_classification import *  # noqa
+"""Featurizing operations.
+
+The submodules are imported the first time one of their operations is
+accessed (PEP 562), so e.g. `from datalabs.operations.featurize import
+get_length` doesn't import the dependencies of the summarization features.
+`from datalabs.operations.featurize import *` imports all of them.
+"""
+
+import importlib
+
+# in the order of the former star imports of this package
+_SUBMODULES = ("general", "nlp_featurize", "summarization", "text_classification")
+# names defined by several submodules, the last star import used to win
+_DEFINED_IN = {"get_features_sample_level": "text_classification"}
+
+
+def _import(submodule: str):
+    # not relative to __name__, this package is also importable as `featurize`
+    return importlib.import_module(f"datalabs.operations.featurize.{submodule}")
+
+
+def __getattr__(name: str):
+    if name == "__all__":
+        names = {}
+        for submodule in _SUBMODULES:
+            module = _import(submodule)
+            names.update(
+                (attr_name, None)
+                for attr_name in dir(module)
+                if not attr_name.startswith("_")
+            )
+        return list(names)
+
+    if name.startswith("__"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if name in _DEFINED_IN:
+        return getattr(_import(_DEFINED_IN[name]), name)
+    for submodule in _SUBMODULES:
+        module = _import(submodule)
+        if hasattr(module, name):
+            return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,28 +1,26 @@
-from typing import List
+from typing import Dict, List
 
 # pre_model_basic_words = load_pre_model(os.path.join(os.path.dirname(__file__),
 #                                                     './pre_models/basic_words.pkl'))
-# pip install lexicalrichness
-from lexicalrichness import LexicalRichness
-
-# nltk package for featurizing
-import nltk
-
-# spacy package for featurizing
-import spacy
-
 from datalabs.operations.featurize.featurizing import featurizing
 
 # pretrained models
 from datalabs.operations.featurize.utils.util_model import (
     BASIC_WORDS,
-    load_gender_bias_data,
+    BASIC_WORDS_LEXICON,
 )
+from datalabs.utils.resource_registry import load_resource, requires_resources
+from datalabs.utils.spacy_loader import spacy_loader
 
 # from hatesonar import Sonar
 # sonar = Sonar()
 # print(pre_model_basic_words)
 
+# spacy pipeline components that are not needed by entity recognition and
+# pos tagging, they are skipped to speed up the processing
+SPACY_NER_DISABLE = ("tagger", "parser", "attribute_ruler", "lemmatizer")
+SPACY_POSTAG_DISABLE = ("parser", "ner", "lemmatizer")
+
 
 @featurizing(
     name="get_length",
@@ -43,43 +41,90 @@ def get_length(text: str) -> str:
     # return
 
 
+@get_length.batch
+def get_length_batch(texts: List[str]) -> Dict[str, List[int]]:
+    return {"length": [len(text.split(" ")) for text in texts]}
+
+
+@get_length.tokens
+def get_length_tokens(tokens) -> Dict:
+    import pyarrow.compute as pc
+
+    return {"length": pc.list_value_length(tokens)}
+
+
 @featurizing(
     name="get_entities_spacy",
     contributor="spacy",
     task="Any",
     description="Extract entities of a given text by using spacy library.",
 )
+@requires_resources(("spacy", "en_core_web_sm"))
 def get_entities_spacy(text: str) -> List[str]:
 
-    nlp = spacy.load("en_core_web_sm")  # this should be pre-reloaded
-    doc = nlp(text)
+    nlp = load_resource("spacy", "en_core_web_sm")  # this should be pre-reloaded
+    doc = nlp(text, disable=SPACY_NER_DISABLE)
     entities = [(ent.text, ent.label_) for ent in doc.ents]
     return {"entities": entities}
     # return entities
 
 
+@get_entities_spacy.batch
+def get_entities_spacy_batch(
+    texts: List[str], batch_size: int = 256, n_process: int = 1
+) -> Dict[str, List]:
+    docs = spacy_loader.pipe(
+        texts,
+        "en_core_web_sm",
+        disable=SPACY_NER_DISABLE,
+        batch_size=batch_size,
+        n_process=n_process,
+    )
+    return {"entities": [[(ent.text, ent.label_) for ent in doc.ents] for doc in docs]}
+
+
 @featurizing(
     name="get_postag_spacy",
     contributor="spacy",
     task="Any",
     description="Part-of-speech tagging of a given text by using spacy library.",
 )
+@requires_resources(("spacy", "en_core_web_sm"))
 def get_postag_spacy(text: str) -> List[str]:
 
-    nlp = spacy.load("en_core_web_sm")  # this should be pre-reloaded
-    doc = nlp(text)
+    nlp = load_resource("spacy", "en_core_web_sm")  # this should be pre-reloaded
+    doc = nlp(text, disable=SPACY_POSTAG_DISABLE)
     # token_postags = [(token.text, token.tag_) for token in doc]
     tokens = [token.text for token in doc]
     tags = [token.tag_ for token in doc]
     return {"tokens": tokens, "pos_tags": tags}
 
 
+@get_postag_spacy.batch
+def get_postag_spacy_batch(
+    texts: List[str], batch_size: int = 256, n_process: int = 1
+) -> Dict[str, List]:
+    docs = spacy_loader.pipe(
+        texts,
+        "en_core_web_sm",
+        disable=SPACY_POSTAG_DISABLE,
+        batch_size=batch_size,
+        n_process=n_process,
+    )
+    tokens, tags = [], []
+    for doc in docs:
+        tokens.append([token.text for token in doc])
+        tags.append([token.tag_ for token in doc])
+    return {"tokens": tokens, "pos_tags": tags}
+
+
 @featurizing(
     name="get_postag_nltk",
     contributor="nltk",
     task="Any",
     description="Part-of-speech tagging of a given text by " "using NLTK library",
 )
+@requires_resources(("nltk", "taggers/averaged_perceptron_tagger"))
 def get_postag_nltk(text: str) -> List:
     """
     Package: nltk.pos_tag
@@ -91,10 +136,7 @@ def get_postag_nltk(text: str) -> List:
 
     from nltk import pos_tag
 
-    try:
-        nltk.pos_tag([])
-    except LookupError:
-        nltk.download("averaged_perceptron_tagger")
+    load_resource("nltk", "taggers/averaged_perceptron_tagger")
 
     token_tag_tuples = pos_tag(text.split(" "))
     tokens = [xx[0] for xx in token_tag_tuples]
@@ -118,20 +160,25 @@ def get_basic_words(sentence: str):
     if BASIC_WORDS is None:
         raise ValueError("basic word dictionary is none")
 
-    value_list = sentence.split(" ")
+    value_list = sentence.lower().split(" ")
     n_words = len(value_list)
-    n_basic_words = 0
-
-    for word in value_list:
-
-        lower = word.lower()
-        if lower in BASIC_WORDS:
-            n_basic_words = n_basic_words + 1
+    n_basic_words = BASIC_WORDS_LEXICON.count(value_list)
 
     return {"basic_word_ratio": n_basic_words * 1.0 / n_words}
     # return n_basic_words*1.0/n_words
 
 
+@get_basic_words.batch
+def get_basic_words_batch(sentences: List[str]) -> Dict[str, List[float]]:
+    n_basic_words = BASIC_WORDS_LEXICON.count_batch(sentences, lower=True)
+    return {
+        "basic_word_ratio": [
+            n * 1.0 / len(sentence.split(" "))
+            for n, sentence in zip(n_basic_words, sentences)
+        ]
+    }
+
+
 @featurizing(
     name="get_lexical_richness",
     contributor="lexicalrichness",
@@ -160,7 +207,13 @@ def get_lexical_richness(sentence: str):
         return {"lexical_diversity": results}
 
 
-gendered_dic = load_gender_bias_data()
+def __getattr__(name: str):
+    # the gender bias data is only loaded when it's used (PEP 562)
+    if name == "gendered_dic":
+        return load_resource("gender_bias_data")
+    if name == "gender_lexicons":
+        return load_resource("gender_lexicons")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 @featurizing(
@@ -169,20 +222,31 @@ gendered_dic = load_gender_bias_data()
     task="Any",
     description="Calculate the number of man/women tokens of a given text",
 )
+@requires_resources(("gender_lexicons",))
 def get_gender_bias(sentence: str):
 
     # if gendered_dic is None:
     #     gendered_dic = load_gender_bias_data()
 
-    one_words_results = get_gender_bias_one_word(
-        gendered_dic["words"]["male"],
-        gendered_dic["words"]["female"],
-        gendered_dic["single_name"]["male"],
-        gendered_dic["single_name"]["female"],
-        sentence,
-    )
+    one_words_results = get_gender_bias_one_word(sentence)
+
+    # return results
+    return {"gender_bias_info": _gender_bias_info(one_words_results)}
+
+
+@get_gender_bias.batch
+def get_gender_bias_batch(sentences: List[str]) -> Dict[str, List]:
+    columns = load_resource("gender_lexicons").count_batch(sentences, lower=True)
+    return {
+        "gender_bias_info": [
+            _gender_bias_info(dict(zip(columns.keys(), counts)))
+            for counts in zip(*columns.values())
+        ]
+    }
+
 
-    results = {
+def _gender_bias_info(one_words_results):
+    return {
         "word": {
             "male": one_words_results["words_m"],
             "female": one_words_results["words_f"],
@@ -193,33 +257,14 @@ def get_gender_bias(sentence: str):
         },
     }
 
-    # return results
-    return {"gender_bias_info": results}
-
-
-def get_gender_bias_one_word(words_m, words_f, single_name_m, single_name_f, sentence):
-    words_sentence = sentence.lower().split(" ")
 
-    results = {
-        "words_m": 0,
-        "words_f": 0,
-        "single_name_m": 0,
-        "single_name_f": 0,
-    }
-    for value in words_sentence:
-        if value in words_m:
-            results["words_m"] += 1
-
-        if value in words_f:
-            results["words_f"] += 1
-
-        if value in single_name_m:
-            results["single_name_m"] += 1
-
-        if value in single_name_f:
-            results["single_name_f"] += 1
-
-    return results
+def get_gender_bias_one_word(sentence, lexicons=None):
+    """
+    number of male/female words and first names in a sentence, the counts
+    are keyed by words_m, words_f, single_name_m and single_name_f
+    """
+    lexicons = lexicons or load_resource("gender_lexicons")
+    return lexicons.count(sentence.lower().split(" "))
 
 
 """
@@ -236,12 +281,16 @@ res = dataset['test'].apply(get_features_sample_level, mode = "memory")
     task="Any",
     description="calculate a set of features for general text",
 )
+@requires_resources(("gender_lexicons",))
 def get_features_sample_level(text: str):
 
     # for hate speech
     # from hatesonar import Sonar
     # sonar = Sonar()
 
+    # pip install lexicalrichness
+    from lexicalrichness import LexicalRichness
+
     # text length
     length = len(text.split(" "))
 
@@ -261,25 +310,14 @@ def get_features_sample_level(text: str):
     if BASIC_WORDS is None:
         raise ValueError("basic word dictionary is none")
 
-    value_list = text.split(" ")
+    value_list = text.lower().split(" ")
     n_words = len(value_list)
-    n_basic_words = 0
-
-    for word in value_list:
-        lower = word.lower()
-        if lower in BASIC_WORDS:
-            n_basic_words = n_basic_words + 1
+    n_basic_words = BASIC_WORDS_LEXICON.count(value_list)
 
     basic_words = n_basic_words * 1.0 / n_words if n_words != 0 else float(0)
 
     # Gender bias
-    one_words_results = get_gender_bias_one_word(
-        gendered_dic["words"]["male"],
-        gendered_dic["words"]["female"],
-        gendered_dic["single_name"]["male"],
-        gendered_dic["single_name"]["female"],
-        text,
-    )
+    one_words_results = get_gender_bias_one_word(text)
 
     # # # hataspeech
     # hatespeech = {}
@@ -2,19 +2,22 @@
 using compare_mt https://github.com/neulab/compare-mt for ROUGE
 """
 
-from typing import List
+from collections import Counter
+from functools import lru_cache, partial
+from multiprocessing import Pool
+import re
+from typing import Dict, List, Sequence, Union
 
-from compare_mt.rouge.rouge_scorer import RougeScorer
 from nltk import sent_tokenize, word_tokenize
 import numpy as np
 
-scorer = RougeScorer(["rouge1", "rouge2"], use_stemmer=True)
-_scorer = RougeScorer(["rouge1"], use_stemmer=True)
+from datalabs.utils.resource_registry import load_resource
 
 
 def compute_rouge(cand, ref):
     ref = sent_tokenize(ref)
     cand = sent_tokenize(cand)
+    scorer = load_resource("rouge_scorer", ("rouge1", "rouge2"), True)
     score = scorer.score("\n".join(ref), "\n".join(cand))
     rouge1 = score["rouge1"].fmeasure
     rouge2 = score["rouge2"].fmeasure
@@ -24,6 +27,7 @@ def compute_rouge(cand, ref):
 def _compute_rouge(cand, ref):
     ref = sent_tokenize(ref)
     cand = sent_tokenize(cand)
+    scorer = load_resource("rouge_scorer", ("rouge1", "rouge2"), True)
     score = scorer.score("\n".join(ref), "\n".join(cand))
     return score["rouge1"].fmeasure
 
@@ -136,3 +140,241 @@ def _lead_k(src: List[str], ref: str, sim_fn, k: int = 3):
     #
     # res = _lead_k(document, summary, _compute_rouge, k = 3)
     # print(res)
+
+
+_NON_ALPHANUMERIC = re.compile(r"[^a-z0-9]+")
+_ALPHANUMERIC = re.compile(r"^[a-z0-9]+$")
+
+
+@lru_cache(maxsize=2**16)
+def _stem(token: str) -> str:
+    scorer = load_resource("rouge_scorer", ("rouge1", "rouge2"), True)
+    return scorer._stemmer.stem(token)
+
+
+def _rouge_tokenize(text: str, use_stemmer: bool = True) -> List[str]:
+    """the tokens of `RougeScorer`, with memoized stemming"""
+    tokens = _NON_ALPHANUMERIC.sub(" ", text.lower()).split()
+    if use_stemmer:
+        tokens = [_stem(x) if len(x) > 3 else x for x in tokens]
+    return [x for x in tokens if _ALPHANUMERIC.match(x)]
+
+
+def _get_ngrams(tokens: List[str], n: int) -> Counter:
+    return Counter(tuple(tokens[i : i + n]) for i in range(len(tokens) - n + 1))
+
+
+class _OracleState:
+    """
+    The n-gram counts of an extractive summary of one sample and their
+    overlap with the reference. The sentences of the source are tokenized
+    once, and adding (or scoring the addition of) a sentence only looks at
+    the n-grams of this sentence, including the ones spanning its boundary
+    with the summary.
+    """
+
+    def __init__(self, oracle: "RougeOracle", src: List[str], ref: str):
+        self.oracle = oracle
+        self.sents = [_rouge_tokenize(x, oracle.use_stemmer) for x in src]
+        ref_tokens = _rouge_tokenize(ref, oracle.use_stemmer)
+        self.ref_ngrams = {n: _get_ngrams(ref_tokens, n) for n in oracle.orders}
+        self.ref_totals = {n: max(len(ref_tokens) - n + 1, 0) for n in oracle.orders}
+        self.sent_ngrams = [
+            {n: _get_ngrams(tokens, n) for n in oracle.orders} for tokens in self.sents
+        ]
+        self.ngrams = {n: Counter() for n in oracle.orders}
+        self.totals = {n: 0 for n in oracle.orders}
+        self.overlaps = {n: 0 for n in oracle.orders}
+        # the last tokens of the summary, for the n-grams spanning sentences
+        self.tail = []
+
+    def _added_ngrams(self, index: int, n: int) -> Counter:
+        added = self.sent_ngrams[index][n]
+        if n > 1 and len(self.tail) > 0:
+            bridge = self.tail[-(n - 1) :] + self.sents[index][: n - 1]
+            added = added + _get_ngrams(bridge, n)
+        return added
+
+    def _overlap_delta(self, added: Counter, n: int) -> int:
+        ref_ngrams = self.ref_ngrams[n]
+        ngrams = self.ngrams[n]
+        delta = 0
+        for ngram, count in added.items():
+            ref_count = ref_ngrams.get(ngram, 0)
+            if ref_count > 0:
+                before = ngrams[ngram]
+                delta += min(before + count, ref_count) - min(before, ref_count)
+        return delta
+
+    def score(self, index: int = None) -> float:
+        """the score of the summary, after adding the sentence `index` to it
+        if it's given"""
+        fmeasures = []
+        for n in self.oracle.orders:
+            total, overlap = self.totals[n], self.overlaps[n]
+            if index is not None:
+                added = self._added_ngrams(index, n)
+                total += sum(added.values())
+                overlap += self._overlap_delta(added, n)
+            precision = overlap / max(total, 1)
+            recall = overlap / max(self.ref_totals[n], 1)
+            if precision + recall > 0:
+                fmeasures.append(2 * precision * recall / (precision + recall))
+            else:
+                fmeasures.append(0.0)
+        return self.oracle.combine(fmeasures)
+
+    def add(self, index: int):
+        for n in self.oracle.orders:
+            added = self._added_ngrams(index, n)
+            self.overlaps[n] += self._overlap_delta(added, n)
+            self.totals[n] += sum(added.values())
+            self.ngrams[n].update(added)
+        self.tail = (self.tail + self.sents[index])[-self.oracle.max_order :]
+
+
+class RougeOracle:
+    """
+    Extractive oracle and lead-k summaries scored with ROUGE, giving the same
+    results as `_ext_oracle` and `_lead_k` with `_compute_rouge` (rouge1) or
+    `compute_rouge` (rouge1 and rouge2) as similarity function. ROUGE is
+    updated incrementally while sentences are added to the summary instead of
+    re-scoring the whole summary for every candidate sentence.
+
+    rouge_types: ("rouge1",), ("rouge2",) or ("rouge1", "rouge2"), the
+    harmonic mean of the f-measures is used for the latter
+    use_stemmer: whether the tokens are stemmed, as in `RougeScorer`
+    """
+
+    def __init__(self, rouge_types: Sequence[str] = ("rouge1",), use_stemmer=True):
+        if len(rouge_types) not in [1, 2]:
+            raise ValueError(f"unsupported rouge types {rouge_types}")
+        self.rouge_types = tuple(rouge_types)
+        self.orders = [int(rouge_type[5:]) for rouge_type in rouge_types]
+        self.max_order = max(self.orders)
+        self.use_stemmer = use_stemmer
+
+    def combine(self, fmeasures: List[float]) -> float:
+        if len(fmeasures) == 1:
+            return fmeasures[0]
+        return 2 * fmeasures[0] * fmeasures[1] / (fmeasures[0] + fmeasures[1] + 1e-20)
+
+    def ext_oracle(
+        self,
+        src: List[str],
+        ref: str,
+        max_sent: int = 3,
+        max_len: int = -1,
+        threshold: int = -1,
+    ) -> Dict:
+        """same as `_ext_oracle`"""
+        src = [x.strip() for x in src]
+        ref = ref.strip()
+        if len(src) == 0:
+            src = ["#"]
+        if len(ref) == 0:
+            ref = "#"
+        labels = [0] * len(src)
+        state = _OracleState(self, src, ref)
+        # add the first sentence
+        scores = [state.score(i) for i in range(len(src))]
+        max_id = np.argmax(scores)
+        # updating
+        max_score = scores[max_id]
+        oracle = [src[max_id]]
+        labels[max_id] = 1
+        state.add(max_id)
+        # iterative search
+        max_sent = len(src) if max_sent < 0 else min(max_sent, len(src))
+        threshold = 0 if threshold < 0 else threshold
+        cands = [i for i in range(len(src)) if i != max_id]
+        while len(oracle) < max_sent:
+            if max_len > 0 and len(word_tokenize(" ".join(oracle))) > max_len:
+                break
+            scores = [state.score(i) for i in cands]
+            max_id = np.argmax(scores)
+            if scores[max_id] - max_score < threshold:
+                break
+            max_score = scores[max_id]
+            oracle.append(src[cands[max_id]])
+            labels[cands[max_id]] = 1
+            state.add(cands[max_id])
+            del cands[max_id]
+        return {
+            "source": src,
+            "reference": ref,
+            "oracle_summary": oracle,
+            "oracle_labels": labels,
+            "oracle_score": max_score,
+        }
+
+    def lead_k(self, src: List[str], ref: str, k: int = 3) -> Dict:
+        """same as `_lead_k`"""
+        src = [x.strip() for x in src]
+        doc = src
+        ref = ref.strip()
+        if len(src) == 0:
+            src = ["#"]
+        if len(ref) == 0:
+            ref = "#"
+        src = src[:k]
+        state = _OracleState(self, src, ref)
+        for i in range(len(src)):
+            state.add(i)
+
+        return {
+            "source": doc,
+            "reference": ref,
+            "lead_k_summary": src,
+            "lead_k_score": state.score(),
+        }
+
+    def _ext_oracle_sample(self, sample, **kwargs) -> Dict:
+        src, ref = sample
+        if isinstance(src, str):
+            src = sent_tokenize(src)
+        return self.ext_oracle(src, ref, **kwargs)
+
+    def _lead_k_sample(self, sample, **kwargs) -> Dict:
+        src, ref = sample
+        if isinstance(src, str):
+            src = sent_tokenize(src)
+        return self.lead_k(src, ref, **kwargs)
+
+    def _map(self, fn, documents, summaries, num_workers: int) -> List[Dict]:
+        if num_workers > 1:
+            with Pool(processes=num_workers) as pool:
+                return list(pool.imap(fn, zip(documents, summaries), chunksize=64))
+        return [fn(sample) for sample in zip(documents, summaries)]
+
+    def ext_oracle_batch(
+        self,
+        documents: List[Union[str, List[str]]],
+        summaries: List[str],
+        num_workers: int = 1,
+        **kwargs,
+    ) -> List[Dict]:
+        """
+        extractive oracles of several samples
+        documents: the source documents, either split into sentences or not
+        summaries: the reference summaries
+        num_workers: number of processes
+        kwargs: the arguments of `ext_oracle`
+        """
+        fn = partial(self._ext_oracle_sample, **kwargs)
+        return self._map(fn, documents, summaries, num_workers)
+
+    def lead_k_batch(
+        self,
+        documents: List[Union[str, List[str]]],
+        summaries: List[str],
+        num_workers: int = 1,
+        **kwargs,
+    ) -> List[Dict]:
+        """lead-k summaries of several samples, see `ext_oracle_batch`"""
+        fn = partial(self._lead_k_sample, **kwargs)
+        return self._map(fn, documents, summaries, num_workers)
+
+
+# oracle scored like `_compute_rouge`
+rouge1_oracle = RougeOracle(("rouge1",))
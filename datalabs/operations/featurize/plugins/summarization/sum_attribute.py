@@ -1,14 +1,16 @@
 # %%
-from collections import Counter, namedtuple
+from bisect import bisect_left
+from collections import Counter, defaultdict, namedtuple
+from typing import Optional
 
-import nltk
 from nltk import sent_tokenize, word_tokenize
 from nltk.util import ngrams
 
-try:
-    nltk.data.find("tokenizers/punkt")
-except LookupError:
-    nltk.download("punkt")
+from datalabs.utils.resource_registry import load_resource
+
+# maximum number of positions of the text visited at each position of the
+# summary by `SUMAttribute.overlap`
+MAX_CANDIDATES = 128
 
 
 class SUMAttribute:
@@ -26,6 +28,9 @@ class SUMAttribute:
 
     Match = namedtuple("Match", ("summary", "text", "length"))
 
+    def __init__(self, max_candidates: Optional[int] = MAX_CANDIDATES):
+        self.max_candidates = max_candidates
+
     def __call__(self, texts, summaries):
         """texts: a list of source documents.
         summaries: a list of generated summaries.
@@ -50,6 +55,8 @@ class SUMAttribute:
 
     def cal_attributes_each(self, text, summary):
 
+        load_resource("nltk", "tokenizers/punkt")
+
         # Normalize text
         tokenized_text = word_tokenize(text)
         tokenized_summary = word_tokenize(summary)
@@ -70,10 +77,13 @@ class SUMAttribute:
             # Compression
             compression = len(tokenized_text) / summary_len
 
+        # the sentences of the lower-cased summary are tokenized only once
+        # for both repetition and novelty
+        summary_sents = self.tokenize_sents(summary)
         # Repetition
-        repetition = self.cal_repetition(summary)
+        repetition = self._cal_repetition(summary_sents)
         # Novelty
-        novelty = self.cal_novelty(text, summary)
+        novelty = self._cal_novelty(self.tokenize_sents(text), summary_sents)
 
         # Copy length
         copy_lens = [o.length for o in matches]
@@ -92,12 +102,16 @@ class SUMAttribute:
             "attr_hypothesis_len": len(normalized_summary),
         }
 
+    def tokenize_sents(self, doc):
+        """the word-tokenized sentences of the lower-cased document"""
+        return [word_tokenize(sent) for sent in sent_tokenize(doc.lower())]
+
     def get_ngrams(self, doc, n):
-        doc = doc.lower()
-        doc_sents = sent_tokenize(doc)
+        return self._get_ngrams(self.tokenize_sents(doc), n)
+
+    def _get_ngrams(self, sents, n):
         _ngrams = []
-        for sent in doc_sents:
-            sent = word_tokenize(sent)
+        for sent in sents:
             _ngrams.extend(list(ngrams(sent, n=n)))
         return _ngrams
 
@@ -106,10 +120,15 @@ class SUMAttribute:
         appeared in source documents.
         The segments can be instantiated as n-grams.
         """
+        return self._cal_novelty(
+            self.tokenize_sents(text), self.tokenize_sents(summary), n=n
+        )
+
+    def _cal_novelty(self, text_sents, summary_sents, n=2):
         cnt_all = 0
         cnt_nov = 0
-        _ngrams_text = self.get_ngrams(text, n=n)
-        _ngrams_summary = self.get_ngrams(summary, n=n)
+        _ngrams_text = self._get_ngrams(text_sents, n=n)
+        _ngrams_summary = self._get_ngrams(summary_sents, n=n)
         counter_text = Counter(_ngrams_text)
         counter_summary = Counter(_ngrams_summary)
         for k, v in counter_summary.items():
@@ -124,9 +143,12 @@ class SUMAttribute:
     def cal_repetition(self, summary, n=3):
         """Measures the rate of repeated segments in summaries.
         We choose n-gram as segment unit."""
+        return self._cal_repetition(self.tokenize_sents(summary), n=n)
+
+    def _cal_repetition(self, summary_sents, n=3):
         cnt_all = 0
         cnt_rep = 0
-        _ngrams = self.get_ngrams(summary, n=n)
+        _ngrams = self._get_ngrams(summary_sents, n=n)
         counter = Counter(_ngrams)
         for k, v in counter.items():
             cnt_all += v
@@ -144,37 +166,58 @@ class SUMAttribute:
             - summary (int): the start index of the match in the summary
             - text (int): the start index of the match in the reference
             - length (int): the length of the extractive fragment
+        The fragments are the ones of the greedy scan of Newsroom: at each
+        position of the summary, the text is scanned from its start, a match
+        resuming the scan at its end, and the first longest match is taken.
+        Only the positions of the text holding the token of the summary are
+        visited, found in an index of the positions of each token, and at most
+        `max_candidates` of them (None for all of them), so that the time is
+        linear in the lengths of the text and the summary even for the tokens
+        frequent in the text. The scan also stops at a match reaching the end
+        of the summary, which can't be beaten.
         """
+        positions = defaultdict(list)
+        for b_start, token in enumerate(b):
+            positions[token].append(b_start)
+
         matches = []
         a_start = 0
-        b_start = 0
         while a_start < len(a):
             best_match = None
             best_match_length = 0
-            while b_start < len(b):
-                if a[a_start] == b[b_start]:
-                    a_end = a_start
-                    b_end = b_start
-                    while a_end < len(a) and b_end < len(b) and b[b_end] == a[a_end]:
-                        b_end += 1
-                        a_end += 1
-                    length = a_end - a_start
-                    if length > best_match_length:
-                        best_match = SUMAttribute.Match(a_start, b_start, length)
-                        best_match_length = length
-                    b_start = b_end
-                else:
-                    b_start += 1
-            b_start = 0
+            candidates = positions.get(a[a_start], [])
+            index = 0
+            n_visited = 0
+            while index < len(candidates) and (
+                self.max_candidates is None or n_visited < self.max_candidates
+            ):
+                n_visited += 1
+                b_start = candidates[index]
+                a_end = a_start
+                b_end = b_start
+                while a_end < len(a) and b_end < len(b) and b[b_end] == a[a_end]:
+                    b_end += 1
+                    a_end += 1
+                length = a_end - a_start
+                if length > best_match_length:
+                    best_match = SUMAttribute.Match(a_start, b_start, length)
+                    best_match_length = length
+                    if a_end == len(a):
+                        break
+                # the text positions within the match are skipped
+                index = bisect_left(candidates, b_end, index + 1)
             if best_match:
-                if best_match_length > 0:
-                    matches.append(best_match)
+                matches.append(best_match)
                 a_start += best_match_length
             else:
                 a_start += 1
         return matches
 
 
+# shared by the summarization featurizing operations, it holds no state
+sum_attribute = SUMAttribute()
+
+
 # if __name__ == "__main__":
 #     sum_class = SUMAttribute()
 #     summary = [
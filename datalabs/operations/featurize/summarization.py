@@ -8,12 +8,10 @@ from datalabs.operations.featurize.general import (
     get_features_sample_level as get_features_sample_level_general,
 )
 from datalabs.operations.featurize.plugins.summarization.extractive_methods import (
-    _compute_rouge,
-    _ext_oracle,
-    _lead_k,
+    rouge1_oracle,
 )
 from datalabs.operations.featurize.plugins.summarization.sum_attribute import (
-    SUMAttribute,
+    sum_attribute,
 )
 from datalabs.operations.operation import dataset_operation, DatasetOperation
 
@@ -85,6 +83,39 @@ class summarization_featurizing(featurizing, dataset_operation):
             return tf_cls
 
 
+# the attributes of `SUMAttribute`, all computed by one pass over a sample
+SUM_ATTRIBUTES = tuple(sum_attribute.get_schema())
+
+
+@summarization_featurizing(
+    name="get_sum_attributes",
+    contributor="datalab",
+    task="summarization",
+    description="Calculate the attributes of a summary (density, coverage, "
+    "compression, repetition, novelty, copy length) at once, to be read by "
+    "the features of the following stages of a pipeline",
+)
+def get_sum_attributes(sample: dict):
+    return sum_attribute.cal_attributes_each(sample["text"], sample["summary"])
+
+
+def sum_attributes(sample: dict) -> Dict[str, float]:
+    """
+    the attributes of a sample, read from the sample if `get_sum_attributes`
+    added them (as a previous stage of a pipeline, or applied to the dataset
+    before), e.g.
+
+        pipeline = Pipeline()
+        pipeline.add(get_sum_attributes, output=False)
+        pipeline.add(get_density).add(get_coverage).add(get_novelty)
+
+    otherwise computed for this feature only
+    """
+    if all(name in sample for name in SUM_ATTRIBUTES):
+        return {name: sample[name] for name in SUM_ATTRIBUTES}
+    return sum_attribute.cal_attributes_each(sample["text"], sample["summary"])
+
+
 @summarization_featurizing(
     name="get_density",
     contributor="datalab",
@@ -93,10 +124,7 @@ class summarization_featurizing(featurizing, dataset_operation):
     "covers the content in the source text.",
 )
 def get_density(sample: dict):
-    summary_attribute = SUMAttribute()
-    attribute_info = summary_attribute.cal_attributes_each(
-        sample["text"], sample["summary"]
-    )
+    attribute_info = sum_attributes(sample)
     return {"density": attribute_info["attr_density"]}
 
 
@@ -108,10 +136,7 @@ def get_density(sample: dict):
     "the content in the source text.",
 )
 def get_coverage(sample: dict):
-    summary_attribute = SUMAttribute()
-    attribute_info = summary_attribute.cal_attributes_each(
-        sample["text"], sample["summary"]
-    )
+    attribute_info = sum_attributes(sample)
     return {"coverage": attribute_info["attr_coverage"]}
 
 
@@ -123,10 +148,7 @@ def get_coverage(sample: dict):
     " source text to the generated summary.",
 )
 def get_compression(sample: dict):
-    summary_attribute = SUMAttribute()
-    attribute_info = summary_attribute.cal_attributes_each(
-        sample["text"], sample["summary"]
-    )
+    attribute_info = sum_attributes(sample)
     return {"compression": attribute_info["attr_compression"]}
 
 
@@ -138,10 +160,7 @@ def get_compression(sample: dict):
     "summaries. The segments are instantiated as trigrams.",
 )
 def get_repetition(sample: dict):
-    summary_attribute = SUMAttribute()
-    attribute_info = summary_attribute.cal_attributes_each(
-        sample["text"], sample["summary"]
-    )
+    attribute_info = sum_attributes(sample)
     return {"repetition": attribute_info["attr_repetition"]}
 
 
@@ -154,10 +173,7 @@ def get_repetition(sample: dict):
     "are instantiated as bigrams.",
 )
 def get_novelty(sample: dict):
-    summary_attribute = SUMAttribute()
-    attribute_info = summary_attribute.cal_attributes_each(
-        sample["text"], sample["summary"]
-    )
+    attribute_info = sum_attributes(sample)
     return {"novelty": attribute_info["attr_novelty"]}
 
 
@@ -169,10 +185,7 @@ def get_novelty(sample: dict):
     "copied from source document.",
 )
 def get_copy_len(sample: dict):
-    summary_attribute = SUMAttribute()
-    attribute_info = summary_attribute.cal_attributes_each(
-        sample["text"], sample["summary"]
-    )
+    attribute_info = sum_attributes(sample)
     return {"copy_len": attribute_info["attr_copy_len"]}
 
 
@@ -184,10 +197,7 @@ def get_copy_len(sample: dict):
     " coverage, compression, repetition, novelty, copy lenght)",
 )
 def get_all_features(sample: dict):
-    summary_attribute = SUMAttribute()
-    attribute_info = summary_attribute.cal_attributes_each(
-        sample["text"], sample["summary"]
-    )
+    attribute_info = sum_attributes(sample)
     return {
         "density": attribute_info["attr_density"],
         "coverage": attribute_info["attr_coverage"],
@@ -217,10 +227,21 @@ def get_oracle_summary(sample: dict) -> Dict:
     """
     document = sent_tokenize(sample["text"])  # List
     summary = sample["summary"]
-    oracle_info = _ext_oracle(document, summary, _compute_rouge, max_sent=3)
+    oracle_info = rouge1_oracle.ext_oracle(document, summary, max_sent=3)
     return oracle_info
 
 
+@get_oracle_summary.batch
+def get_oracle_summary_batch(samples: List[dict], num_workers: int = 1) -> Dict:
+    oracle_infos = rouge1_oracle.ext_oracle_batch(
+        [sample["text"] for sample in samples],
+        [sample["summary"] for sample in samples],
+        num_workers=num_workers,
+        max_sent=3,
+    )
+    return {key: [info[key] for info in oracle_infos] for key in oracle_infos[0]}
+
+
 #
 #
 #
@@ -243,10 +264,21 @@ def get_lead_k_summary(sample: dict) -> Dict:
     """
     document = sent_tokenize(sample["text"])  # List
     summary = sample["summary"]
-    lead_k_info = _lead_k(document, summary, _compute_rouge, k=3)
+    lead_k_info = rouge1_oracle.lead_k(document, summary, k=3)
     return lead_k_info
 
 
+@get_lead_k_summary.batch
+def get_lead_k_summary_batch(samples: List[dict], num_workers: int = 1) -> Dict:
+    lead_k_infos = rouge1_oracle.lead_k_batch(
+        [sample["text"] for sample in samples],
+        [sample["summary"] for sample in samples],
+        num_workers=num_workers,
+        k=3,
+    )
+    return {key: [info[key] for info in lead_k_infos] for key in lead_k_infos[0]}
+
+
 def get_schema_of_sample_level_features():
     return {
         "text_length": 1,
@@ -1,5 +1,15 @@
 import inspect
-from typing import Any, Callable, Mapping, Optional
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from datalabs.utils.profiling import profiled
+from datalabs.utils.resource_registry import get_required_resources, resource_registry
+
+
+def _takes_self(func: Optional[Callable]) -> bool:
+    try:
+        return func is not None and "self" in inspect.getfullargspec(func).args
+    except TypeError:
+        return False
 
 
 class OperationFunction:
@@ -12,13 +22,18 @@ class OperationFunction:
         processed_fields=["text"],
         task="Any",
         description=None,
+        batch_func: Callable[..., Any] = None,
     ):
         self.name = name
         self.func = func
+        # resolved once instead of at each call
+        self._takes_self = _takes_self(func)
         self.resources = resources or {}
         self.contributor = contributor
         self._type = self.__class__.__name__
         self.task = task
+        self.batch_func = batch_func
+        self.tokens_func = None
 
         self.processed_fields = ["text"]
         if isinstance(processed_fields, str):
@@ -33,15 +48,98 @@ class OperationFunction:
 
     def set(self, processed_fields):
         # print(self._type)
-        return OperationFunction(
+        operation = OperationFunction(
             name=self.name,
             func=self.func,
             resources=self.resources,
             contributor=self.contributor,
             description=self.description,
             processed_fields=processed_fields,
+            batch_func=self.batch_func,
         )
+        operation.tokens_func = self.tokens_func
+        return operation
+
+    def batch(self, batch_func: Callable[..., Any]) -> Callable[..., Any]:
+        """
+        Register a columnar implementation of this operation, e.g.
+
+            @get_length.batch
+            def get_length_batch(texts):
+                return {"length": [len(text.split(" ")) for text in texts]}
+
+        `batch_func` receives a list of values of the processed field
+        (plus the operation's resources) and returns a dict mapping each
+        generated attribute to a list with one value per input.
+        """
+        self.batch_func = batch_func
+        return batch_func
 
+    def tokens(self, tokens_func: Callable[..., Any]) -> Callable[..., Any]:
+        """
+        Register an implementation of this operation on the tokens of the
+        processed field, e.g.
+
+            @get_length.tokens
+            def get_length_tokens(tokens):
+                return {"length": pc.list_value_length(tokens)}
+
+        `tokens_func` receives the tokens (`str.split(" ")`) of a batch of
+        texts as an arrow list array, read from the token cache of the
+        dataset (see `datalabs.utils.token_cache`), and returns a dict
+        mapping each generated attribute to the values of the batch. It's
+        used instead of `batch_func` when the operation is applied with
+        ``batched=True`` to a dataset whose tokens can be cached.
+        """
+        self.tokens_func = tokens_func
+        return tokens_func
+
+    @profiled(batched=True)
+    def call_tokens(self, tokens) -> Dict[str, List[Any]]:
+        columns = self.tokens_func(tokens, **self.resources)
+        return {
+            attr_name: values.to_pylist() if hasattr(values, "to_pylist") else values
+            for attr_name, values in columns.items()
+        }
+
+    @property
+    def required_resources(self) -> List[Tuple]:
+        """The resources, e.g. ("spacy", "en_core_web_sm"), declared by the
+        function with `requires_resources`"""
+        return get_required_resources(self.func)
+
+    def warm_resources(self):
+        resource_registry.warm(self.required_resources)
+
+    @property
+    def supports_batch(self) -> bool:
+        return self.batch_func is not None
+
+    @profiled(batched=True)
+    def call_batch(self, xs: List[Any], offset: int = 0) -> Dict[str, List[Any]]:
+        """
+        Parameters
+        xs: a list of inputs, e.g., the values of a text column
+        offset: the position of the first input in the dataset, e.g. to seed
+        edits per row (see `Editing.transform`)
+
+        Returns
+        A dict of output columns. Operations without a columnar
+        implementation are run row by row and the outputs are transposed.
+        """
+        if self.batch_func is not None:
+            return self.batch_func(xs, **self.resources)
+
+        columns: Dict[str, List[Any]] = {}
+        for x in xs:
+            output = self(x)
+            if not isinstance(output, dict):
+                output = {self.name: output}
+            for attr_name, value in output.items():
+                columns.setdefault(attr_name, []).append(value)
+        return columns
+
+    @profiled()
     def __call__(self, x: str) -> Any:  # str?
         """
         Parameters
@@ -51,8 +149,7 @@ class OperationFunction:
         Transformed Text
         """
         # return self.func(x, **self.resources)
-        # print(inspect.getfullargspec(self.func))
-        if "self" not in inspect.getfullargspec(self.func).args:
+        if not self._takes_self:
             return self.func(x, **self.resources)
         else:
             cls_obj = self.resources["cls"]
@@ -0,0 +1,160 @@
+"""Pipelines of operations computed with one pass over a dataset.
+
+Chaining operations with `Dataset.apply` scans the dataset once per
+operation, and each operation recomputes what the previous ones already
+computed (e.g. the tokens of the texts). A pipeline composes preprocessing,
+featurizing, editing and aggregating operations instead:
+
+    pipeline = Pipeline()
+    pipeline.add(tokenize, output=False)
+    pipeline.add(get_length, field="text_tokenized")
+    pipeline.add(get_statistics, prefix="avg")
+    dataset = dataset.apply(pipeline, num_proc=4)
+
+The stages form a DAG through the fields they read: each stage reads columns
+of the dataset or columns generated by the stages added before it. The
+dataset is processed batch by batch (one shard per task if `num_proc > 1`):
+each batch goes through all the stages, the columns generated by a stage are
+added to the batch for the following stages, and the aggregating stages
+update their accumulators (see `datalabs.operations.aggregate.accumulate`)
+with the rows of the batch. Only the columns of the stages with
+`output=True` are written to the resulting dataset.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from datalabs.operations.aggregate.engine import Accumulator, get_accumulators
+
+# operations applied to one field of the samples, the other ones are applied
+# to whole samples
+FIELD_OPERATION_TYPES = ("Editing", "Featurizing", "OperationFunction", "Preprocessing")
+
+
+class Stage:
+    """
+    An operation of a pipeline
+
+    Parameters
+    field: the field the operation is applied to, the processed field of the
+    operation by default (operations on whole samples don't have one)
+    prefix: prefix of the names of the generated columns or statistics
+    output: whether the generated columns are written to the dataset, or
+    only used by the following stages
+    """
+
+    def __init__(self, operation, field: Optional[str] = None, prefix="", output=True):
+        self.operation = operation
+        self.prefix = prefix
+        self.output = output
+        self.is_aggregating = operation._type.find("Aggregating") != -1
+        if self.is_aggregating:
+            plan = get_accumulators(operation.func)
+            if plan is None:
+                raise ValueError(
+                    f"{operation.name} doesn't declare its accumulators,"
+                    f" it can't be computed by a pipeline"
+                )
+            self.features, self.accumulators = plan
+            self.field = None
+        elif operation._type in FIELD_OPERATION_TYPES:
+            self.field = field or operation.processed_fields[0]
+        else:
+            self.field = None
+
+    @property
+    def name(self) -> str:
+        return self.operation.name
+
+    def prefixed(self, attr_name: str) -> str:
+        return self.prefix + "_" + attr_name if self.prefix != "" else attr_name
+
+    def __eq__(self, other) -> bool:
+        return (
+            isinstance(other, Stage)
+            and self.operation is other.operation
+            and (self.field, self.prefix) == (other.field, other.prefix)
+        )
+
+
+class Pipeline:
+    """
+    A DAG of operations computed with one pass over a dataset, see
+    `Dataset.apply`
+
+    Parameters
+    operations: the operations of the first stages, applied to their
+    processed fields
+    """
+
+    def __init__(self, operations: Optional[List] = None):
+        self.stages: List[Stage] = []
+        for operation in operations or []:
+            self.add(operation)
+
+    def add(
+        self, operation, field: Optional[str] = None, prefix="", output=True
+    ) -> "Pipeline":
+        """
+        add a stage, after the ones it reads the columns of (see `Stage`).
+        An operation already applied to the same field is only computed once.
+        """
+        stage = Stage(operation, field=field, prefix=prefix, output=output)
+        for previous in self.stages:
+            if previous == stage:
+                previous.output = previous.output or output
+                return self
+        self.stages.append(stage)
+        return self
+
+    @property
+    def transforms(self) -> List[Stage]:
+        """the stages generating columns, in order"""
+        return [stage for stage in self.stages if not stage.is_aggregating]
+
+    @property
+    def aggregations(self) -> List[Stage]:
+        return [stage for stage in self.stages if stage.is_aggregating]
+
+    def warm_resources(self):
+        for stage in self.stages:
+            stage.operation.warm_resources()
+
+    def new_accumulators(self) -> List[Dict[str, Accumulator]]:
+        return [stage.accumulators() for stage in self.aggregations]
+
+    def update(self, accumulators: List[Dict[str, Accumulator]], samples: List[Dict]):
+        """update the accumulators of the aggregating stages with samples"""
+        steps = [
+            (stage.features, list(stage_accumulators.values()))
+            for stage, stage_accumulators in zip(self.aggregations, accumulators)
+        ]
+        for sample in samples:
+            for features, stage_accumulators in steps:
+                values = features(sample)
+                for accumulator in stage_accumulators:
+                    accumulator.update(values)
+
+    @staticmethod
+    def merge(
+        accumulators: List[Dict[str, Accumulator]],
+        partial: List[Dict[str, Accumulator]],
+    ):
+        """merge the accumulators of a following shard"""
+        for stage_accumulators, stage_partial in zip(accumulators, partial):
+            for name, accumulator in stage_accumulators.items():
+                accumulator.merge(stage_partial[name])
+
+    def results(self, accumulators: List[Dict[str, Accumulator]]) -> Dict[str, Any]:
+        """the statistics computed by the aggregating stages"""
+        results = {}
+        for stage, stage_accumulators in zip(self.aggregations, accumulators):
+            stats = {
+                name: accumulator.result()
+                for name, accumulator in stage_accumulators.items()
+            }
+            result = stage.operation.func(stats, **stage.operation.resources)
+            results.update(
+                (stage.prefixed(attr_name), value)
+                for attr_name, value in result.items()
+            )
+        return results
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 # nltk package for preprocessing
 import nltk
@@ -121,3 +121,17 @@ def tokenize(
 
     tokenizer = get_tokenizer(tokenizer_name, task_type, language)
     return {"text_tokenized": " ".join(tokenizer(text))}
+
+
+@tokenize.batch
+def tokenize_batch(
+    texts: List[str],
+    tokenizer_name: Optional[str] = None,
+    task_type: str = None,
+    language: str = None,
+) -> Dict[str, List[str]]:
+    import pyarrow.compute as pc
+
+    tokenizer = get_tokenizer(tokenizer_name, task_type, language)
+    tokens = tokenizer.tokenize_batch(texts)
+    return {"text_tokenized": pc.binary_join(tokens, " ").to_pylist()}
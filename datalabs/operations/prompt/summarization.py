@@ -2,6 +2,7 @@ from typing import Any, Callable, List, Mapping, Optional
 
 from datalabs.operations.operation import dataset_operation, DatasetOperation
 from datalabs.operations.prompt.prompting import Prompting, prompting
+from datalabs.utils.profiling import profiled
 
 
 class SummarizationPrompting(Prompting, DatasetOperation):
@@ -35,6 +36,7 @@ class SummarizationPrompting(Prompting, DatasetOperation):
         self._data_type = "Dataset"
         self.template = template
 
+    @profiled()
     def __call__(self, sample) -> Any:  # str?
         """
         Parameters
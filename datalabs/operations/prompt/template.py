@@ -0,0 +1,129 @@
+"""Prompt templates compiled once and rendered over whole arrow columns.
+
+The prompts of a dataset (`DatasetInfo.prompts`) are templates such as
+
+    "{{text}} \\n\\nWhich section of a newspaper would this article likely
+    appear in? ||| \\n{{answers[label]}}"
+
+where the part before `|||` gives the prompted text and the part after it the
+prompted answer, `{{field}}` being replaced by the value of a field of the
+sample and `{{answers[label]}}` by the (first) answer of the label of the
+sample. The prompted answer is null for the samples whose label has no answer
+(e.g. -1 for the unlabeled ones). A `PromptTemplate` parses the template once
+into the literals and the slots of each part, then renders a batch of samples
+given as an arrow table with one `binary_join_element_wise` per part, the
+answers being looked up with one `take` over the label column:
+
+    template = PromptTemplate(prompt["template"], answer_choices=answers)
+    columns = template.render(table)  # {"prompted_text": ..., "prompted_answer": ...}
+"""
+
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+SLOT_PATTERN = re.compile(r"\{\{(.*?)\}\}")
+ANSWER_SLOT = "answers[label]"
+LABEL_FIELD = "label"
+
+# kinds of the parts of a template
+LITERAL, FIELD, ANSWER = "literal", "field", "answer"
+
+
+def parse_template(template: str) -> List[Tuple[str, str]]:
+    """the (kind, value) parts of a template, e.g. ("literal", "Topic: "),
+    ("field", "text") or ("answer", "answers[label]")"""
+    parts = []
+    position = 0
+    for match in SLOT_PATTERN.finditer(template):
+        if match.start() > position:
+            parts.append((LITERAL, template[position : match.start()]))
+        slot = match.group(1).strip()
+        parts.append((ANSWER if slot == ANSWER_SLOT else FIELD, slot))
+        position = match.end()
+    if position < len(template):
+        parts.append((LITERAL, template[position:]))
+    return parts
+
+
+class PromptTemplate:
+    """
+    Parameters
+    template: the text and the answer templates, separated by `|||`
+    answer_choices: the answer of each label (by index), required if the
+    template has an `{{answers[label]}}` slot
+    """
+
+    def __init__(self, template: str, answer_choices: Optional[Sequence[str]] = None):
+        if "|||" not in template:
+            raise ValueError(
+                f"the prompt {template!r} has no answer (separated by '|||')"
+            )
+        text_template, answer_template = template.split("|||")[:2]
+        self.parts = {
+            "prompted_text": parse_template(text_template),
+            "prompted_answer": parse_template(answer_template),
+        }
+        self.answer_choices = (
+            None if answer_choices is None else pa.array(answer_choices, pa.string())
+        )
+
+    @property
+    def uses_answers(self) -> bool:
+        return any(kind == ANSWER for parts in self.parts.values() for kind, _ in parts)
+
+    @property
+    def fields(self) -> List[str]:
+        """the fields of the samples read by the template"""
+        fields = {
+            value: None
+            for parts in self.parts.values()
+            for kind, value in parts
+            if kind == FIELD
+        }
+        if self.uses_answers:
+            fields[LABEL_FIELD] = None
+        return list(fields)
+
+    def _answers(self, labels: pa.ChunkedArray) -> pa.Array:
+        """the answer of each label, null for the labels without an answer
+        (e.g. -1 for the unlabeled samples)"""
+        labels = labels.combine_chunks()
+        known = pc.and_(
+            pc.greater_equal(labels, 0), pc.less(labels, len(self.answer_choices))
+        )
+        labels = pc.if_else(known, labels, pa.scalar(None, labels.type))
+        return pc.take(self.answer_choices, labels)
+
+    def _render_parts(self, parts: List[Tuple[str, str]], table: pa.Table) -> pa.Array:
+        values = []
+        for kind, value in parts:
+            if kind == LITERAL:
+                values.append(pa.scalar(value, pa.string()))
+            elif kind == FIELD:
+                column = table.column(value).combine_chunks()
+                values.append(pc.cast(column, pa.string()))
+            else:
+                values.append(self._answers(table.column(LABEL_FIELD)))
+        if not any(kind != LITERAL for kind, _ in parts):
+            # only literals, the same text for all the samples
+            text = "".join(value for _, value in parts)
+            return pa.array([text] * table.num_rows, pa.string())
+        return pc.binary_join_element_wise(*values, "")
+
+    def render(self, table: pa.Table) -> Dict[str, pa.Array]:
+        """
+        the prompted texts and answers of the samples of a table, which has
+        (at least) the `fields` of the template
+        """
+        missing = [field for field in self.fields if field not in table.column_names]
+        if missing:
+            raise ValueError(f"the fields {missing} of the prompt can not be found")
+        if self.uses_answers and self.answer_choices is None:
+            raise ValueError("the answers of the labels are required by the prompt")
+        return {
+            attr_name: self._render_parts(parts, table)
+            for attr_name, parts in self.parts.items()
+        }
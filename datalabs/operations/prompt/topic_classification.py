@@ -2,6 +2,7 @@ from typing import Any, Callable, Dict, List, Mapping, Optional
 
 from datalabs.operations.operation import dataset_operation, DatasetOperation
 from datalabs.operations.prompt.prompting import prompting, Prompting
+from datalabs.utils.profiling import profiled
 
 
 class TopicClassificationPrompting(Prompting, DatasetOperation):
@@ -35,6 +36,7 @@ class TopicClassificationPrompting(Prompting, DatasetOperation):
         self._data_type = "Dataset"
         self.template = template
 
+    @profiled()
     def __call__(self, sample, labels_to_answers) -> Any:  # str?
         """
         Parameters
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import abc
-from functools import lru_cache
-from typing import List, Optional
+import multiprocessing
+import os
+from typing import List, Optional, Sequence, Union
 
-import jieba
+import pyarrow as pa
+import pyarrow.compute as pc
 
 tokenizer_registry = {}
 
@@ -16,6 +18,7 @@ def register_tokenizer(name: str):
 
     def register_tokenizer_cls(cls):
         tokenizer_registry[name] = cls
+        cls.name = name
         return cls
 
     return register_tokenizer_cls
@@ -45,7 +48,19 @@ def get_tokenizer(
             return tokenizer_registry[tokenizer_name]()
 
 
+# arrow type of the tokens of a text
+TOKENS_TYPE = pa.list_(pa.string())
+
+
+def _to_pylist(texts) -> List[Optional[str]]:
+    if isinstance(texts, (pa.Array, pa.ChunkedArray)):
+        return texts.to_pylist()
+    return list(texts)
+
+
 class Tokenizer:
+    name: str = None
+
     @abc.abstractmethod
     def __call__(self, text: str) -> list[str]:
         """
@@ -53,6 +68,25 @@ class Tokenizer:
         """
         ...
 
+    def tokenize_batch(
+        self, texts: Union[Sequence[str], pa.Array, pa.ChunkedArray]
+    ) -> pa.ListArray:
+        """
+        tokenize a batch of texts (a list or an arrow array) into an arrow
+        list<string> array, null texts give null lists
+        """
+        return pa.array(
+            [None if text is None else self(text) for text in _to_pylist(texts)],
+            type=TOKENS_TYPE,
+        )
+
+    def tokenize_column(self, texts: pa.ChunkedArray) -> pa.ChunkedArray:
+        """
+        tokenize an arrow column of texts into a list<string> column, see
+        `datalabs.utils.token_cache`
+        """
+        return pa.chunked_array([self.tokenize_batch(texts)], type=TOKENS_TYPE)
+
 
 @register_tokenizer("SingleSpaceTokenizer")
 class SingleSpaceTokenizer(Tokenizer):
@@ -60,18 +94,76 @@ class SingleSpaceTokenizer(Tokenizer):
     Tokenize a string based on the space
     """
 
-    @lru_cache(maxsize=20)
     def __call__(self, text: str) -> List[str]:
         return text.split(" ")
 
+    def tokenize_batch(
+        self, texts: Union[Sequence[str], pa.Array, pa.ChunkedArray]
+    ) -> pa.ListArray:
+        if isinstance(texts, pa.ChunkedArray):
+            texts = texts.combine_chunks()
+        elif not isinstance(texts, pa.Array):
+            texts = pa.array(texts, type=pa.string())
+        return pc.split_pattern(texts, pattern=" ")
+
+    def tokenize_column(self, texts: pa.ChunkedArray) -> pa.ChunkedArray:
+        return pc.split_pattern(texts, pattern=" ")
+
+
+def _init_jieba_worker():
+    import jieba
+
+    # the dictionary is loaded once per worker, not with the first batch
+    jieba.initialize()
+
+
+def _segment(texts: List[Optional[str]]) -> pa.ListArray:
+    import jieba
+
+    return pa.array(
+        [None if text is None else jieba.lcut(text, cut_all=False) for text in texts],
+        type=TOKENS_TYPE,
+    )
+
 
 @register_tokenizer("JiebaTokenizer")
 class JiebaTokenizer(Tokenizer):
     """
     Tokenizer a string using Jieba segmentor
+
+    Parameters
+    num_proc: number of processes segmenting the batches of texts, all the
+    CPUs by default
+    batch_size: number of texts segmented by a process at once, smaller
+    batches are segmented without a process pool
     """
 
-    @lru_cache(maxsize=20)
+    def __init__(self, num_proc: Optional[int] = None, batch_size: int = 10000):
+        self.num_proc = num_proc if num_proc is not None else os.cpu_count()
+        self.batch_size = batch_size
+
     def __call__(self, text: str) -> List[str]:
-        # TODO(Pengfei): this should be optimized
-        return [w for w in jieba.cut(text, cut_all=False)]
+        import jieba
+
+        return jieba.lcut(text, cut_all=False)
+
+    def tokenize_batch(
+        self, texts: Union[Sequence[str], pa.Array, pa.ChunkedArray]
+    ) -> pa.ListArray:
+        texts = _to_pylist(texts)
+        # e.g. in the workers of `Dataset.apply`, which can't have children
+        if (
+            self.num_proc <= 1
+            or len(texts) <= self.batch_size
+            or multiprocessing.current_process().daemon
+        ):
+            return _segment(texts)
+
+        batches = [
+            texts[offset : offset + self.batch_size]
+            for offset in range(0, len(texts), self.batch_size)
+        ]
+        with multiprocessing.Pool(
+            min(self.num_proc, len(batches)), initializer=_init_jieba_worker
+        ) as pool:
+            return pa.concat_arrays(pool.map(_segment, batches))
@@ -3,7 +3,7 @@ import hashlib  # for mdb ids of prompts
 import json
 from typing import List, Optional
 
-import requests
+from datalabs.utils.prompt_store import prompt_store
 
 
 @dataclass
@@ -86,8 +86,9 @@ class Prompt:
 class Prompts:
     @classmethod
     def from_url(cls, URL):
-        res = requests.get(URL)
-        prompts = json.loads(res.text)
+        # fetched once and then read from the local prompt store, see
+        # `datalabs.utils.prompt_store`
+        prompts = prompt_store.get(URL)
         # new_prompts = {x["id"]: Prompt(**x) for x in prompts}
         # prompts = []
         # for dic in dics:
@@ -0,0 +1,44 @@
+import unittest
+
+from featurize import get_length, get_lexical_richness
+
+from datalabs import Dataset
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.dataset = Dataset.from_dict(
+            {
+                "text": ["I love this movie", "so boring", "a b c d e", "ok"] * 5,
+                "label": [1, 0, 1, 0] * 5,
+            }
+        )
+
+    def test_batched_memory(self):
+        res = self.dataset.apply(get_length, mode="memory", batched=True, batch_size=3)
+        res_row = self.dataset.apply(get_length, mode="memory")
+        self.assertEqual(res["length"], res_row["length"])
+        self.assertEqual(res["length"][:4], [4, 2, 5, 1])
+
+    def test_batched_realtime(self):
+        outputs = list(self.dataset.apply(get_length, batched=True, batch_size=7))
+        self.assertEqual(len(outputs), self.dataset.num_rows)
+        self.assertEqual(outputs[0], {"length": 4})
+
+    def test_row_adapter(self):
+        # get_lexical_richness has no columnar implementation
+        self.assertFalse(get_lexical_richness.supports_batch)
+        res = self.dataset.apply(
+            get_lexical_richness, mode="memory", batched=True, batch_size=6
+        )
+        res_row = self.dataset.apply(get_lexical_richness, mode="memory")
+        self.assertEqual(res["lexical_diversity"], res_row["lexical_diversity"])
+
+    def test_batched_selected_rows(self):
+        dataset = self.dataset.select([3, 1, 0])
+        outputs = list(dataset.apply(get_length, batched=True, batch_size=2))
+        self.assertEqual([output["length"] for output in outputs], [1, 2, 4])
+
+
+if __name__ == "__main__":
+    unittest.main()
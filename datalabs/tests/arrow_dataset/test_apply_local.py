@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+
+from featurize import get_length
+
+from datalabs import Dataset
+from datalabs.arrow_writer import ArrowWriter
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "qc-test.arrow")
+        with ArrowWriter(path=self.path) as writer:
+            writer.write_batch(
+                {"text": ["a b c", "d e", "f"] * 10, "label": [0, 1, 2] * 10}
+            )
+            writer.finalize()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_apply_local(self):
+        dataset = Dataset.from_file(self.path)
+        size = os.path.getsize(self.path)
+
+        new_dataset = dataset.apply(get_length, mode="local", batch_size=7)
+        self.assertEqual(new_dataset["length"][:3], [3, 2, 1])
+        # the original cache file is left untouched
+        self.assertEqual(os.path.getsize(self.path), size)
+        self.assertTrue(
+            os.path.exists(os.path.join(self.tmp_dir.name, "qc-test-length.arrow"))
+        )
+
+        # the new column is attached when the cache file is loaded again
+        reloaded_dataset = Dataset.from_file(self.path)
+        self.assertEqual(reloaded_dataset.column_names, ["label", "text", "length"])
+        self.assertEqual(reloaded_dataset[1]["length"], 2)
+
+    def test_apply_local_twice(self):
+        dataset = Dataset.from_file(self.path)
+        dataset = dataset.apply(get_length, mode="local")
+        dataset = dataset.apply(get_length, mode="local", batched=True)
+        self.assertEqual(dataset.column_names, ["label", "text", "length"])
+        self.assertEqual(dataset["length"][:3], [3, 2, 1])
+
+    def test_apply_multiprocessing(self):
+        dataset = Dataset.from_file(self.path)
+
+        new_dataset = dataset.apply(get_length, mode="memory", num_proc=2, batch_size=4)
+        self.assertEqual(new_dataset["length"], [3, 2, 1] * 10)
+
+        new_dataset = dataset.apply(get_length, mode="local", num_proc=2, batch_size=4)
+        self.assertEqual(new_dataset["length"], [3, 2, 1] * 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
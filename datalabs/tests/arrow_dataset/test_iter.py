@@ -0,0 +1,34 @@
+import unittest
+
+from datalabs import Dataset
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.dataset = Dataset.from_dict(
+            {
+                "text": ["I love this movie", "so boring", "ok"] * 700,
+                "label": [1, 0, 1] * 700,
+            }
+        )
+
+    def test_iter(self):
+        samples = list(self.dataset)
+        self.assertEqual(len(samples), self.dataset.num_rows)
+        self.assertEqual(samples[1], {"text": "so boring", "label": 0})
+        self.assertEqual(samples[-1], self.dataset[-1])
+
+    def test_iter_with_indices(self):
+        dataset = self.dataset.shuffle(seed=42).select(range(1500))
+        samples = list(dataset)
+        self.assertEqual(len(samples), 1500)
+        for index in [0, 999, 1000, 1499]:
+            self.assertEqual(samples[index], dataset[index])
+
+    def test_iter_with_format(self):
+        dataset = self.dataset.with_format("python", columns=["label"])
+        self.assertEqual(next(iter(dataset)), {"label": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import math
+import unittest
+
+from datalabs import Dataset
+from datalabs.operations.aggregate.arrow_compute import get_rows, get_table
+from datalabs.operations.aggregate.engine import aggregate
+from datalabs.operations.aggregate.general import get_average_length, get_vocabulary
+from datalabs.operations.aggregate.summarization import get_statistics
+from datalabs.operations.aggregate.text_classification import get_label_distribution
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.samples = [
+            {"text": "I love  this movie", "summary": "love it", "label": "pos"},
+            {"text": "I hate this movie", "summary": " hate\tit ", "label": "neg"},
+            {"text": "he said it is a good film", "summary": "", "label": "pos"},
+        ]
+        self.dataset = Dataset.from_dict(
+            {
+                key: [sample[key] for sample in self.samples]
+                for key in self.samples[0].keys()
+            }
+        )
+
+    def test_same_results_as_python(self):
+        for func in [
+            get_average_length,
+            get_vocabulary,
+            get_label_distribution,
+            get_statistics,
+        ]:
+            arrow_result = func(self.dataset)
+            python_result = aggregate(self.samples, [func])[0]
+            self.assertEqual(arrow_result, python_result)
+
+        self.assertEqual(
+            list(get_vocabulary(self.dataset)["vocabulary"].items())[:3],
+            [("I", 2), ("this", 2), ("movie", 2)],
+        )
+
+    def test_indices_mapping(self):
+        dataset = self.dataset.select([2, 0])
+        self.assertEqual(
+            get_label_distribution(dataset)["label_distribution"], {"pos": 2}
+        )
+        self.assertEqual(
+            get_statistics(dataset),
+            aggregate([self.samples[2], self.samples[0]], [get_statistics])[0],
+        )
+
+    def test_get_rows(self):
+        for dataset in [self.dataset, self.dataset.select([2, 0, 1])]:
+            table = get_table(dataset)
+            for offset, length in [(0, 3), (1, 1), (1, 5), (3, 2)]:
+                self.assertEqual(
+                    get_rows(dataset, offset, length).to_pylist(),
+                    table.slice(offset, length).to_pylist(),
+                )
+        self.assertEqual(
+            get_rows(self.dataset.select([2, 0]), 1, 1, ["label"]).to_pylist(),
+            [{"label": "pos"}],
+        )
+
+    def test_empty(self):
+        dataset = Dataset.from_dict(
+            {key: [] for key in self.samples[0].keys()},
+            features=self.dataset.features,
+        )
+        for func in [get_average_length, get_statistics]:
+            arrow_result = func(dataset)
+            python_result = aggregate([], [func])[0]
+            self.assertEqual(arrow_result, python_result)
+        self.assertTrue(math.isnan(get_average_length(dataset)["average_length"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
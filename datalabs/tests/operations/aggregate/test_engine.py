@@ -0,0 +1,70 @@
+import unittest
+
+from datalabs import Dataset
+from datalabs.operations.aggregate.engine import aggregate, Frequency, Head, Stats
+from datalabs.operations.aggregate.general import get_average_length, get_vocabulary
+from datalabs.operations.aggregate.text_classification import (
+    get_label_distribution,
+    get_statistics,
+)
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.samples = [
+            {"text": "I love this movie", "label": 1},
+            {"text": "I hate this movie", "label": 0},
+            {"text": "he said it is a good film", "label": 1},
+            {"text": "she recieve the movie", "label": 1},
+        ]
+
+    def test_merge_accumulators(self):
+        stats, other = Stats("length"), Stats("length")
+        stats.update({"length": 3})
+        other.update({"length": 1})
+        other.update({"length": 5})
+        stats.merge(other)
+        self.assertEqual(stats.result()["min"], 1)
+        self.assertEqual(stats.result()["max"], 5)
+        self.assertEqual(stats.result()["mean"], 3)
+
+        vocab, other = Frequency("words", many=True), Frequency("words", many=True)
+        vocab.update({"words": ["b", "a"]})
+        other.update({"words": ["c", "a"]})
+        vocab.merge(other)
+        self.assertEqual(list(vocab.result().items()), [("b", 1), ("a", 2), ("c", 1)])
+
+        head, other = Head("x", limit=2), Head("x", limit=2)
+        head.update({"x": 1})
+        other.update({"x": 2})
+        other.update({"x": 3})
+        head.merge(other)
+        self.assertEqual(head.result(), [1, 2])
+
+    def test_fused_aggregations(self):
+        average_length, vocabulary, label_distribution = aggregate(
+            self.samples, [get_average_length, get_vocabulary, get_label_distribution]
+        )
+        self.assertEqual(average_length, {"average_length": 4.75})
+        self.assertEqual(vocabulary["vocabulary"]["movie"], 3)
+        self.assertEqual(label_distribution["label_distribution"], {1: 3, 0: 1})
+        self.assertEqual(label_distribution["imbalance_ratio"], 1 / 3)
+
+    def test_parallel_aggregations(self):
+        dataset = Dataset.from_dict(
+            {
+                "text": [sample["text"] for sample in self.samples],
+                "label": [sample["label"] for sample in self.samples],
+            }
+        )
+        self.assertEqual(get_statistics(dataset, num_proc=2), get_statistics(dataset))
+
+        dataset.aggregate([get_average_length, get_vocabulary], num_proc=2)
+        self.assertEqual(dataset._stat["average_length"], 4.75)
+        self.assertEqual(
+            list(dataset._stat["vocabulary"].items())[:2], [("movie", 3), ("I", 2)]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import random
+import tempfile
+import unittest
+
+from datalabs import Dataset
+from datalabs.operations.edit.editing import editing, row_seed
+from datalabs.utils.apply_cache import apply_cache
+
+n_calls = {"setup_shuffle_words": 0}
+
+
+@editing(name="shuffle_words")
+def shuffle_words(text: str, separator, seed=0):
+    words = text.split(" ")
+    random.Random(seed).shuffle(words)
+    return {"text_shuffle_words": separator.join(words)}
+
+
+@shuffle_words.setup
+def setup_shuffle_words():
+    n_calls["setup_shuffle_words"] += 1
+    return {"separator": " "}
+
+
+@editing(name="reverse_words")
+def reverse_words(text: str, seed=0):
+    return {"text_reverse_words": f"{seed}:" + " ".join(text.split(" ")[::-1])}
+
+
+@reverse_words.batch
+def reverse_words_batch(texts, seeds=None):
+    seeds = seeds or [0] * len(texts)
+    return {
+        "text_reverse_words": [
+            reverse_words(text, seed=seed)["text_reverse_words"]
+            for text, seed in zip(texts, seeds)
+        ]
+    }
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.texts = [f"this is the sentence number {i} of the test" for i in range(10)]
+
+    def test_setup(self):
+        shuffle_words(self.texts[0])
+        shuffle_words.transform(self.texts)
+        shuffle_words.seeded(1).transform(self.texts)
+        self.assertEqual(n_calls["setup_shuffle_words"], 1)
+
+    def test_transform(self):
+        # without a seed, each row is edited with the default seed
+        self.assertEqual(
+            shuffle_words.transform(self.texts)["text_shuffle_words"],
+            [shuffle_words(text)["text_shuffle_words"] for text in self.texts],
+        )
+
+        seeded = shuffle_words.transform(self.texts, seed=1)["text_shuffle_words"]
+        self.assertEqual(
+            seeded, shuffle_words.seeded(1).transform(self.texts)["text_shuffle_words"]
+        )
+        # the seed of a row only depends on its position
+        self.assertEqual(
+            shuffle_words.transform(self.texts[4:], seed=1, offset=4)[
+                "text_shuffle_words"
+            ],
+            seeded[4:],
+        )
+        self.assertNotEqual(
+            shuffle_words.transform(self.texts, seed=2)["text_shuffle_words"], seeded
+        )
+
+    def test_batch_seeds(self):
+        # the seeds of the rows are passed to the batch implementation
+        seeded = reverse_words.seeded(1)
+        self.assertTrue(seeded._batch_takes_seeds)
+        self.assertEqual(
+            seeded.transform(self.texts)["text_reverse_words"],
+            [
+                reverse_words(text, seed=seed)["text_reverse_words"]
+                for text, seed in zip(
+                    self.texts, [row_seed(1, row) for row in range(len(self.texts))]
+                )
+            ],
+        )
+        self.assertFalse(shuffle_words._batch_takes_seeds)
+
+    def test_apply_seeded(self):
+        dataset = Dataset.from_dict({"text": self.texts})
+        edit = shuffle_words.seeded(1)
+        expected = edit.transform(self.texts)["text_shuffle_words"]
+
+        for batch_size in [1, 3, 10]:
+            edited = list(
+                dataset.apply(
+                    edit, mode="realtime", batched=True, batch_size=batch_size
+                )
+            )
+            self.assertEqual([row["text_shuffle_words"] for row in edited], expected)
+        edited = list(dataset.apply(edit, mode="realtime"))
+        self.assertEqual([row["text_shuffle_words"] for row in edited], expected)
+
+    def test_cached_seeds(self):
+        dataset = Dataset.from_dict({"text": self.texts})
+        with tempfile.TemporaryDirectory() as cache_dir:
+            default_cache_dir = apply_cache.cache_dir
+            apply_cache.cache_dir = cache_dir
+            try:
+                for seed in [1, 2]:
+                    edit = shuffle_words.seeded(seed)
+                    self.assertEqual(
+                        dataset.apply(edit, mode="memory")["text_shuffle_words"],
+                        edit.transform(self.texts)["text_shuffle_words"],
+                    )
+            finally:
+                apply_cache.cache_dir = default_cache_dir
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+
+from compare_mt.rouge.rouge_scorer import RougeScorer
+
+from datalabs.operations.featurize.plugins.summarization.extractive_methods import (
+    _ext_oracle,
+    _lead_k,
+    RougeOracle,
+)
+
+scorer = RougeScorer(["rouge1", "rouge2"], use_stemmer=True)
+
+
+def rouge1(cand, ref):
+    return scorer.score(ref, cand)["rouge1"].fmeasure
+
+
+def rouge12(cand, ref):
+    score = scorer.score(ref, cand)
+    rouge1, rouge2 = score["rouge1"].fmeasure, score["rouge2"].fmeasure
+    return 2 * rouge1 * rouge2 / (rouge1 + rouge2 + 1e-20)
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.document = [
+            "I love this movie.",
+            "He is a man.",
+            "this is a good man.",
+            "tomorrow is a nice day.",
+            "The movies he loves are good movies.",
+        ]
+        self.summary = "He likes this movie, he is a good man."
+
+    def test_same_as_rescoring(self):
+        for rouge_types, sim_fn in [
+            (("rouge1",), rouge1),
+            (("rouge1", "rouge2"), rouge12),
+        ]:
+            oracle = RougeOracle(rouge_types)
+            for max_sent in [1, 3, -1]:
+                self.assertEqual(
+                    oracle.ext_oracle(self.document, self.summary, max_sent=max_sent),
+                    _ext_oracle(self.document, self.summary, sim_fn, max_sent=max_sent),
+                )
+            self.assertEqual(
+                oracle.lead_k(self.document, self.summary, k=2),
+                _lead_k(self.document, self.summary, sim_fn, k=2),
+            )
+
+    def test_batch(self):
+        oracle = RougeOracle(("rouge1",))
+        results = oracle.ext_oracle_batch(
+            [self.document] * 3, [self.summary] * 3, num_workers=2
+        )
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[2], oracle.ext_oracle(self.document, self.summary))
+
+
+if __name__ == "__main__":
+    unittest.main()
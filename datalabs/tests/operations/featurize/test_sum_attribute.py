@@ -0,0 +1,124 @@
+import random
+import unittest
+from unittest import mock
+
+from datalabs import Dataset
+from datalabs.operations.featurize import summarization
+from datalabs.operations.featurize.plugins.summarization.sum_attribute import (
+    sum_attribute,
+    SUMAttribute,
+)
+from datalabs.operations.pipeline import Pipeline
+
+
+def newsroom_overlap(a, b):
+    """the fragments of the greedy scan of Newsroom, scanning the whole text
+    at each position of the summary"""
+    matches = []
+    a_start = 0
+    b_start = 0
+    while a_start < len(a):
+        best_match = None
+        best_match_length = 0
+        while b_start < len(b):
+            if a[a_start] == b[b_start]:
+                a_end = a_start
+                b_end = b_start
+                while a_end < len(a) and b_end < len(b) and b[b_end] == a[a_end]:
+                    b_end += 1
+                    a_end += 1
+                length = a_end - a_start
+                if length > best_match_length:
+                    best_match = SUMAttribute.Match(a_start, b_start, length)
+                    best_match_length = length
+                b_start = b_end
+            else:
+                b_start += 1
+        b_start = 0
+        if best_match:
+            matches.append(best_match)
+            a_start += best_match_length
+        else:
+            a_start += 1
+    return matches
+
+
+class MyTestCase(unittest.TestCase):
+    def test_overlap(self):
+        text = "the cat sat on the mat and the dog sat on the cat".split()
+        summary = "the dog sat on the mat today".split()
+        matches = SUMAttribute().overlap(summary, text)
+        self.assertEqual(
+            matches,
+            [SUMAttribute.Match(0, 7, 5), SUMAttribute.Match(5, 5, 1)],
+        )
+
+        # the scan resumes at the end of a match, as in Newsroom
+        matches = SUMAttribute().overlap(["a", "a", "b"], ["a", "a", "a", "b"])
+        self.assertEqual(
+            matches, [SUMAttribute.Match(0, 0, 2), SUMAttribute.Match(2, 3, 1)]
+        )
+
+    def test_newsroom_fragments(self):
+        rng = random.Random(0)
+        for _ in range(500):
+            text = rng.choices("abc", k=rng.randrange(30))
+            summary = rng.choices("abcd", k=rng.randrange(15))
+            self.assertEqual(
+                SUMAttribute().overlap(summary, text), newsroom_overlap(summary, text)
+            )
+
+    def test_max_candidates(self):
+        # every position of the text is a candidate, the longest match is the
+        # last one
+        text = ["a"] * 1000 + ["b"]
+        summary = ["a", "b"]
+        self.assertEqual(
+            SUMAttribute(max_candidates=None).overlap(summary, text),
+            newsroom_overlap(summary, text),
+        )
+        self.assertEqual(
+            SUMAttribute(max_candidates=None).overlap(summary, text),
+            [SUMAttribute.Match(0, 999, 2)],
+        )
+        # only the first candidates are visited
+        self.assertEqual(
+            SUMAttribute(max_candidates=10).overlap(summary, text),
+            [SUMAttribute.Match(0, 0, 1), SUMAttribute.Match(1, 1000, 1)],
+        )
+
+    def test_attributes_computed_once(self):
+        dataset = Dataset.from_dict(
+            {"text": ["a b c", "d e f", "g h"], "summary": ["a b", "e", "x"]}
+        )
+
+        def cal_attributes_each(text, summary):
+            return {
+                name: float(len(text) + len(summary))
+                for name in summarization.SUM_ATTRIBUTES
+            }
+
+        with mock.patch.object(
+            sum_attribute, "cal_attributes_each", side_effect=cal_attributes_each
+        ) as cal:
+            pipeline = Pipeline()
+            pipeline.add(summarization.get_sum_attributes, output=False)
+            pipeline.add(summarization.get_density)
+            pipeline.add(summarization.get_coverage)
+            pipeline.add(summarization.get_copy_len)
+            result = dataset.apply(pipeline)
+            # once per (text, summary) pair, not once per feature
+            self.assertEqual(cal.call_count, 3)
+            self.assertEqual(result["density"], [8.0, 6.0, 4.0])
+            self.assertEqual(result["coverage"], [8.0, 6.0, 4.0])
+            self.assertNotIn("attr_density", result.column_names)
+
+            # without the attributes, each feature computes them
+            cal.reset_mock()
+            rows = list(dataset.apply(summarization.get_novelty))
+            self.assertEqual(cal.call_count, 3)
+            self.assertEqual([row["novelty"] for row in rows], [8.0, 6.0, 4.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
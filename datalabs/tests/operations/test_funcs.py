@@ -59,6 +59,18 @@ class MyTestCase(unittest.TestCase):
         # for b in B:
         #     print(b)
 
+    def test_spacy_batch(self):
+        texts = [
+            "I love this movie.",
+            "apple is looking at buying U.K. startup for $1 billion.",
+        ]
+
+        for func in [get_entities_spacy, get_postag_spacy]:
+            batch_outputs = func.call_batch(texts)
+            for i, text in enumerate(texts):
+                for attr_name, value in func(text).items():
+                    self.assertEqual(batch_outputs[attr_name][i], value)
+
 
 if __name__ == "__main__":
     unittest.main()
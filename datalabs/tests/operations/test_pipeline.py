@@ -0,0 +1,100 @@
+import unittest
+
+from datalabs import Dataset
+from datalabs.operations.aggregate.general import get_average_length, get_tfidf
+from datalabs.operations.aggregate.text_classification import (
+    get_features_dataset_level,
+    get_label_distribution,
+)
+from datalabs.operations.featurize.featurizing import featurizing
+from datalabs.operations.featurize.general import get_length
+from datalabs.operations.pipeline import Pipeline
+
+n_calls = {"split_words": 0}
+
+
+@featurizing(name="split_words")
+def split_words(text: str):
+    n_calls["split_words"] += 1
+    return {"words": text.split(" ")}
+
+
+@featurizing(name="count_long_words")
+def count_long_words(words: list):
+    return {"long_words": sum(1 for word in words if len(word) > 4)}
+
+
+@featurizing(name="count_short_words")
+def count_short_words(words: list):
+    return {"short_words": sum(1 for word in words if len(word) <= 4)}
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.dataset = Dataset.from_dict(
+            {
+                "text": [
+                    "I love this movie",
+                    "I hate this movie",
+                    "he said it is a good film",
+                    "she recieve the movie",
+                    "a wonderful film",
+                ],
+                "label": [1, 0, 1, 1, 0],
+            }
+        )
+
+    def pipeline(self):
+        return (
+            Pipeline([get_length])
+            .add(split_words, output=False)
+            .add(count_long_words, field="words")
+            .add(count_short_words, field="words")
+            .add(get_average_length)
+            .add(get_label_distribution, prefix="train")
+        )
+
+    def test_one_pass(self):
+        n_calls["split_words"] = 0
+        result = self.dataset.apply(self.pipeline(), batch_size=2)
+        # the intermediate words are computed once and not written
+        self.assertEqual(n_calls["split_words"], 5)
+        self.assertEqual(
+            result.column_names,
+            ["text", "label", "length", "long_words", "short_words"],
+        )
+        self.assertEqual(result["long_words"], [1, 1, 0, 2, 1])
+        self.assertEqual(result["length"], [4, 4, 7, 4, 3])
+        self.assertEqual(result._stat["average_length"], 4.4)
+        self.assertEqual(result._stat["train_label_distribution"], {1: 3, 0: 2})
+
+        # same results as the operations applied one after the other
+        expected = self.dataset.apply(get_length, mode="memory")
+        expected.apply(get_average_length)
+        self.assertEqual(result["length"], expected["length"])
+        self.assertEqual(
+            result._stat["average_length"], expected._stat["average_length"]
+        )
+
+    def test_parallel(self):
+        expected = self.dataset.apply(self.pipeline(), batch_size=2)
+        result = self.dataset.apply(self.pipeline(), num_proc=2, batch_size=2)
+        self.assertEqual(result.to_dict(), expected.to_dict())
+        self.assertEqual(result._stat, expected._stat)
+
+    def test_stages(self):
+        # the same operation on the same field is computed once
+        pipeline = Pipeline([get_length, get_length])
+        self.assertEqual(len(pipeline.stages), 1)
+        with self.assertRaises(ValueError):
+            Pipeline([get_tfidf])
+        with self.assertRaises(ValueError):
+            self.dataset.apply(Pipeline().add(count_long_words, field="words"))
+
+    def test_features_dataset_level(self):
+        dataset = self.dataset.apply(Pipeline([get_length, get_features_dataset_level]))
+        self.assertEqual(dataset._stat, {"length": 4.4})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+
+import pyarrow as pa
+
+from datalabs import Dataset
+from datalabs.operations.prompt.template import parse_template, PromptTemplate
+from datalabs.tasks.text_classification import TextClassification
+
+TEMPLATE = (
+    "{{text}} \n\nWhich section of a newspaper would this article likely "
+    "appear in? ||| \n{{answers[label] }}"
+)
+ANSWERS = {
+    "World": ["World News"],
+    "Sports": ["Sports"],
+    "Business": ["Business"],
+}
+
+
+class MyTestCase(unittest.TestCase):
+    def test_parse_template(self):
+        self.assertEqual(
+            parse_template("Title: {{ title }} text: {{text}}{{answers[label]}}."),
+            [
+                ("literal", "Title: "),
+                ("field", "title"),
+                ("literal", " text: "),
+                ("field", "text"),
+                ("answer", "answers[label]"),
+                ("literal", "."),
+            ],
+        )
+
+    def test_render(self):
+        template = PromptTemplate(
+            TEMPLATE, answer_choices=["World News", "Sports", "Business"]
+        )
+        self.assertEqual(template.fields, ["text", "label"])
+        table = pa.table({"text": ["a", "b"], "label": [2, 0]})
+        columns = template.render(table)
+        self.assertEqual(
+            columns["prompted_text"].to_pylist(),
+            [
+                "a \n\nWhich section of a newspaper would this article likely "
+                "appear in? ",
+                "b \n\nWhich section of a newspaper would this article likely "
+                "appear in? ",
+            ],
+        )
+        self.assertEqual(
+            columns["prompted_answer"].to_pylist(), [" \nBusiness", " \nWorld News"]
+        )
+
+        # the unlabeled samples (-1), or null labels, have no answer
+        table = pa.table({"text": ["a", "b", "c", "d"], "label": [-1, 1, None, 3]})
+        columns = template.render(table)
+        self.assertEqual(
+            columns["prompted_answer"].to_pylist(), [None, " \nSports", None, None]
+        )
+        table = pa.table({"text": ["a", "b"], "label": [2, 0]})
+
+        # only literals in the answer
+        columns = PromptTemplate("{{text}} ||| yes").render(table)
+        self.assertEqual(columns["prompted_answer"].to_pylist(), [" yes", " yes"])
+
+        with self.assertRaises(ValueError):
+            PromptTemplate("{{title}} ||| {{text}}").render(table)
+        with self.assertRaises(ValueError):
+            PromptTemplate(TEMPLATE).render(table)
+
+    def test_apply_prompt(self):
+        texts = [f"text {i}" for i in range(7)]
+        labels = [i % 3 for i in range(7)]
+        dataset = Dataset.from_dict({"text": texts, "label": labels})
+        dataset._info.task_templates = [
+            TextClassification(labels=["World", "Sports", "Business"])
+        ]
+        dataset._info.prompts = {
+            "newspaper": {"template": TEMPLATE, "answers": ANSWERS}
+        }
+        answers = ["World News", "Sports", "Business"]
+        expected = [
+            {
+                "prompted_text": f"{text} \n\nWhich section of a newspaper would "
+                "this article likely appear in? ",
+                "prompted_answer": f" \n{answers[label]}",
+            }
+            for text, label in zip(texts, labels)
+        ]
+
+        self.assertEqual(list(dataset.apply("newspaper", mode="realtime")), expected)
+        for batch_size in [1, 3, 1000]:
+            result = dataset.apply("newspaper", mode="memory", batch_size=batch_size)
+            self.assertEqual(
+                result["prompted_text"], [row["prompted_text"] for row in expected]
+            )
+            self.assertEqual(
+                result["prompted_answer"], [row["prompted_answer"] for row in expected]
+            )
+
+    def test_apply_prompt_missing_answers(self):
+        dataset = Dataset.from_dict({"text": ["a", "b", "c"], "label": [0, -1, 1]})
+        dataset._info.task_templates = [
+            TextClassification(labels=["World", "Sports", "Business"])
+        ]
+        answers = {"World": ["World News"], "Business": ["Business"]}
+        dataset._info.prompts = {
+            "newspaper": {"template": TEMPLATE, "answers": answers}
+        }
+        result = dataset.apply("newspaper", mode="memory")
+        self.assertEqual(result["prompted_answer"], [" \nWorld News", None, None])
+        self.assertEqual(
+            [row["prompted_answer"] for row in dataset.apply("newspaper")],
+            [" \nWorld News", None, None],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
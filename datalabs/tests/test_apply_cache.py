@@ -0,0 +1,129 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from datalabs import Dataset
+from datalabs.operations.aggregate.general import get_average_length, get_vocabulary
+from datalabs.operations.featurize.featurizing import featurizing
+from datalabs.operations.featurize.summarization import summarization_featurizing
+from datalabs.utils import apply_cache as apply_cache_module
+from datalabs.utils.apply_cache import apply_cache, ApplyCache
+
+N_CHARS_OFFSET = 0
+
+
+def count_chars(text: str):
+    return len(text) + N_CHARS_OFFSET
+
+
+@featurizing(name="get_n_chars", contributor="datalab", task="Any")
+def get_n_chars(text: str):
+    return {"n_chars": count_chars(text)}
+
+
+@summarization_featurizing(name="get_pair_length", contributor="datalab")
+def get_pair_length(sample: dict):
+    # an operation on whole samples, without processed fields
+    return {"pair_length": len(sample["text"]) + len(sample["summary"])}
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = apply_cache.cache_dir
+        apply_cache.cache_dir = self.tmp_dir.name
+        self.dataset = Dataset.from_dict(
+            {"text": ["I love this movie", "I hate this movie", "a good film"]}
+        )
+
+    def tearDown(self):
+        apply_cache.cache_dir = self.cache_dir
+        self.tmp_dir.cleanup()
+
+    def test_cached_columns(self):
+        result = self.dataset.apply(get_n_chars, mode="memory")
+        self.assertEqual(result["n_chars"], [17, 17, 11])
+
+        with mock.patch.object(
+            Dataset, "_Dataset__apply_memory", side_effect=AssertionError
+        ):
+            cached = self.dataset.apply(get_n_chars, mode="memory")
+            self.assertEqual(cached["n_chars"], [17, 17, 11])
+            # the same dataset, whether computed or loaded from the cache
+            self.assertEqual(cached._fingerprint, result._fingerprint)
+            self.assertEqual(cached["text"], self.dataset["text"])
+            with self.assertRaises(AssertionError):
+                self.dataset.apply(
+                    get_n_chars, mode="memory", load_from_cache_file=False
+                )
+
+        # a different prefix or dataset is another result
+        result = self.dataset.apply(get_n_chars, mode="memory", prefix="p")
+        self.assertEqual(result["p_n_chars"], [17, 17, 11])
+        result = self.dataset.select([2]).apply(get_n_chars, mode="memory")
+        self.assertEqual(result["n_chars"], [11])
+
+    def test_cached_sample_columns(self):
+        dataset = Dataset.from_dict({"text": ["a b", "c"], "summary": ["a", ""]})
+        result = dataset.apply(get_pair_length, mode="memory")
+        self.assertEqual(result["pair_length"], [4, 1])
+        with mock.patch.object(
+            Dataset, "_Dataset__apply_memory", side_effect=AssertionError
+        ):
+            cached = dataset.apply(get_pair_length, mode="memory")
+        self.assertEqual(cached["pair_length"], [4, 1])
+
+    def test_cached_stat(self):
+        self.dataset.apply(get_average_length)
+        self.dataset.aggregate([get_average_length, get_vocabulary])
+        expected = dict(self.dataset._stat)
+
+        dataset = Dataset.from_dict({"text": self.dataset["text"]})
+        with mock.patch("datalabs.arrow_dataset.aggregate", side_effect=AssertionError):
+            dataset.aggregate([get_average_length, get_vocabulary])
+        self.assertEqual(dataset._stat, expected)
+
+    def test_key_dependencies(self):
+        key = apply_cache.key(self.dataset, get_n_chars, "columns")
+        # the helpers called and the source files defining them
+        source_files, _ = apply_cache_module._dependencies(get_n_chars.func)
+        self.assertIn(os.path.abspath(__file__.replace(".pyc", ".py")), source_files)
+        with mock.patch.object(apply_cache_module, "hash_file", return_value="new"):
+            self.assertNotEqual(
+                apply_cache.key(self.dataset, get_n_chars, "columns"), key
+            )
+        with mock.patch.object(apply_cache_module, "__version__", "0.0.0"):
+            self.assertNotEqual(
+                apply_cache.key(self.dataset, get_n_chars, "columns"), key
+            )
+
+        # the data files given as resources
+        path = os.path.join(self.tmp_dir.name, "lexicon.txt")
+        with open(path, "w") as file:
+            file.write("good")
+        operation = get_n_chars.set(["text"])
+        operation.resources = {"path": path}
+        key = apply_cache.key(self.dataset, operation, "columns")
+        with open(path, "w") as file:
+            file.write("good\nbad")
+        self.assertNotEqual(apply_cache.key(self.dataset, operation, "columns"), key)
+
+    def test_lru_eviction(self):
+        cache = ApplyCache(cache_dir=self.tmp_dir.name, max_size=0)
+        cache.save_stat("a", {"x": 1})
+        cache.save_stat("b", {"x": 2})
+        # the last result is kept even if it doesn't fit
+        self.assertIsNone(cache.load_stat("a"))
+        self.assertEqual(cache.load_stat("b"), {"x": 2})
+
+        cache.max_size = 2 * os.path.getsize(cache._path("b", ".pkl"))
+        cache.save_stat("c", {"x": 3})
+        os.utime(cache._path("b", ".pkl"), (0, 0))
+        cache.save_stat("d", {"x": 4})
+        self.assertIsNone(cache.load_stat("b"))
+        self.assertEqual(cache.load_stat("c"), {"x": 3})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+
+import numpy as np
+import sklearn.metrics
+
+from datalabs.metric import Accuracy, F1score, Hits
+from datalabs.utils.bootstrap import (
+    accuracy,
+    bootstrap,
+    bootstrap_function,
+    exact_match_qa,
+    hits,
+    micro_f1,
+)
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.true_labels = rng.integers(0, 4, 500).tolist()
+        self.predicted_labels = rng.integers(0, 4, 500).tolist()
+
+    def test_vectorized_metrics(self):
+        self.assertAlmostEqual(
+            accuracy(self.true_labels, self.predicted_labels),
+            sklearn.metrics.accuracy_score(self.true_labels, self.predicted_labels),
+        )
+        self.assertAlmostEqual(
+            micro_f1(self.true_labels, self.predicted_labels),
+            sklearn.metrics.f1_score(
+                self.true_labels, self.predicted_labels, average="micro"
+            ),
+        )
+        self.assertEqual(hits([1, 2], [[1, 3], [1, 3]]), 0.5)
+        self.assertEqual(exact_match_qa([["The cat"], ["a dog"]], ["cat", "cat"]), 50)
+
+    def test_seeded_bootstrap(self):
+        statistics = accuracy.statistics(self.true_labels, self.predicted_labels)
+        performances = bootstrap(
+            statistics, accuracy.compute, 400, seed=1, max_chunk_elements=100
+        )
+        self.assertEqual(performances.shape, (1000,))
+        # the processes don't change the resamples
+        np.testing.assert_array_equal(
+            performances,
+            bootstrap(
+                statistics,
+                accuracy.compute,
+                400,
+                seed=1,
+                num_proc=2,
+                max_chunk_elements=100,
+            ),
+        )
+
+        # resampling the indices or the counts of the values of the statistics
+        # give the same distribution
+        n_sampling = len(statistics)
+        counts = bootstrap(statistics, accuracy.compute, n_sampling - 1, seed=2)
+        indices = bootstrap_function(
+            sklearn.metrics.accuracy_score,
+            [self.true_labels, self.predicted_labels],
+            n_sampling - 1,
+            seed=2,
+        )
+        self.assertAlmostEqual(counts.mean(), indices.mean(), places=2)
+        self.assertAlmostEqual(counts.std(), indices.std(), places=2)
+
+    def test_metric_confidence_interval(self):
+        for metric_class in (Accuracy, F1score):
+            results = metric_class(
+                self.true_labels, self.predicted_labels, True, seed=0
+            ).evaluate()
+            self.assertLess(results["confidence_score_low"], results["value"])
+            self.assertGreater(results["confidence_score_up"], results["value"])
+
+        results = Hits(
+            self.true_labels, [[label, 0] for label in self.predicted_labels], True
+        ).evaluate()
+        self.assertLess(results["confidence_score_low"], results["value"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+
+import pyarrow as pa
+
+from datalabs import Dataset, Features, Value
+from datalabs.features.features import BucketInfo
+from datalabs.utils.analysis import (
+    bucket_attribute_discrete_value,
+    bucket_attribute_specified_bucket_interval,
+    bucket_attribute_specified_bucket_value,
+)
+from datalabs.utils.bucketing import (
+    bucket_by_discrete_value,
+    bucket_by_interval,
+    bucket_by_value,
+    bucket_features,
+)
+
+
+class MyTestCase(unittest.TestCase):
+    def test_bucket_by_value(self):
+        dict_obj = {"a": 0, "b": 0.3, "c": 0.1, "d": 0.5, "e": 0.3, "f": 0.9}
+        self.assertEqual(
+            bucket_attribute_specified_bucket_value(dict_obj, 3, [0]),
+            {(0,): ["a"], (0.1, 0.3): ["c", "b", "e"], (0.5, 1.0): ["d", "f"]},
+        )
+        self.assertEqual(
+            bucket_attribute_specified_bucket_value({"a": 2, "b": 3}, 1, []),
+            {(-1000000, 1000000): ["a", "b"]},
+        )
+        self.assertIsNone(bucket_attribute_specified_bucket_value({}, 3, [0]))
+        self.assertEqual(
+            bucket_by_value(pa.array([0.1, 0.5, 0.2, 0.9]), 2),
+            {(0.1, 0.5): [0, 2, 1], (0.9, 1.0): [3]},
+        )
+
+    def test_bucket_by_discrete_value(self):
+        dict_obj = {"a": "PER", "b": "LOC", "c": "LOC", "d": "ORG", "e": "PER"}
+        self.assertEqual(
+            bucket_attribute_discrete_value(dict_obj, 2, 1),
+            {("PER",): ["a", "e"], ("LOC",): ["b", "c"]},
+        )
+        self.assertEqual(
+            bucket_by_discrete_value(pa.array(list(dict_obj.values())), 5, 2),
+            {("PER",): [0, 4], ("LOC",): [1, 2]},
+        )
+
+    def test_bucket_by_interval(self):
+        dict_obj = {"a": 0, "b": 0.7, "c": 0.2, "d": 0.5, "e": 2}
+        self.assertEqual(
+            bucket_attribute_specified_bucket_interval(
+                dict_obj, None, [(0,), (0, 0.5), (0.5, 1)]
+            ),
+            {(0,): ["a"], (0, 0.5): ["c", "d"], (0.5, 1): ["b"]},
+        )
+        self.assertEqual(
+            bucket_by_interval(["PER", "LOC", "PER"], None, [("LOC",), ("PER",)]),
+            {("PER",): [0, 2], ("LOC",): [1]},
+        )
+
+    def test_bucket_features(self):
+        dataset = Dataset.from_dict(
+            {
+                "id": ["a", "b", "c", "d"],
+                "length": [3, 10, 5, 7],
+                "label": ["pos", "neg", "pos", "pos"],
+            },
+            features=Features(
+                {
+                    "id": Value("string"),
+                    "length": Value(
+                        "int64",
+                        bucket_info=BucketInfo(
+                            _method="bucket_attribute_specified_bucket_interval",
+                            _setting=[(0, 5), (6, 10)],
+                        ),
+                    ),
+                    "label": Value(
+                        "string",
+                        bucket_info=BucketInfo(
+                            _method="bucket_attribute_discrete_value",
+                            _number=4,
+                            _setting=1,
+                        ),
+                    ),
+                }
+            ),
+        )
+        self.assertEqual(
+            bucket_features(dataset.select([3, 2, 1]), ids="id"),
+            {
+                "length": {(0, 5): ["c"], (6, 10): ["d", "b"]},
+                "label": {("pos",): ["d", "c"], ("neg",): ["b"]},
+            },
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import json
+import subprocess
+import sys
+import unittest
+
+# optional dependencies only needed by some operations
+HEAVY_MODULES = (
+    "pymongo",
+    "spacy",
+    "nltk",
+    "lexicalrichness",
+    "sklearn",
+    "sacrebleu",
+    "compare_mt",
+    "jieba",
+)
+
+
+def imported_modules(statement: str):
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"import json, sys\n{statement}\nprint(json.dumps(list(sys.modules)))",
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return {name.split(".")[0] for name in json.loads(output.splitlines()[-1])}
+
+
+class MyTestCase(unittest.TestCase):
+    def test_import_datalabs(self):
+        modules = imported_modules("import datalabs")
+        self.assertEqual([name for name in HEAVY_MODULES if name in modules], [])
+
+    def test_import_featurizing_operation(self):
+        modules = imported_modules(
+            "from datalabs.operations.featurize import get_length"
+        )
+        self.assertEqual([name for name in HEAVY_MODULES if name in modules], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
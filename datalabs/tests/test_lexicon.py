@@ -0,0 +1,52 @@
+import json
+import os
+import tempfile
+import unittest
+
+from datalabs.utils.lexicon import Lexicon, LexiconGroup
+from datalabs.utils.resource_registry import load_resource
+
+
+class MyTestCase(unittest.TestCase):
+    def test_words_and_phrases(self):
+        lexicon = Lexicon(["good", "new york", "york", "new york city", "a b a"])
+        self.assertIn("good", lexicon)
+        self.assertNotIn("new york", lexicon)
+        self.assertEqual(len(lexicon), 5)
+
+        tokens = "a good day in new york city".split(" ")
+        # good, york, new york, new york city
+        self.assertEqual(lexicon.count(tokens), 4)
+        # overlapping phrases are all counted
+        self.assertEqual(lexicon.count("a b a b a".split(" ")), 2)
+        self.assertEqual(lexicon.count_batch(["Good day", "good day"]), [0, 1])
+        self.assertEqual(lexicon.count_batch(["Good day"], lower=True), [1])
+
+    def test_group(self):
+        group = LexiconGroup(
+            {
+                "male": Lexicon(["he", "him", "sam"]),
+                "female": Lexicon(["she", "her", "sam", "the queen"]),
+            }
+        )
+        self.assertEqual(
+            group.count("sam told her that he met the queen".split(" ")),
+            {"male": 2, "female": 3},
+        )
+        self.assertEqual(
+            group.count_batch(["He said", "she said"], lower=True),
+            {"male": [1, 0], "female": [0, 1]},
+        )
+
+    def test_lexicon_resource(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "lexicon.json")
+            with open(path, "w") as file:
+                json.dump({"corrections": {"recieve": "receive"}}, file)
+            lexicon = load_resource("lexicon", path, "corrections")
+            self.assertIs(lexicon, load_resource("lexicon", path, "corrections"))
+            self.assertEqual(lexicon.count(["i", "recieve", "it"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+from collections import defaultdict
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from datalabs import Dataset
+from datalabs.info import MongoDBClient
+from datalabs.utils.checkpoint import Checkpoint
+from datalabs.utils.mongodb_export import export_samples
+
+
+class StubCollection:
+    """stand-in of a pymongo collection, failing the insertions of the
+    documents whose "label" is in `failing`"""
+
+    def __init__(self, failing=()):
+        self.documents = []
+        self.n_calls = 0
+        self.failing = set(failing)
+        self.lock = threading.Lock()
+
+    def insert_many(self, documents, ordered=True):
+        assert not ordered
+        with self.lock:
+            self.n_calls += 1
+            if any(document["label"] in self.failing for document in documents):
+                raise ConnectionError("stub failure")
+            self.documents.extend(documents)
+
+    def insert_one(self, document):
+        self.documents.append(document)
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.dataset = Dataset.from_dict(
+            {"text": [f"text {i}" for i in range(25)], "label": list(range(25))}
+        )
+        self.rows = [{"text": f"text {i}", "label": i} for i in range(25)]
+
+    def test_export_samples(self):
+        for num_workers in [1, 3]:
+            collection = StubCollection()
+            n_inserted = export_samples(
+                self.dataset, collection, batch_size=10, num_workers=num_workers
+            )
+            self.assertEqual(n_inserted, 25)
+            self.assertEqual(collection.n_calls, 3)
+            self.assertEqual(
+                sorted(collection.documents, key=lambda document: document["label"]),
+                self.rows,
+            )
+
+    def test_export_selected_rows(self):
+        collection = StubCollection()
+        export_samples(self.dataset.select([3, 1]), collection)
+        self.assertEqual(collection.documents, [self.rows[3], self.rows[1]])
+
+        # only the indices of each batch are taken
+        indices = list(range(24, -1, -2))
+        collection = StubCollection()
+        with mock.patch(
+            "datalabs.operations.aggregate.arrow_compute.get_table",
+            side_effect=AssertionError,
+        ):
+            export_samples(self.dataset.select(indices), collection, batch_size=5)
+        self.assertEqual(collection.n_calls, 3)
+        self.assertEqual(collection.documents, [self.rows[i] for i in indices])
+
+    def test_resume(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "export.json")
+            for num_workers in [1, 2]:
+                collection = StubCollection(failing=[12])
+                with self.assertRaises(ConnectionError):
+                    export_samples(
+                        self.dataset,
+                        collection,
+                        batch_size=10,
+                        num_workers=num_workers,
+                        checkpoint=Checkpoint(path).load(["key"]),
+                    )
+                self.assertIn("batch-0", Checkpoint(path).load(["key"]).done)
+
+                collection.failing.clear()
+                export_samples(
+                    self.dataset,
+                    collection,
+                    batch_size=10,
+                    num_workers=num_workers,
+                    checkpoint=Checkpoint(path).load(["key"]),
+                )
+                # each batch is written once
+                self.assertEqual(
+                    sorted(
+                        collection.documents, key=lambda document: document["label"]
+                    ),
+                    self.rows,
+                )
+                os.remove(path)
+
+    def test_write_db(self):
+        databases = defaultdict(lambda: defaultdict(StubCollection))
+        core = mock.Mock(client=databases)
+        self.dataset._info.builder_name = "stub"
+        with mock.patch.dict(MongoDBClient.clients, {"cluster0": core}):
+            self.dataset.write_db(batch_size=10)
+
+        self.assertEqual(
+            len(databases["metadata"]["dev_dataset_metadata"].documents), 1
+        )
+        samples = databases["dev_samples_of_dataset"]["stub"]
+        self.assertEqual(samples.n_calls, 3)
+        self.assertEqual(samples.documents, self.rows)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import json
+import os
+import tempfile
+import unittest
+
+from datalabs import Dataset
+from datalabs.operations.featurize.featurizing import featurizing
+from datalabs.utils.profiling import profile, profiler
+
+
+@featurizing(name="get_char_length", contributor="datalab", task="Any")
+def get_char_length(text):
+    if text == "boom":
+        raise ValueError("boom")
+    return {"char_length": len(text)}
+
+
+@get_char_length.batch
+def get_char_length_batch(texts):
+    return {"char_length": [len(text) for text in texts]}
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.dataset = Dataset.from_dict(
+            {"text": ["I love this movie", "so boring", "a b c", "ok"] * 5}
+        )
+        profiler.reset()
+
+    def test_disabled(self):
+        self.assertFalse(profiler.enabled)
+        self.dataset.apply(get_char_length, mode="memory", load_from_cache_file=False)
+        self.assertEqual(profiler.summary()["operations"], {})
+
+    def test_row_calls(self):
+        with profile() as prof:
+            self.dataset.apply(
+                get_char_length, mode="memory", load_from_cache_file=False
+            )
+        self.assertFalse(profiler.enabled)
+        stats = prof.summary()["operations"]["get_char_length"]
+        self.assertEqual(stats["calls"], 20)
+        self.assertEqual(stats["rows"], 20)
+        self.assertEqual(stats["output_size"], 20)
+        self.assertEqual(stats["errors"], 0)
+        self.assertLessEqual(stats["p50_latency"], stats["max_latency"])
+        self.assertIn("build", prof.summary()["stages"])
+
+    def test_batched_calls(self):
+        with profile() as prof:
+            self.dataset.apply(
+                get_char_length,
+                mode="memory",
+                batched=True,
+                batch_size=8,
+                load_from_cache_file=False,
+            )
+        summary = prof.summary()
+        stats = summary["operations"]["get_char_length"]
+        self.assertEqual(stats["calls"], 3)
+        self.assertEqual(stats["rows"], 20)
+        self.assertEqual(stats["output_size"], 20)
+        self.assertEqual(summary["stages"]["fetch"]["calls"], 3)
+        self.assertEqual(summary["stages"]["call"]["calls"], 3)
+
+    def test_workers(self):
+        with profile() as prof:
+            self.dataset.apply(
+                get_char_length,
+                mode="memory",
+                batched=True,
+                batch_size=5,
+                num_proc=2,
+                load_from_cache_file=False,
+            )
+        summary = prof.summary()
+        self.assertEqual(summary["operations"]["get_char_length"]["calls"], 4)
+        self.assertEqual(summary["stages"]["call"]["calls"], 4)
+        self.assertIn("write", summary["stages"])
+
+    def test_errors(self):
+        dataset = Dataset.from_dict({"text": ["ok", "boom"]})
+        with profile() as prof:
+            with self.assertRaises(ValueError):
+                list(dataset.apply(get_char_length))
+        stats = prof.summary()["operations"]["get_char_length"]
+        self.assertEqual(stats["calls"], 2)
+        self.assertEqual(stats["errors"], 1)
+
+    def test_export(self):
+        with profile() as prof:
+            list(self.dataset.apply(get_char_length, batched=True, batch_size=10))
+        with tempfile.TemporaryDirectory() as directory:
+            prof.to_json(os.path.join(directory, "profile.json"))
+            prof.to_chrome_trace(os.path.join(directory, "trace.json"))
+            with open(os.path.join(directory, "profile.json")) as file:
+                summary = json.load(file)
+            with open(os.path.join(directory, "trace.json")) as file:
+                trace = json.load(file)
+        self.assertEqual(summary["operations"]["get_char_length"]["calls"], 2)
+        events = [
+            event for event in trace["traceEvents"] if event["cat"] == "operation"
+        ]
+        self.assertEqual(len(events), 2)
+        self.assertEqual(events[0]["name"], "get_char_length")
+        self.assertEqual(events[0]["ph"], "X")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from datalabs import config, Prompts
+from datalabs.commands.prefetch_prompts import find_prompt_urls
+from datalabs.utils.prompt_store import PromptStore
+
+PROMPTS = {
+    "395c4d0f15e059abaf2d185a80eecf9c": {
+        "id": "395c4d0f15e059abaf2d185a80eecf9c",
+        "template": "{{text}} \nWhat label best describes this news article? "
+        "||| \n{{answers[label]}}",
+    }
+}
+
+
+class StubServer(ThreadingHTTPServer):
+    """serves `prompts` with an ETag, and records the requests"""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.prompts = PROMPTS
+        self.etag = '"v1"'
+        self.requests = []
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/prompts.json"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requests.append(self.headers.get("If-None-Match"))
+        if not self.path.endswith("/prompts.json"):
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.headers.get("If-None-Match") == self.server.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps(self.server.prompts).encode()
+        self.send_response(200)
+        self.send_header("ETag", self.server.etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer()
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def store(self, **kwargs):
+        return PromptStore(cache_dir=self.tmp_dir.name, **kwargs)
+
+    def test_cached(self):
+        store = self.store(ttl=3600)
+        self.assertEqual(store.get(self.server.url), PROMPTS)
+        # read from the disk, by another store too
+        self.assertEqual(self.store(ttl=3600).get(self.server.url), PROMPTS)
+        self.assertEqual(self.server.requests, [None])
+        self.assertEqual(
+            store.get_prompt("395c4d0f15e059abaf2d185a80eecf9c"),
+            PROMPTS["395c4d0f15e059abaf2d185a80eecf9c"],
+        )
+        self.assertIsNone(store.get_prompt("unknown"))
+
+    def test_revalidate(self):
+        store = self.store(ttl=0)
+        store.get(self.server.url)
+        self.assertEqual(store.get(self.server.url), PROMPTS)
+        self.assertEqual(self.server.requests, [None, '"v1"'])
+
+        # the prompts changed
+        self.server.prompts = {"other": {"id": "other", "template": "{{text}}"}}
+        self.server.etag = '"v2"'
+        self.assertEqual(store.get(self.server.url), self.server.prompts)
+        self.assertEqual(store.get_prompt("other")["template"], "{{text}}")
+        self.assertEqual(len(os.listdir(os.path.join(self.tmp_dir.name, "objects"))), 2)
+
+    def test_offline(self):
+        store = self.store(ttl=0)
+        with mock.patch.object(config, "HF_DATASETS_OFFLINE", True):
+            self.assertEqual(store.get(self.server.url), {})
+        store.get(self.server.url)
+        with mock.patch.object(config, "HF_DATASETS_OFFLINE", True):
+            self.assertEqual(store.get(self.server.url), PROMPTS)
+        self.assertEqual(self.server.requests, [None])
+
+    def test_unreachable(self):
+        store = self.store(ttl=0)
+        url = self.server.url
+        store.get(url)
+        self.server.shutdown()
+        self.server.server_close()
+        self.assertEqual(store.get(url), PROMPTS)
+
+    def test_from_url(self):
+        with mock.patch.object(config, "HF_PROMPTS_CACHE", self.tmp_dir.name):
+            self.assertEqual(Prompts.from_url(self.server.url), PROMPTS)
+            self.assertEqual(Prompts.from_url(self.server.url), PROMPTS)
+        self.assertEqual(self.server.requests, [None])
+
+    def test_prefetch(self):
+        with tempfile.TemporaryDirectory() as datasets_dir:
+            os.makedirs(os.path.join(datasets_dir, "ag_news"))
+            with open(os.path.join(datasets_dir, "ag_news", "ag_news.py"), "w") as f:
+                f.write(f'_PROMPT_URL = "{self.server.url}"\n')
+            urls = find_prompt_urls(datasets_dir)
+        self.assertEqual(urls, [self.server.url])
+
+        missing_url = self.server.url.replace("prompts.json", "missing.json")
+        store = self.store(ttl=3600)
+        results = store.prefetch(urls + [missing_url, self.server.url])
+        self.assertEqual(results[self.server.url], 1)
+        self.assertIsInstance(results[missing_url], Exception)
+
+
+if __name__ == "__main__":
+    unittest.main()
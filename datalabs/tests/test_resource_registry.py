@@ -0,0 +1,64 @@
+import json
+import os
+import tempfile
+import unittest
+
+from datalabs.operations.featurize.featurizing import featurizing
+from datalabs.utils.resource_registry import (
+    load_resource,
+    register_resource,
+    requires_resources,
+    resource_registry,
+)
+
+n_loads = {"counter": 0}
+
+
+@register_resource("test_counter")
+def _load_counter(name: str):
+    n_loads["counter"] += 1
+    return {"name": name}
+
+
+@featurizing(name="get_counter_name", contributor="datalab", task="Any")
+@requires_resources(("test_counter", "a"))
+def get_counter_name(text: str):
+    return {"name": load_resource("test_counter", "a")["name"]}
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        resource_registry.clear()
+        n_loads["counter"] = 0
+
+    def test_resource_loaded_once(self):
+        first = load_resource("test_counter", "a")
+        second = load_resource("test_counter", "a")
+        self.assertIs(first, second)
+        self.assertEqual(n_loads["counter"], 1)
+
+        load_resource("test_counter", "b")
+        self.assertEqual(n_loads["counter"], 2)
+
+    def test_json_resource(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "lexicon.json")
+            with open(path, "w") as file:
+                json.dump({"colour": "color"}, file)
+            self.assertEqual(load_resource("json", path), {"colour": "color"})
+            self.assertTrue(resource_registry.is_loaded("json", path))
+
+    def test_unknown_resource(self):
+        with self.assertRaises(ValueError):
+            load_resource("not_registered", "a")
+
+    def test_warm_required_resources(self):
+        self.assertEqual(get_counter_name.required_resources, [("test_counter", "a")])
+        get_counter_name.warm_resources()
+        self.assertTrue(resource_registry.is_loaded("test_counter", "a"))
+        self.assertEqual(get_counter_name("x"), {"name": "a"})
+        self.assertEqual(n_loads["counter"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
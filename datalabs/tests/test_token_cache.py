@@ -0,0 +1,66 @@
+import tempfile
+import unittest
+from unittest import mock
+
+from datalabs import Dataset
+from datalabs.operations.aggregate.general import get_average_length, get_vocabulary
+from datalabs.operations.featurize.general import get_length
+from datalabs.operations.tokenizer import SingleSpaceTokenizer
+from datalabs.utils.apply_cache import apply_cache
+from datalabs.utils.token_cache import token_cache, TokenCache
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = apply_cache.cache_dir
+        apply_cache.cache_dir = self.tmp_dir.name
+        token_cache.clear()
+        self.dataset = Dataset.from_dict(
+            {"text": ["I love this movie", "I hate  this movie", "a good film"]}
+        )
+
+    def tearDown(self):
+        apply_cache.cache_dir = self.cache_dir
+        token_cache.clear()
+        self.tmp_dir.cleanup()
+
+    def test_cached_tokens(self):
+        tokens = token_cache.get(self.dataset, "text")
+        self.assertEqual(
+            tokens.to_pylist(),
+            [text.split(" ") for text in self.dataset["text"]],
+        )
+        self.assertIs(token_cache.get(self.dataset, "text"), tokens)
+
+        # another process reads the tokens from the disk
+        with mock.patch.object(
+            SingleSpaceTokenizer, "tokenize_column", side_effect=AssertionError
+        ):
+            self.assertEqual(
+                TokenCache().get(self.dataset, "text").to_pylist(), tokens.to_pylist()
+            )
+
+        selected = self.dataset.select([2, 0])
+        self.assertEqual(
+            token_cache.get(selected, "text").to_pylist(),
+            [["a", "good", "film"], ["I", "love", "this", "movie"]],
+        )
+
+    def test_operations_on_tokens(self):
+        result = self.dataset.apply(get_length, mode="memory", batched=True)
+        self.assertEqual(result["length"], [4, 5, 3])
+        self.assertEqual(
+            result["length"], [get_length(text)["length"] for text in result["text"]]
+        )
+
+        # the aggregations share the tokens of the featurizing operation
+        with mock.patch.object(
+            SingleSpaceTokenizer, "tokenize_column", side_effect=AssertionError
+        ):
+            self.assertEqual(get_average_length(self.dataset)["average_length"], 4)
+            self.assertEqual(get_vocabulary(self.dataset)["vocabulary"]["movie"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,14 @@
 import unittest
 
+import pyarrow as pa
+
 from datalabs import load_dataset
 from datalabs.operations.preprocess.general import tokenize
 from datalabs.operations.tokenizer import (
     get_default_tokenizer,
     get_tokenizer,
+    JiebaTokenizer,
+    SingleSpaceTokenizer,
     tokenizer_registry,
 )
 
@@ -25,6 +29,29 @@ class MyTestCase(unittest.TestCase):
         text_en = "I love this movie"
         print(my_tokenizer2(text_en))
 
+    def test_tokenize_batch(self):
+        texts = ["我喜欢这一部电影", "这部电影很无聊", None, "我不喜欢"] * 3
+        tokenizer = JiebaTokenizer(num_proc=2, batch_size=4)
+        tokens = tokenizer.tokenize_batch(texts)
+        self.assertEqual(tokens.type, pa.list_(pa.string()))
+        self.assertEqual(
+            tokens.to_pylist(),
+            [None if text is None else tokenizer(text) for text in texts],
+        )
+        # a column is segmented as one batch
+        column = pa.chunked_array([texts[:5], texts[5:]])
+        self.assertEqual(
+            tokenizer.tokenize_column(column).to_pylist(), tokens.to_pylist()
+        )
+
+        self.assertEqual(
+            SingleSpaceTokenizer().tokenize_batch(["I love  it", "a film"]).to_pylist(),
+            [["I", "love", "", "it"], ["a", "film"]],
+        )
+        self.assertEqual(
+            tokenize.call_batch(["I love  it"]), {"text_tokenized": ["I love  it"]}
+        )
+
     def test_tokenizer_operation(self):
 
         dataset = load_dataset("waimai")
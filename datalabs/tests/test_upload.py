@@ -0,0 +1,185 @@
+import gzip
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from client.uploader import DatasetUploader
+
+from datalabs import Dataset
+
+
+class StubServer(ThreadingHTTPServer):
+    """records the chunks it receives, failing the first request of the
+    chunks in `failing`"""
+
+    def __init__(self, failing=()):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.failing = set(failing)
+        self.chunks = {}
+        self.n_requests = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/upload"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        assert self.headers["Content-Encoding"] == "gzip"
+        lines = gzip.decompress(body).decode("utf8").splitlines()
+        header = json.loads(lines[0])
+        with self.server.lock:
+            self.server.n_requests += 1
+            failing = header["chunk"] in self.server.failing
+            self.server.failing.discard(header["chunk"])
+            if not failing:
+                self.server.chunks[header["chunk"]] = (
+                    header,
+                    [json.loads(line) for line in lines[1:]],
+                )
+        self.send_response(503 if failing else 200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class MyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.dataset_dict = {
+            "train": Dataset.from_dict(
+                {"text": [f"text {i}" for i in range(25)], "label": list(range(25))}
+            ),
+            "test": Dataset.from_dict({"text": ["a", "b", "c"], "label": [0, 1, 0]}),
+        }
+
+    def serve(self, failing=()):
+        server = StubServer(failing)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def uploader(self, server, **kwargs):
+        return DatasetUploader(
+            server.url,
+            credentials={"user_name": "user"},
+            chunk_size=10,
+            num_workers=2,
+            backoff_factor=0,
+            **kwargs,
+        )
+
+    def samples(self, server):
+        return [
+            sample
+            for _, (_, samples) in sorted(server.chunks.items())
+            for sample in samples
+        ]
+
+    def test_upload(self):
+        server = self.serve(failing=[0, 2])
+        upload_id = self.uploader(server).upload({"name": "stub"}, self.dataset_dict)
+
+        self.assertEqual(sorted(server.chunks), [0, 1, 2, 3])
+        # the failing chunks were sent again
+        self.assertEqual(server.n_requests, 6)
+        header, _ = server.chunks[0]
+        self.assertEqual(header["metadata"], {"name": "stub"})
+        self.assertEqual(header["user_name"], "user")
+        for header, _ in server.chunks.values():
+            self.assertEqual(header["upload_id"], upload_id)
+            self.assertEqual(header["n_chunks"], 4)
+        self.assertEqual(
+            self.samples(server),
+            [
+                {"split_name": "train", "features": {"text": f"text {i}", "label": i}}
+                for i in range(25)
+            ]
+            + [
+                {"split_name": "test", "features": {"text": text, "label": label}}
+                for text, label in [("a", 0), ("b", 1), ("c", 0)]
+            ],
+        )
+
+    def test_max_samples(self):
+        server = self.serve()
+        self.uploader(server).upload({}, self.dataset_dict, max_samples=12)
+        self.assertEqual(len(self.samples(server)), 15)
+
+    def test_selected_rows(self):
+        server = self.serve()
+        indices = list(range(24, -1, -2))
+        dataset_dict = {"train": self.dataset_dict["train"].select(indices)}
+        self.uploader(server).upload({}, dataset_dict)
+        self.assertEqual(sorted(server.chunks), [0, 1])
+        self.assertEqual(
+            [sample["features"]["label"] for sample in self.samples(server)], indices
+        )
+
+    def test_resume(self):
+        server = self.serve(failing=[2])
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint_path = os.path.join(directory, "upload.json")
+            uploader = self.uploader(
+                server, max_retries=0, checkpoint_path=checkpoint_path
+            )
+            with self.assertRaises(ConnectionError):
+                uploader.upload({}, self.dataset_dict)
+            self.assertEqual(sorted(server.chunks), [0, 1, 3])
+
+            with open(checkpoint_path) as file:
+                checkpoint = json.load(file)
+            self.assertEqual(checkpoint["done"], [0, 1, 3])
+            server.chunks.clear()
+
+            upload_id = uploader.upload({}, self.dataset_dict)
+            self.assertEqual(upload_id, checkpoint["data"]["upload_id"])
+            # only the missing chunk is sent again
+            self.assertEqual(sorted(server.chunks), [2])
+            self.assertFalse(os.path.exists(checkpoint_path))
+
+    def test_checkpoint_of_other_upload(self):
+        server = self.serve(failing=[2])
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint_path = os.path.join(directory, "upload.json")
+            uploader = self.uploader(
+                server, max_retries=0, checkpoint_path=checkpoint_path
+            )
+            with self.assertRaises(ConnectionError):
+                uploader.upload({"dataset_name": "stub"}, self.dataset_dict)
+            with open(checkpoint_path) as file:
+                upload_id = json.load(file)["data"]["upload_id"]
+
+            # the same splits sizes, but another dataset
+            server.chunks.clear()
+            other_dict = {
+                split_name: dataset.map(lambda sample: {"text": sample["text"] + "!"})
+                for split_name, dataset in self.dataset_dict.items()
+            }
+            other_id = uploader.upload({"dataset_name": "stub"}, other_dict)
+            self.assertNotEqual(other_id, upload_id)
+            self.assertEqual(sorted(server.chunks), [0, 1, 2, 3])
+
+            # the same samples, but another dataset name
+            server.chunks.clear()
+            server.failing = {2}
+            with self.assertRaises(ConnectionError):
+                uploader.upload({"dataset_name": "stub"}, self.dataset_dict)
+            with open(checkpoint_path) as file:
+                upload_id = json.load(file)["data"]["upload_id"]
+            server.chunks.clear()
+            other_id = uploader.upload({"dataset_name": "other"}, self.dataset_dict)
+            self.assertNotEqual(other_id, upload_id)
+            self.assertEqual(sorted(server.chunks), [0, 1, 2, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,282 @@
+"""On-disk cache of the results of `Dataset.apply`.
+
+Applying an operation to a dataset that didn't change gives the same result,
+so the generated columns of featurizing/editing operations and the statistics
+of aggregating operations are stored under a key made of the fingerprint of
+the dataset and of everything the result depends on in the operation: its
+name, the code of its function(s), its resources and its processed fields.
+The source files of the datalabs modules defining these functions and the
+helpers they call (i.e. their module-level tables too), the data files they
+refer to and the version of datalabs are part of the key, so that changing
+them doesn't serve stale results. Caching can be disabled with
+`datalabs.set_caching_enabled(False)`, or per call with `load_from_cache_file=False`.
+
+The cache is bounded by `config.HF_APPLY_CACHE_MAX_SIZE` bytes, the least
+recently used results are evicted first.
+"""
+
+from hashlib import sha256
+import inspect
+import marshal
+import os
+from pathlib import Path
+import pickle
+import sys
+from typing import Any, Callable, Dict, Iterator, Optional, Set, Tuple, Union
+
+import pyarrow as pa
+
+from datalabs import __version__, config
+from datalabs.arrow_writer import ArrowWriter
+from datalabs.fingerprint import Hasher, is_caching_enabled
+from datalabs.table import InMemoryTable
+from datalabs.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+COLUMNS_EXTENSION = ".arrow"
+STAT_EXTENSION = ".pkl"
+
+DATALABS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# we show a warning only once per operation when hashing fails to avoid spam
+hashing_warnings: Dict[str, bool] = {}
+
+# the hashes of the files already read, by (path, mtime, size)
+_file_hashes: Dict[Tuple[str, int, int], str] = {}
+
+
+def hash_file(path: str) -> str:
+    """hash of the content of a file, read again only if it changed"""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    if key not in _file_hashes:
+        with open(path, "rb") as file:
+            _file_hashes[key] = sha256(file.read()).hexdigest()
+    return _file_hashes[key]
+
+
+def _is_datalabs_file(path: Optional[str]) -> bool:
+    return path is not None and os.path.abspath(path).startswith(DATALABS_DIR)
+
+
+def _global_names(code) -> Iterator[str]:
+    yield from code.co_names
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            yield from _global_names(const)
+
+
+def _dependencies(func: Callable) -> Tuple[Set[str], Set[str]]:
+    """
+    the source files of the datalabs modules defining a function and the
+    functions, classes, objects and modules it refers to (recursively), and
+    the data files whose path is a global it refers to
+    """
+    source_files, data_files = set(), set()
+    seen = set()
+    pending = [func]
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        module = sys.modules.get(getattr(obj, "__module__", None))
+        source_file = getattr(module, "__file__", None)
+        if not _is_datalabs_file(source_file):
+            continue
+        source_files.add(os.path.abspath(source_file))
+        if inspect.isclass(obj):
+            pending.extend(
+                value for value in vars(obj).values() if inspect.isfunction(value)
+            )
+            continue
+        if not inspect.isfunction(obj):
+            continue
+        for name in _global_names(obj.__code__):
+            value = obj.__globals__.get(name)
+            if inspect.ismodule(value):
+                if _is_datalabs_file(getattr(value, "__file__", None)):
+                    source_files.add(os.path.abspath(value.__file__))
+            elif inspect.isfunction(value) or inspect.isclass(value):
+                pending.append(value)
+            elif isinstance(value, str):
+                if os.path.isfile(value):
+                    data_files.add(os.path.abspath(value))
+            elif value is not None:
+                # e.g. an operation or a `SUMAttribute` used by the function
+                pending.append(type(value))
+                if inspect.isfunction(getattr(value, "func", None)):
+                    pending.append(value.func)
+    return source_files, data_files
+
+
+def hash_function(func: Optional[Callable]) -> Optional[str]:
+    """
+    hash of the code of a function, of the functions it declares with
+    `accumulate` (see `datalabs.operations.aggregate.engine`), and of the
+    source and data files it depends on (see `_dependencies`). Unlike
+    `Hasher.hash`, the values of the globals it uses aren't pickled.
+    """
+    if func is None:
+        return None
+    hasher = Hasher()
+    hasher.update(getattr(func, "__module__", None))
+    hasher.update(getattr(func, "__qualname__", None))
+    hasher.update(marshal.dumps(func.__code__))
+    hasher.update(func.__defaults__)
+    source_files, data_files = _dependencies(func)
+    for path in sorted(source_files | data_files):
+        hasher.update(hash_file(path))
+    for name in ("features", "accumulators"):
+        if callable(getattr(func, name, None)):
+            hasher.update(hash_function(getattr(func, name)))
+    return hasher.hexdigest()
+
+
+class ApplyCache:
+    """
+    Parameters
+    cache_dir: directory of the cached results, default to
+    `config.HF_APPLY_CACHE`
+    max_size: maximum total size in bytes of the cached results, default to
+    `config.HF_APPLY_CACHE_MAX_SIZE`
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Union[str, Path]] = None,
+        max_size: Optional[int] = None,
+    ):
+        self.cache_dir = str(cache_dir or config.HF_APPLY_CACHE)
+        self.max_size = (
+            max_size if max_size is not None else config.HF_APPLY_CACHE_MAX_SIZE
+        )
+
+    def key(self, dataset, operation, kind: str, prefix: str = "") -> Optional[str]:
+        """
+        the key of the result of an operation applied to a dataset, or None
+        if caching is disabled or the operation can't be hashed
+        Parameters:
+          - kind: "columns" or "stat"
+          - prefix: prefix of the names of the generated columns
+        """
+        if not is_caching_enabled() or dataset._fingerprint is None:
+            return None
+        hasher = Hasher()
+        hasher.update(__version__)
+        hasher.update(dataset._fingerprint)
+        hasher.update(kind)
+        hasher.update(prefix)
+        hasher.update(operation.name)
+        # the operations on whole samples may have no processed fields
+        hasher.update(list(operation.processed_fields or ()))
+        try:
+            for func in (
+                operation.func,
+                operation.batch_func,
+                getattr(operation, "tokens_func", None),
+                getattr(operation, "arrow_func", None),
+            ):
+                hasher.update(hash_function(func))
+            hasher.update(operation.resources)
+            for value in operation.resources.values():
+                if isinstance(value, str) and os.path.isfile(value):
+                    hasher.update(hash_file(value))
+            # the state and the seeds of editing operations, see `Editing`
+            if getattr(operation, "setup_func", None) is not None:
+                hasher.update(hash_function(operation.setup_func))
+            if getattr(operation, "seed", None) is not None:
+                hasher.update(operation.seed)
+        except Exception:  # noqa: E722
+            if not hashing_warnings.get(operation.name, False):
+                hashing_warnings[operation.name] = True
+                logger.warning(
+                    f"Operation {operation.name} couldn't be hashed properly, "
+                    f"its results won't be cached."
+                )
+            return None
+        return hasher.hexdigest()
+
+    def _path(self, key: str, extension: str) -> str:
+        return os.path.join(self.cache_dir, key + extension)
+
+    def _hit(self, path: str) -> bool:
+        if not os.path.exists(path):
+            return False
+        # the modification time orders the results for the eviction
+        os.utime(path)
+        return True
+
+    def load_columns(self, key: str) -> Optional[InMemoryTable]:
+        path = self._path(key, COLUMNS_EXTENSION)
+        if not self._hit(path):
+            return None
+        logger.info(f"Loading cached columns at {path}")
+        return InMemoryTable.from_file(path)
+
+    def save_columns(self, key: str, table: pa.Table):
+        path = self._path(key, COLUMNS_EXTENSION)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with ArrowWriter(path=path + ".incomplete", with_metadata=False) as writer:
+            writer.write_table(table)
+            writer.finalize()
+        os.replace(path + ".incomplete", path)
+        self.evict(keep=path)
+
+    def load_stat(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key, STAT_EXTENSION)
+        if not self._hit(path):
+            return None
+        logger.info(f"Loading cached statistics at {path}")
+        with open(path, "rb") as file:
+            return pickle.load(file)
+
+    def save_stat(self, key: str, result: Dict[str, Any]):
+        path = self._path(key, STAT_EXTENSION)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(path + ".incomplete", "wb") as file:
+            pickle.dump(result, file)
+        os.replace(path + ".incomplete", path)
+        self.evict(keep=path)
+
+    def _entries(self):
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith((COLUMNS_EXTENSION, STAT_EXTENSION)):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, keep: Optional[str] = None):
+        """remove the least recently used results until the cache fits in
+        `max_size`, except `keep`"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        for _, _, path in self._entries():
+            os.remove(path)
+
+
+apply_cache = ApplyCache()
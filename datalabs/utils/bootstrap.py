@@ -0,0 +1,270 @@
+"""Bootstrap confidence intervals of evaluation metrics.
+
+Most metrics are computed from sums of per-sample statistics, e.g. accuracy
+is the mean of the per-sample correctness and micro-F1 is computed from the
+numbers of true positives, false positives and false negatives. For them,
+the statistics are computed once and every resample of the bootstrap only
+sums rows of a matrix:
+
+    statistics = accuracy.statistics(true_labels, predicted_labels)
+    performances = bootstrap(statistics, accuracy.compute, n_sampling=800)
+    low, up = confidence_interval(performances)
+
+The indices of the resamples are drawn as one matrix per chunk of resamples,
+chunks are bounded by `MAX_CHUNK_ELEMENTS` indices and can be spread over a
+process pool. When the statistics only take a few distinct values (e.g. 0 or
+1 for accuracy), the number of times each value is drawn is sampled instead
+of the indices. Each chunk has its own seed derived from `seed`, so the
+results don't depend on the number of processes.
+"""
+
+from multiprocessing import Pool
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from datalabs.utils.eval_basic_qa import (
+    exact_match_sample_level,
+    f1_score_qa_sample_level,
+    metric_max_over_ground_truths,
+)
+
+# maximum number of indices (or counts) drawn at once, i.e. 128MB of int64
+MAX_CHUNK_ELEMENTS = 1 << 24
+
+
+class BootstrapMetric:
+    """A metric computed from the sums of per-sample statistics"""
+
+    def statistics(self, true_labels, predicted_labels) -> np.ndarray:
+        """the statistics of each sample, as a (n_samples, n_statistics)
+        matrix"""
+        raise NotImplementedError
+
+    def compute(self, sums: np.ndarray, n_samples: int) -> np.ndarray:
+        """the values of the metric from the (n_resamples, n_statistics) sums
+        of the statistics of resamples of `n_samples` samples"""
+        raise NotImplementedError
+
+    def __call__(self, true_labels, predicted_labels) -> float:
+        statistics = self.statistics(true_labels, predicted_labels)
+        return self.compute(statistics.sum(axis=0)[None], len(statistics))[0]
+
+
+class MeanScore(BootstrapMetric):
+    """
+    Mean of a per-sample score, e.g. accuracy or exact match
+
+    Parameters
+    score: function scoring a (true label, predicted label) pair
+    scale: e.g. 100 to get percentages
+    """
+
+    def __init__(self, score: Callable[[Any, Any], float], scale: float = 1.0):
+        self.score = score
+        self.scale = scale
+
+    def statistics(self, true_labels, predicted_labels) -> np.ndarray:
+        return np.fromiter(
+            (
+                self.score(true_label, predicted_label)
+                for true_label, predicted_label in zip(true_labels, predicted_labels)
+            ),
+            dtype=np.float64,
+        ).reshape(-1, 1)
+
+    def compute(self, sums: np.ndarray, n_samples: int) -> np.ndarray:
+        return sums[:, 0] / n_samples * self.scale
+
+
+class MicroF1(BootstrapMetric):
+    """Micro-averaged F1 score of single-label predictions"""
+
+    def statistics(self, true_labels, predicted_labels) -> np.ndarray:
+        # (true positives, false positives, false negatives), a wrong
+        # prediction is both a false positive and a false negative
+        return np.array(
+            [
+                (1, 0, 0) if true_label == predicted_label else (0, 1, 1)
+                for true_label, predicted_label in zip(true_labels, predicted_labels)
+            ],
+            dtype=np.float64,
+        ).reshape(-1, 3)
+
+    def compute(self, sums: np.ndarray, n_samples: int) -> np.ndarray:
+        true_positives, false_positives, false_negatives = sums.T
+        denominator = 2 * true_positives + false_positives + false_negatives
+        return np.divide(
+            2 * true_positives,
+            denominator,
+            out=np.zeros_like(denominator),
+            where=denominator != 0,
+        )
+
+
+def _is_equal(true_label, predicted_label) -> bool:
+    return true_label == predicted_label
+
+
+def _is_hit(true_label, predicted_labels) -> bool:
+    return true_label in predicted_labels
+
+
+class QAScore:
+    """Best score of a predicted answer over the true answers"""
+
+    def __init__(self, metric_fn: Callable[[str, str], float]):
+        self.metric_fn = metric_fn
+
+    def __call__(self, true_answers: list, predicted_answer: str) -> float:
+        return metric_max_over_ground_truths(
+            self.metric_fn, predicted_answer, true_answers
+        )
+
+
+accuracy = MeanScore(_is_equal)
+hits = MeanScore(_is_hit)
+micro_f1 = MicroF1()
+exact_match_qa = MeanScore(QAScore(exact_match_sample_level), scale=100.0)
+f1_score_qa = MeanScore(QAScore(f1_score_qa_sample_level), scale=100.0)
+
+
+def _chunks(n_times: int, n_sampling: int, max_chunk_elements: int) -> List[int]:
+    """the numbers of resamples of the chunks"""
+    chunk_size = max(1, max_chunk_elements // n_sampling)
+    return [min(chunk_size, n_times - start) for start in range(0, n_times, chunk_size)]
+
+
+def _draw_indices(n_resamples, n_samples, n_sampling, seed) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, n_samples, size=(n_resamples, n_sampling))
+
+
+def _group_rows(statistics: np.ndarray):
+    """the distinct rows of the statistics and their frequencies"""
+    rows, counts = np.unique(statistics, axis=0, return_counts=True)
+    return rows, counts / len(statistics)
+
+
+def _resample_sums(statistics, probabilities, n_resamples, n_sampling, seed):
+    """
+    the sums of the statistics of resamples, drawn from the distinct rows of
+    the statistics with their `probabilities` if given: the number of times
+    each distinct row is drawn follows a multinomial distribution, so it has
+    the same distribution as drawing samples but costs O(#distinct rows)
+    """
+    if probabilities is not None:
+        rng = np.random.default_rng(seed)
+        counts = rng.multinomial(n_sampling, probabilities, size=n_resamples)
+        return counts @ statistics
+    indices = _draw_indices(n_resamples, len(statistics), n_sampling, seed)
+    # one column at a time to avoid a (n_resamples, n_sampling, d) array
+    return np.stack([column[indices].sum(axis=1) for column in statistics.T], axis=1)
+
+
+# the statistics are sent once to each worker of the pool, not with each chunk
+_worker_statistics = None
+
+
+def _init_worker(statistics, probabilities):
+    global _worker_statistics
+    _worker_statistics = (statistics, probabilities)
+
+
+def _resample_sums_in_worker(args) -> np.ndarray:
+    return _resample_sums(*_worker_statistics, *args)
+
+
+def bootstrap(
+    statistics: np.ndarray,
+    compute: Callable[[np.ndarray, int], np.ndarray],
+    n_sampling: int,
+    n_times: int = 1000,
+    seed: Optional[int] = None,
+    num_proc: int = 1,
+    max_chunk_elements: int = MAX_CHUNK_ELEMENTS,
+) -> np.ndarray:
+    """
+    the values of a metric on `n_times` resamples (with replacement) of
+    `n_sampling` samples
+    Parameters:
+      - statistics: the (n_samples, n_statistics) per-sample statistics, see
+      `BootstrapMetric.statistics`
+      - compute: the metric computed from the sums of the statistics of the
+      resamples, see `BootstrapMetric.compute`
+      - seed: seed of the random generator, the resamples are not
+      reproducible if None
+      - num_proc: number of processes the chunks of resamples are spread over
+    """
+    # e.g. the statistics of accuracy only take the values 0 and 1
+    rows, probabilities = _group_rows(statistics)
+    if len(rows) < n_sampling:
+        statistics, n_draws = rows, len(rows)
+    else:
+        probabilities, n_draws = None, n_sampling
+
+    chunks = _chunks(n_times, n_draws, max_chunk_elements)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    args = [
+        (n_resamples, n_sampling, chunk_seed)
+        for n_resamples, chunk_seed in zip(chunks, seeds)
+    ]
+    if num_proc > 1 and len(chunks) > 1:
+        with Pool(
+            min(num_proc, len(chunks)),
+            initializer=_init_worker,
+            initargs=(statistics, probabilities),
+        ) as pool:
+            sums = pool.map(_resample_sums_in_worker, args)
+    else:
+        sums = [_resample_sums(statistics, probabilities, *arg) for arg in args]
+    return compute(np.concatenate(sums), n_sampling)
+
+
+def bootstrap_function(
+    eval_function: Callable[..., float],
+    columns: Sequence[Sequence],
+    n_sampling: int,
+    n_times: int = 1000,
+    seed: Optional[int] = None,
+    max_chunk_elements: int = MAX_CHUNK_ELEMENTS,
+    **kwargs,
+) -> np.ndarray:
+    """
+    the values of any metric, computed by `eval_function` on the resampled
+    `columns` (e.g. the true and the predicted labels), for metrics that can't
+    be expressed as a `BootstrapMetric`
+    """
+    columns = [np.asarray(column) for column in columns]
+    chunks = _chunks(n_times, n_sampling, max_chunk_elements)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    performances = []
+    for n_resamples, chunk_seed in zip(chunks, seeds):
+        indices = _draw_indices(n_resamples, len(columns[0]), n_sampling, chunk_seed)
+        for sample_indices in indices:
+            performances.append(
+                eval_function(*[column[sample_indices] for column in columns], **kwargs)
+            )
+    return np.array(performances)
+
+
+def mean_confidence_interval(data, confidence=0.95):
+    import scipy.stats
+
+    a = 1.0 * np.array(data)
+    n = len(a)
+    m, se = np.mean(a), scipy.stats.sem(a)
+    h = se * scipy.stats.t.ppf((1 + confidence) / 2.0, n - 1)
+    return m - h, m + h
+
+
+def confidence_interval(performances: Sequence[float]) -> Tuple[float, float]:
+    """
+    the 95% confidence interval of the values of a metric on the resamples:
+    their 2.5th and 97.5th percentiles for 1000 resamples, the confidence
+    interval of their mean otherwise
+    """
+    if len(performances) != 1000:
+        return mean_confidence_interval(performances)
+    performances = np.sort(performances)
+    return performances[24], performances[974]
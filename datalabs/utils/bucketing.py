@@ -0,0 +1,295 @@
+"""Array-based bucketing of feature values, for the fine-grained analysis.
+
+The bucketing methods named by `BucketInfo._method` (e.g.
+"bucket_attribute_specified_bucket_value") take the values of a feature and
+return the samples (e.g. their ids) of each bucket:
+
+    bucket_by_value([0.1, 0.5, 0.2, 0.9], bucket_number=2)
+    # {(0.1, 0.5): [0, 2, 1], (0.9, 1.0): [3]}
+
+The values are grouped once with `np.unique`, so the cost of the bucketing
+only depends on the number of distinct values and buckets:
+- `bucket_by_value` cuts the sorted distinct values into buckets of about the
+  same number of samples, the boundaries are found with `np.searchsorted`
+  over the cumulative counts of the values,
+- `bucket_by_interval` assigns each distinct value to the first interval
+  containing it,
+- `bucket_by_discrete_value` keeps the most frequent values.
+
+The values can be Python sequences, numpy arrays or Arrow arrays, and several
+features of a dataset can be bucketed in one call with `bucket_features`. The
+results are the same as the ones of the functions of `datalabs.utils.analysis`.
+"""
+
+import math
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pyarrow as pa
+
+Buckets = Dict[Tuple, List]
+
+# bounds of the last bucket of `bucket_by_value`
+P_INFINITY = 1000000
+N_INFINITY = -1000000
+
+
+def _to_numpy(values, dtype=None) -> np.ndarray:
+    if isinstance(values, pa.ChunkedArray):
+        values = values.combine_chunks()
+    if isinstance(values, pa.Array):
+        values = values.to_numpy(zero_copy_only=False)
+    return np.asarray(values, dtype=dtype)
+
+
+def _ids_array(ids, n_samples: int) -> np.ndarray:
+    """the ids of the samples, their positions by default"""
+    if ids is None:
+        return np.arange(n_samples)
+    if isinstance(ids, (pa.Array, pa.ChunkedArray)):
+        ids = ids.to_pylist()
+    # object arrays keep the ids as they were given
+    array = np.empty(len(ids), dtype=object)
+    array[:] = list(ids)
+    return array
+
+
+def _group_sorted(values: np.ndarray):
+    """the sorted distinct values, the sample positions sorted by value (then
+    by position) and the offsets of each distinct value in them"""
+    unique, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    order = np.argsort(inverse, kind="stable")
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    return unique, inverse, counts, order, offsets
+
+
+def _group_by_frequency(values):
+    """
+    the distinct values sorted by decreasing number of samples (then by first
+    appearance), the number of samples of each of them, and the sample
+    positions sorted the same way with the offsets of each distinct value
+    """
+    if isinstance(values, (pa.Array, pa.ChunkedArray)):
+        # the dictionary is in order of first appearance
+        encoded = values.dictionary_encode()
+        if isinstance(encoded, pa.ChunkedArray):
+            encoded = encoded.combine_chunks()
+        keys = encoded.dictionary.to_pylist()
+        inverse = encoded.indices.to_numpy(zero_copy_only=False)
+        counts = np.bincount(inverse, minlength=len(keys))
+        first_index = np.arange(len(keys))
+    else:
+        python_values = list(values)
+        unique, first_index, inverse, counts = np.unique(
+            np.asarray(python_values),
+            return_index=True,
+            return_inverse=True,
+            return_counts=True,
+        )
+        # the values as they were given (e.g. not numpy scalars)
+        keys = [python_values[index] for index in first_index]
+
+    frequency_order = np.lexsort((first_index, -counts))
+    rank = np.empty_like(frequency_order)
+    rank[frequency_order] = np.arange(len(frequency_order))
+    order = np.argsort(rank[inverse], kind="stable")
+    sorted_counts = counts[frequency_order]
+    offsets = np.concatenate([[0], np.cumsum(sorted_counts)])
+    return [keys[index] for index in frequency_order], sorted_counts, order, offsets
+
+
+def bucket_by_value(
+    values, bucket_number: int = 4, bucket_setting: Iterable = (), ids=None
+) -> Optional[Buckets]:
+    """
+    Equal-frequency bucketing of numerical values: each of the values of
+    `bucket_setting` found in the values gets its own bucket, the other
+    distinct values are cut into (about) `bucket_number` buckets of
+    consecutive values, each one closed as soon as it has more samples than
+    the average. The key of a bucket is its first and last values, or only
+    its value if it has one, the last bucket being open-ended.
+    Same as `analysis.bucket_attribute_specified_bucket_value`.
+    Parameters:
+      - values: the values of the feature, one per sample
+      - ids: the ids of the samples, their positions by default
+    """
+    values = _to_numpy(values, dtype=np.float64)
+    if len(values) == 0:
+        return None
+    ids = _ids_array(ids, len(values))
+    unique, inverse, counts, order, offsets = _group_sorted(values)
+    positions = {value: position for position, value in enumerate(unique.tolist())}
+
+    n_spans, n_buckets = len(values), bucket_number
+    buckets: Buckets = {}
+    is_hardcoded = np.zeros(len(unique), dtype=bool)
+    for bucket_value in bucket_setting or ():
+        if bucket_value in positions:
+            position = positions[bucket_value]
+            buckets[(bucket_value,)] = ids[
+                order[offsets[position] : offsets[position + 1]]
+            ].tolist()
+            is_hardcoded[position] = True
+            n_spans -= int(counts[position])
+            n_buckets -= 1
+    avg_entity = n_spans * 1.0 / n_buckets
+
+    # the other values and their samples, still sorted by value
+    remaining = np.flatnonzero(~is_hardcoded)
+    remaining_order = order[~is_hardcoded[inverse[order]]]
+    cumulative_counts = np.cumsum(counts[remaining])
+    # a bucket is closed once it has more than `avg_entity` samples
+    threshold = max(math.floor(avg_entity) + 1, 1)
+
+    start, n_before = 0, 0
+    while start < len(remaining):
+        end = int(np.searchsorted(cumulative_counts, n_before + threshold, side="left"))
+        first_value = float(unique[remaining[start]])
+        if end >= len(remaining):
+            if n_buckets == 1:
+                key = (N_INFINITY, P_INFINITY)
+            else:
+                key = (first_value, 1.0 if first_value <= 1 else P_INFINITY)
+            buckets[key] = ids[remaining_order[n_before:]].tolist()
+            break
+        if end > start:
+            key = (first_value, float(unique[remaining[end]]))
+        else:
+            key = (first_value,)
+        buckets[key] = ids[remaining_order[n_before : cumulative_counts[end]]].tolist()
+        start, n_before = end + 1, int(cumulative_counts[end])
+    return buckets
+
+
+def bucket_by_discrete_value(
+    values, bucket_number: int = 100000000, bucket_setting: int = 1, ids=None
+) -> Buckets:
+    """
+    One bucket for each of the `bucket_number` most frequent values, keeping
+    the values of at least `bucket_setting` samples.
+    Same as `analysis.bucket_attribute_discrete_value`.
+    """
+    n_samples = len(values)
+    if n_samples == 0:
+        return {}
+    ids = _ids_array(ids, n_samples)
+    keys, counts, order, offsets = _group_by_frequency(values)
+    n_kept = min(int(np.sum(counts >= bucket_setting)), max(bucket_number, 0))
+    return {
+        (keys[position],): ids[
+            order[offsets[position] : offsets[position + 1]]
+        ].tolist()
+        for position in range(n_kept)
+    }
+
+
+def bucket_by_interval(
+    values,
+    bucket_number: Optional[int] = None,
+    bucket_setting: Sequence[Tuple] = None,
+    ids=None,
+) -> Buckets:
+    """
+    One bucket for each of the intervals of `bucket_setting`: a value `(v,)`
+    or the bounds `(low, up)` of a closed interval, a sample going to the
+    first interval containing its value. Intervals of strings are discrete
+    values (e.g. entity tags), their buckets are sorted by decreasing number
+    of samples.
+    Same as `analysis.bucket_attribute_specified_bucket_interval`.
+    """
+    intervals = list(bucket_setting)
+    n_samples = len(values)
+    ids = _ids_array(ids, n_samples)
+
+    if isinstance(intervals[0][0], str):
+        buckets: Buckets = {}
+        if n_samples:
+            keys, counts, order, offsets = _group_by_frequency(values)
+            wanted = set(intervals)
+            for position, key in enumerate(keys):
+                if (key,) in wanted:
+                    buckets[(key,)] = ids[
+                        order[offsets[position] : offsets[position + 1]]
+                    ].tolist()
+        for interval in intervals:
+            buckets.setdefault(interval, [])
+        return buckets
+
+    intervals = list(dict.fromkeys(intervals))
+    buckets = {interval: [] for interval in intervals}
+    values = _to_numpy(values, dtype=np.float64)
+    if n_samples == 0:
+        return buckets
+    unique, inverse, _, order, _ = _group_sorted(values)
+
+    # (n_distinct_values, n_intervals) matrix of the values in each interval
+    matches = np.zeros((len(unique), len(intervals)), dtype=bool)
+    for position, interval in enumerate(intervals):
+        if len(interval) == 1:
+            matches[:, position] = unique == interval[0]
+        elif len(interval) == 2:
+            matches[:, position] = (unique >= interval[0]) & (unique <= interval[1])
+    value_buckets = np.where(matches.any(axis=1), matches.argmax(axis=1), -1)
+
+    # samples sorted by bucket, then by value, then by position
+    sample_buckets = value_buckets[inverse[order]]
+    bucket_order = order[np.argsort(sample_buckets, kind="stable")]
+    bucket_counts = np.bincount(sample_buckets + 1, minlength=len(intervals) + 1)
+    offsets = np.cumsum(bucket_counts)
+    for position, interval in enumerate(intervals):
+        buckets[interval] = ids[
+            bucket_order[offsets[position] : offsets[position + 1]]
+        ].tolist()
+    return buckets
+
+
+BUCKETING_METHODS = {
+    "bucket_attribute_specified_bucket_value": bucket_by_value,
+    "bucket_attribute_discrete_value": bucket_by_discrete_value,
+    "bucket_attribute_specified_bucket_interval": bucket_by_interval,
+}
+
+
+def bucket_column(values, bucket_info, ids=None) -> Optional[Buckets]:
+    """bucket the values of a feature with the strategy of a `BucketInfo`"""
+    method = BUCKETING_METHODS[bucket_info._method]
+    return method(values, bucket_info._number, bucket_info._setting, ids=ids)
+
+
+def bucket_features(
+    dataset,
+    bucket_infos: Optional[Dict[str, Any]] = None,
+    ids: Union[str, Sequence, None] = None,
+) -> Dict[str, Optional[Buckets]]:
+    """
+    bucket several features of a dataset, directly from its Arrow columns
+    Parameters:
+      - dataset: a `Dataset` or a `pyarrow.Table`
+      - bucket_infos: the `BucketInfo` of each feature to bucket, by default
+      the ones of the `Value` features of the dataset having one
+      - ids: the ids of the samples, or the name of the column of the ids,
+      the positions of the samples by default
+    """
+    if isinstance(dataset, pa.Table):
+        table = dataset
+    else:
+        if bucket_infos is None:
+            bucket_infos = {
+                name: feature.bucket_info
+                for name, feature in dataset.features.items()
+                if getattr(feature, "bucket_info", None) is not None
+            }
+        if dataset._indices is not None:
+            dataset = dataset.flatten_indices()
+        table = dataset.data.table
+    if bucket_infos is None:
+        raise ValueError("bucket_infos is required to bucket the columns of a table")
+    if isinstance(ids, str):
+        ids = table.column(ids)
+    if ids is not None:
+        ids = _ids_array(ids, table.num_rows)
+
+    return {
+        name: bucket_column(table.column(name), bucket_info, ids=ids)
+        for name, bucket_info in bucket_infos.items()
+    }
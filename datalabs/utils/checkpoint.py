@@ -0,0 +1,59 @@
+"""Checkpoints of resumable jobs, e.g. exports and uploads of datasets.
+
+The steps of a job done so far (e.g. the batches written) are saved to a
+json file after each step, under a key identifying the job (e.g. the
+fingerprint of the dataset and the batch size). Running the job again with
+the same checkpoint file and key skips the steps already done:
+
+    checkpoint = Checkpoint("export.json").load([dataset._fingerprint, 1000])
+    for offset, batch in batches:
+        if f"batch-{offset}" not in checkpoint.done:
+            write(batch)
+            checkpoint.mark_done(f"batch-{offset}")
+    checkpoint.remove()
+"""
+
+import json
+import os
+from typing import Any, Dict, Optional
+
+
+class Checkpoint:
+    """
+    Parameters
+    path: the checkpoint file, nothing is saved if None
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.key: Any = None
+        self.done = set()
+        # other state of the job to resume, e.g. the id of an upload
+        self.data: Dict[str, Any] = {}
+
+    def load(self, key: Any) -> "Checkpoint":
+        """resume the job of the checkpoint file if it has the same key"""
+        if self.path is not None and os.path.exists(self.path):
+            with open(self.path, encoding="utf8") as file:
+                state = json.load(file)
+            if state["key"] == key:
+                self.done = set(state["done"])
+                self.data = state.get("data", {})
+        self.key = key
+        return self
+
+    def save(self):
+        if self.path is None:
+            return
+        state = {"key": self.key, "done": sorted(self.done), "data": self.data}
+        with open(self.path + ".incomplete", "w", encoding="utf8") as file:
+            json.dump(state, file)
+        os.replace(self.path + ".incomplete", self.path)
+
+    def mark_done(self, step):
+        self.done.add(step)
+        self.save()
+
+    def remove(self):
+        if self.path is not None and os.path.exists(self.path):
+            os.remove(self.path)
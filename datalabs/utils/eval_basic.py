@@ -1,10 +1,15 @@
-from random import choices
 from typing import List
 
-import numpy as np
-import scipy
 from seqeval.metrics import f1_score, precision_score, recall_score
 
+from datalabs.utils import bootstrap
+
+# defined here before it moved to `datalabs.utils.bootstrap`
+from datalabs.utils.bootstrap import mean_confidence_interval  # noqa: F401
+
+# the bootstrap form of `accuracy`
+accuracy_percentage = bootstrap.MeanScore(bootstrap.accuracy.score, scale=100.0)
+
 """
 Sequence Labeling
 """
@@ -79,53 +84,57 @@ def accuracy(labels: List[str], predictions: List[str], language=None):
     return accuracy_value * 100
 
 
-def mean_confidence_interval(data, confidence=0.95):
-    a = 1.0 * np.array(data)
-    n = len(a)
-    m, se = np.mean(a), scipy.stats.sem(a)
-    h = se * scipy.stats.t.ppf((1 + confidence) / 2.0, n - 1)
-    return m - h, m + h
-
+def _get_sample_rate(n_data):
+    res = 0.8
+    if n_data > 300000:
+        res = 0.1
+    elif n_data > 100000 and n_data < 300000:
+        res = 0.2
 
-def compute_confidence_interval_acc(true_label_list, pred_label_list, n_times=1000):
-    def get_sample_rate(n_data):
-        res = 0.8
-        if n_data > 300000:
-            res = 0.1
-        elif n_data > 100000 and n_data < 300000:
-            res = 0.2
+    return res
 
-        return res
 
+def _bootstrap_confidence_interval(
+    metric, true_label_list, pred_label_list, n_times, seed, num_proc
+):
     n_data = len(true_label_list)
-    sample_rate = get_sample_rate(n_data)
+    sample_rate = _get_sample_rate(n_data)
     n_sampling = int(n_data * sample_rate)
     if n_sampling == 0:
         n_sampling = 1
-    # print("n_data:\t", n_data)
-    # print("sample_rate:\t", sample_rate)
-    # print("n_sampling:\t", n_sampling)
-
-    performance_list = []
-    confidence_low, confidence_up = 0, 0
-    for i in range(n_times):
-        sample_index_list = choices(range(n_data), k=n_sampling)
-
-        performance = accuracy(
-            list(np.array(true_label_list)[sample_index_list]),
-            list(np.array(pred_label_list)[sample_index_list]),
-        )
-        performance_list.append(performance)
-
-    if n_times != 1000:
-        confidence_low, confidence_up = mean_confidence_interval(performance_list)
-    else:
-        performance_list.sort()
-        confidence_low = performance_list[24]
-        confidence_up = performance_list[974]
-
-    # print("\n")
-    # print("confidence_low:\t", confidence_low)
-    # print("confidence_up:\t", confidence_up)
-
-    return confidence_low, confidence_up
+
+    performance_list = bootstrap.bootstrap(
+        metric.statistics(true_label_list, pred_label_list),
+        metric.compute,
+        n_sampling,
+        n_times=n_times,
+        seed=seed,
+        num_proc=num_proc,
+    )
+    return bootstrap.confidence_interval(performance_list)
+
+
+def compute_confidence_interval_acc(
+    true_label_list, pred_label_list, n_times=1000, seed=None, num_proc=1
+):
+    return _bootstrap_confidence_interval(
+        accuracy_percentage, true_label_list, pred_label_list, n_times, seed, num_proc
+    )
+
+
+def compute_confidence_interval_qa(
+    true_answers,
+    predicted_answers,
+    metric="f1",
+    n_times=1000,
+    seed=None,
+    num_proc=1,
+):
+    """
+    confidence interval of the (max over the true answers) F1 score or exact
+    match of predicted answers, see `f1_score_qa` and `exact_match_qa`
+    """
+    metrics = {"f1": bootstrap.f1_score_qa, "exact_match": bootstrap.exact_match_qa}
+    return _bootstrap_confidence_interval(
+        metrics[metric], true_answers, predicted_answers, n_times, seed, num_proc
+    )
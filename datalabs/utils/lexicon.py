@@ -0,0 +1,163 @@
+"""Compiled word lists (lexicons) shared by the featurizing and aggregating
+operations, e.g. basic words, gendered words and names or common
+misspellings.
+
+Single words are kept in a frozen hash set, so looking up a token costs the
+same whatever the size of the lexicon. Multi-word entries (e.g. "new york")
+are compiled into an Aho-Corasick automaton over tokens that finds all their
+occurrences with one pass over the tokens of a text:
+
+    lexicon = Lexicon(["good", "new york"])
+    lexicon.count("a good day in new york".split(" "))  # 2
+
+Several lexicons matched against the same tokens can be grouped, each token
+is then looked up once for all of them:
+
+    group = LexiconGroup({"male": Lexicon(["he"]), "female": Lexicon(["she"])})
+    group.count_batch(["he said", "she said"])
+    # {"male": [1, 0], "female": [0, 1]}
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Sequence
+
+
+class PhraseAutomaton:
+    """Aho-Corasick automaton over tokens, matching phrases (sequences of
+    tokens) as whole words"""
+
+    def __init__(self, phrases: Iterable[Sequence[str]]):
+        # the trie, node 0 being the root
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        # number of phrases ending at each node, including through failures
+        self.n_outputs: List[int] = [0]
+        for phrase in phrases:
+            self._add(phrase)
+        self._compile()
+
+    def _add(self, phrase: Sequence[str]):
+        node = 0
+        for token in phrase:
+            if token not in self.goto[node]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.n_outputs.append(0)
+                self.goto[node][token] = len(self.goto) - 1
+            node = self.goto[node][token]
+        # duplicated phrases are only counted once
+        self.n_outputs[node] = 1
+
+    def _compile(self):
+        """set the failure links in breadth-first order"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self.goto[node].items():
+                queue.append(child)
+                fail = self.fail[node]
+                while fail != 0 and token not in self.goto[fail]:
+                    fail = self.fail[fail]
+                self.fail[child] = self.goto[fail].get(token, 0)
+                self.n_outputs[child] += self.n_outputs[self.fail[child]]
+
+    def count(self, tokens: Iterable[str]) -> int:
+        """number of occurrences of the phrases, overlapping ones included"""
+        node, n_matches = 0, 0
+        goto, fail, n_outputs = self.goto, self.fail, self.n_outputs
+        for token in tokens:
+            while node != 0 and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            n_matches += n_outputs[node]
+        return n_matches
+
+
+class Lexicon:
+    """
+    Parameters
+    entries: the words and phrases of the lexicon, phrases are split into
+    tokens with `separator`
+    """
+
+    def __init__(self, entries: Iterable[str], separator: str = " "):
+        words, phrases = set(), []
+        for entry in entries:
+            tokens = entry.split(separator)
+            if len(tokens) == 1:
+                words.add(entry)
+            else:
+                phrases.append(tokens)
+        self.words = frozenset(words)
+        self.phrases: Optional[PhraseAutomaton] = (
+            PhraseAutomaton(phrases) if phrases else None
+        )
+        self.n_phrases = len(phrases)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.words
+
+    def __len__(self) -> int:
+        return len(self.words) + self.n_phrases
+
+    def count(self, tokens: Sequence[str]) -> int:
+        """number of tokens, and occurrences of phrases, in the lexicon"""
+        words = self.words
+        n_matches = sum(1 for token in tokens if token in words)
+        if self.phrases is not None:
+            n_matches += self.phrases.count(tokens)
+        return n_matches
+
+    def count_batch(
+        self, texts: Iterable[str], lower: bool = False, separator: str = " "
+    ) -> List[int]:
+        """
+        count the matches in each text, split with `separator` after being
+        lowercased if `lower`
+        """
+        return [
+            self.count((text.lower() if lower else text).split(separator))
+            for text in texts
+        ]
+
+
+class LexiconGroup:
+    """Several lexicons matched against the same tokens"""
+
+    def __init__(self, lexicons: Dict[str, Lexicon]):
+        self.names = list(lexicons.keys())
+        self.lexicons = lexicons
+        # the lexicons each word is in, to look tokens up once for all of them
+        index: Dict[str, List[int]] = {}
+        for position, lexicon in enumerate(lexicons.values()):
+            for word in lexicon.words:
+                index.setdefault(word, []).append(position)
+        self.index = {word: tuple(positions) for word, positions in index.items()}
+        self.phrases = [
+            (position, lexicon.phrases)
+            for position, lexicon in enumerate(lexicons.values())
+            if lexicon.phrases is not None
+        ]
+
+    def count(self, tokens: Sequence[str]) -> Dict[str, int]:
+        counts = [0] * len(self.names)
+        index = self.index
+        for token in tokens:
+            positions = index.get(token)
+            if positions is not None:
+                for position in positions:
+                    counts[position] += 1
+        for position, phrases in self.phrases:
+            counts[position] += phrases.count(tokens)
+        return dict(zip(self.names, counts))
+
+    def count_batch(
+        self, texts: Iterable[str], lower: bool = False, separator: str = " "
+    ) -> Dict[str, List[int]]:
+        """the counts of each lexicon, with one value per text"""
+        columns: Dict[str, List[int]] = {name: [] for name in self.names}
+        for text in texts:
+            counts = self.count((text.lower() if lower else text).split(separator))
+            for name, count in counts.items():
+                columns[name].append(count)
+        return columns
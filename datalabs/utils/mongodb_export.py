@@ -0,0 +1,128 @@
+"""Bulk export of the samples of a dataset to a MongoDB collection.
+
+The rows are read from the arrow table of the dataset as record batches of
+`batch_size` rows (for a dataset with an indices mapping, only the rows of a
+batch are taken at a time), each batch is converted to documents at once and
+written with one unordered `insert_many`, i.e. one round trip per batch
+instead of one per sample:
+
+    n_inserted = export_samples(dataset, collection, batch_size=1000)
+
+The batches can be written by several threads (`num_workers`), the driver
+keeping a pool of connections. The batches written are recorded in a
+checkpoint file, so an interrupted export is resumed by running it again
+with the same checkpoint: only the batches that were not acknowledged by the
+server are written (a batch interrupted by a network failure can be written
+twice).
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import pyarrow as pa
+
+from datalabs.utils.checkpoint import Checkpoint
+from datalabs.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def record_batches(
+    table: pa.Table, batch_size: int = 1000
+) -> Iterator[Tuple[int, pa.RecordBatch]]:
+    """the record batches of at most `batch_size` rows of a table, with the
+    offset of their first row"""
+    offset = 0
+    for batch in table.to_batches(max_chunksize=batch_size):
+        if batch.num_rows == 0:
+            continue
+        yield offset, batch
+        offset += batch.num_rows
+
+
+def dataset_batches(
+    dataset, batch_size: int = 1000
+) -> Iterator[Tuple[int, Union[pa.RecordBatch, pa.Table]]]:
+    """the batches of at most `batch_size` rows of a dataset, with the offset
+    of their first row, only the rows of a batch being taken for a dataset
+    with an indices mapping"""
+    from datalabs.operations.aggregate.arrow_compute import get_rows, get_table
+
+    if isinstance(dataset, pa.Table) or getattr(dataset, "_indices", None) is None:
+        yield from record_batches(get_table(dataset), batch_size)
+        return
+    for offset in range(0, dataset.num_rows, batch_size):
+        yield offset, get_rows(dataset, offset, batch_size)
+
+
+def to_documents(batch: Union[pa.RecordBatch, pa.Table]) -> List[Dict[str, Any]]:
+    """the rows of a record batch as documents"""
+    return batch.to_pylist()
+
+
+def _insert_batch(collection, batch: Union[pa.RecordBatch, pa.Table]) -> int:
+    documents = to_documents(batch)
+    collection.insert_many(documents, ordered=False)
+    return len(documents)
+
+
+def export_samples(
+    dataset,
+    collection,
+    batch_size: int = 1000,
+    num_workers: int = 1,
+    checkpoint: Optional[Checkpoint] = None,
+) -> int:
+    """
+    insert the rows of a dataset into a collection, and return the number of
+    documents inserted
+    Parameters:
+      - dataset: a `Dataset` or a `pyarrow.Table`
+      - collection: a pymongo collection, or anything with the same
+      `insert_many`
+      - batch_size: number of documents per `insert_many`
+      - num_workers: number of batches written concurrently
+      - checkpoint: the batches already written, see `Checkpoint`
+    """
+    checkpoint = checkpoint or Checkpoint()
+    batches = (
+        (offset, batch)
+        for offset, batch in dataset_batches(dataset, batch_size)
+        if f"batch-{offset}" not in checkpoint.done
+    )
+
+    n_inserted = 0
+    if num_workers <= 1:
+        for offset, batch in batches:
+            n_inserted += _insert_batch(collection, batch)
+            checkpoint.mark_done(f"batch-{offset}")
+        return n_inserted
+
+    errors = []
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        # at most 2 * num_workers batches are converted and in flight
+        pending = deque()
+
+        def wait_first():
+            offset, future = pending.popleft()
+            try:
+                n_documents = future.result()
+            except Exception as error:
+                errors.append(error)
+                return 0
+            checkpoint.mark_done(f"batch-{offset}")
+            return n_documents
+
+        for offset, batch in batches:
+            pending.append((offset, executor.submit(_insert_batch, collection, batch)))
+            if len(pending) >= 2 * num_workers:
+                n_inserted += wait_first()
+            if errors:
+                break
+        # the batches in flight are recorded even if one of them failed
+        while pending:
+            n_inserted += wait_first()
+    if errors:
+        raise errors[0]
+    return n_inserted
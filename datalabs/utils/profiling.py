@@ -0,0 +1,318 @@
+"""Profiling of the operations applied to datasets.
+
+When profiling is enabled, each call of an operation (on a row, on a batch
+or on a whole dataset for aggregating operations) is timed, and so are the
+stages of `Dataset.apply`:
+
+- "fetch": reading the rows (or the cached tokens) of a batch
+- "call": running an operation on a batch
+- "build": building the generated columns
+- "write": writing the columns to arrow files, or the statistics to disk
+
+so that the operations and the stages a job spends its time in can be told
+apart:
+
+    with profile() as profiler:
+        dataset.apply(get_length, mode="memory", batched=True)
+    profiler.summary()["operations"]["get_length"]  # calls, latency, ...
+    profiler.to_json("profile.json")
+    profiler.to_chrome_trace("trace.json")  # chrome://tracing or Perfetto
+
+Setting `HF_APPLY_PROFILE` to a path profiles the whole process instead: the
+summary is written to that path at exit, and the trace next to it. The calls
+made by the worker processes of `num_proc > 1` are sent back with their
+results. Nothing is recorded when profiling is disabled.
+"""
+
+from array import array
+import atexit
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from datalabs import config
+
+PERCENTILES = (50, 90, 99)
+
+_null_context = contextlib.nullcontext()
+
+
+class CallStats:
+    """the calls of an operation, or the runs of a stage"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.output_size = 0
+        self.total_time = 0.0
+        self.latencies = array("d")
+
+    def add(self, duration: float, rows: int = 0, output_size: int = 0, error=False):
+        self.calls += 1
+        self.errors += int(error)
+        self.rows += rows
+        self.output_size += output_size
+        self.total_time += duration
+        self.latencies.append(duration)
+
+    def merge(self, other: "CallStats"):
+        self.calls += other.calls
+        self.errors += other.errors
+        self.rows += other.rows
+        self.output_size += other.output_size
+        self.total_time += other.total_time
+        self.latencies.extend(other.latencies)
+
+    def summary(self) -> Dict[str, Any]:
+        summary = {
+            "calls": self.calls,
+            "errors": self.errors,
+            "rows": self.rows,
+            "output_size": self.output_size,
+            "total_time": self.total_time,
+            "mean_latency": self.total_time / self.calls if self.calls else 0.0,
+        }
+        latencies = np.frombuffer(self.latencies, dtype=np.float64)
+        for percentile in PERCENTILES:
+            summary[f"p{percentile}_latency"] = (
+                float(np.percentile(latencies, percentile)) if self.calls else 0.0
+            )
+        summary["max_latency"] = float(latencies.max()) if self.calls else 0.0
+        return summary
+
+
+class Profiler:
+    """
+    Parameters
+    max_events: maximum number of events kept for the trace, the statistics
+    are still computed from all the calls beyond it
+    """
+
+    def __init__(self, max_events: int = 1_000_000):
+        self.enabled = False
+        self.max_events = max_events
+        self._lock = threading.Lock()
+        # the operations being called by each thread, a call made by an
+        # operation to itself (e.g. `call_batch` calling `__call__` on each
+        # row) is recorded once
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        self.operations: Dict[str, CallStats] = {}
+        self.stages: Dict[str, CallStats] = {}
+        # (name, category, start, duration, pid, tid) in seconds
+        self.events: List[tuple] = []
+        self.dropped_events = 0
+
+    def _record(
+        self,
+        table: Dict[str, CallStats],
+        category: str,
+        name: str,
+        start: float,
+        duration: float,
+        **kwargs,
+    ):
+        with self._lock:
+            if name not in table:
+                table[name] = CallStats()
+            table[name].add(duration, **kwargs)
+            if len(self.events) < self.max_events:
+                self.events.append(
+                    (
+                        name,
+                        category,
+                        start,
+                        duration,
+                        os.getpid(),
+                        threading.get_ident(),
+                    )
+                )
+            else:
+                self.dropped_events += 1
+
+    def call(self, operation, method: Callable, args, kwargs, batched: bool):
+        """call a method of an operation and record it"""
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        if stack and stack[-1] is operation:
+            return method(operation, *args, **kwargs)
+
+        stack.append(operation)
+        start = time.perf_counter()
+        error = True
+        try:
+            output = method(operation, *args, **kwargs)
+            error = False
+        finally:
+            duration = time.perf_counter() - start
+            stack.pop()
+            rows = (
+                len(args[0]) if batched and args and hasattr(args[0], "__len__") else 1
+            )
+            self._record(
+                self.operations,
+                "operation",
+                operation.name,
+                start,
+                duration,
+                rows=rows,
+                output_size=0 if error else _output_size(output, batched),
+                error=error,
+            )
+        return output
+
+    @contextlib.contextmanager
+    def _stage(self, name: str):
+        start = time.perf_counter()
+        error = True
+        try:
+            yield
+            error = False
+        finally:
+            self._record(
+                self.stages,
+                "stage",
+                name,
+                start,
+                time.perf_counter() - start,
+                error=error,
+            )
+
+    def stage(self, name: str):
+        """a context manager timing a stage of `Dataset.apply`, e.g.
+
+        with profiler.stage("write"):
+            writer.write_batch(batch)
+        """
+        return self._stage(name) if self.enabled else _null_context
+
+    def state(self) -> Optional[Dict[str, Any]]:
+        """the records of this process, to be merged by the process that
+        started it, or None if profiling is disabled"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            state = {
+                "operations": self.operations,
+                "stages": self.stages,
+                "events": self.events,
+                "dropped_events": self.dropped_events,
+            }
+            self.reset()
+        return state
+
+    def merge(self, state: Optional[Dict[str, Any]]):
+        """add the records of another process, see `state`"""
+        if state is None or not self.enabled:
+            return
+        with self._lock:
+            for name in ("operations", "stages"):
+                table = getattr(self, name)
+                for key, stats in state[name].items():
+                    table.setdefault(key, CallStats()).merge(stats)
+            n_events = max(
+                0, min(len(state["events"]), self.max_events - len(self.events))
+            )
+            self.events.extend(state["events"][:n_events])
+            self.dropped_events += (
+                state["dropped_events"] + len(state["events"]) - n_events
+            )
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "operations": {
+                    name: stats.summary() for name, stats in self.operations.items()
+                },
+                "stages": {
+                    name: stats.summary() for name, stats in self.stages.items()
+                },
+                "dropped_events": self.dropped_events,
+            }
+
+    def to_json(self, path: str):
+        with open(path, "w", encoding="utf8") as file:
+            json.dump(self.summary(), file, indent=2)
+
+    def to_chrome_trace(self, path: str):
+        """write the calls and the stages in the Chrome trace event format"""
+        with self._lock:
+            events = [
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": start * 1e6,
+                    "dur": duration * 1e6,
+                    "pid": pid,
+                    "tid": tid,
+                }
+                for name, category, start, duration, pid, tid in self.events
+            ]
+        with open(path, "w", encoding="utf8") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+
+def _output_size(output, batched: bool) -> int:
+    """the number of rows output by a call"""
+    if output is None:
+        return 0
+    if batched and isinstance(output, dict) and output:
+        values = next(iter(output.values()))
+        if hasattr(values, "__len__") and not isinstance(values, (str, dict)):
+            return len(values)
+    return 1
+
+
+profiler = Profiler()
+
+
+def profiled(batched: bool = False):
+    """
+    record the calls of a method of `OperationFunction` (and its subclasses)
+    with the profiler, `batched` if its first argument is a batch of rows
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if not profiler.enabled:
+                return method(self, *args, **kwargs)
+            return profiler.call(self, method, args, kwargs, batched)
+
+        return wrapper
+
+    return decorator
+
+
+@contextlib.contextmanager
+def profile():
+    """profile the operations applied within the context, the records of a
+    previous profile are discarded"""
+    enabled = profiler.enabled
+    profiler.reset()
+    profiler.enabled = True
+    try:
+        yield profiler
+    finally:
+        profiler.enabled = enabled
+
+
+def _write_profile(path: str):
+    profiler.to_json(path)
+    profiler.to_chrome_trace(os.path.splitext(path)[0] + ".trace.json")
+
+
+if config.HF_APPLY_PROFILE:
+    profiler.enabled = True
+    atexit.register(_write_profile, config.HF_APPLY_PROFILE)
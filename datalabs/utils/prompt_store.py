@@ -0,0 +1,195 @@
+"""Local store of the prompts published with the datasets.
+
+Dataset builders add the prompts published next to their script in
+`_info()`, e.g. `prompts.update(Prompts.from_url(_PROMPT_URL))`, which runs
+whenever a builder is instantiated. The prompts fetched are kept on disk so
+that this doesn't go to the network each time:
+
+- the prompts of a url are stored once under the sha256 of their content,
+- an index maps each url to its content, its ETag and the time it was
+  fetched, and the id of each prompt to the content it's in,
+- the prompts of a url are used for `ttl` seconds, then revalidated with a
+  conditional request (`If-None-Match`) that only downloads them again if
+  they changed,
+- in offline mode (`HF_DATASETS_OFFLINE=1`), or if the url can't be
+  reached, the prompts stored are used whatever their age.
+
+    prompts = prompt_store.get(_PROMPT_URL)
+    prompt = prompt_store.get_prompt("395c4d0f15e059abaf2d185a80eecf9c")
+
+The prompts of all the datasets can be fetched beforehand with
+`datalabs-cli prefetch-prompts`.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha256
+import json
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Union
+
+import requests
+
+from datalabs import config
+from datalabs.utils.file_utils import _request_with_retry
+from datalabs.utils.filelock import FileLock
+from datalabs.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+INDEX_FILENAME = "index.json"
+OBJECTS_DIR = "objects"
+
+
+def _write_json(path: str, value: Any):
+    # written to a temporary file first, readers never see a partial file
+    with open(path + ".incomplete", "w", encoding="utf8") as file:
+        json.dump(value, file)
+    os.replace(path + ".incomplete", path)
+
+
+class PromptStore:
+    """
+    Parameters
+    cache_dir: directory of the prompts, default to `config.HF_PROMPTS_CACHE`
+    ttl: seconds the prompts of a url are used before being revalidated,
+    default to `config.HF_PROMPTS_CACHE_TTL`
+    timeout: timeout of the requests in seconds
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Union[str, Path]] = None,
+        ttl: Optional[float] = None,
+        timeout: float = 10.0,
+    ):
+        self._cache_dir = cache_dir
+        self._ttl = ttl
+        self.timeout = timeout
+        # the file lock doesn't exclude the threads of a process
+        self._lock = threading.Lock()
+
+    @property
+    def cache_dir(self) -> str:
+        return str(self._cache_dir or config.HF_PROMPTS_CACHE)
+
+    @property
+    def ttl(self) -> float:
+        return self._ttl if self._ttl is not None else config.HF_PROMPTS_CACHE_TTL
+
+    def _index_path(self) -> str:
+        return os.path.join(self.cache_dir, INDEX_FILENAME)
+
+    def _object_path(self, content_hash: str) -> str:
+        return os.path.join(self.cache_dir, OBJECTS_DIR, content_hash + ".json")
+
+    def _load_index(self) -> Dict[str, Dict]:
+        try:
+            with open(self._index_path(), encoding="utf8") as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"urls": {}, "prompts": {}}
+
+    def _update_index(self, update):
+        """apply `update` to the index, under a lock shared by the processes
+        using the same directory"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with self._lock, FileLock(self._index_path() + ".lock"):
+            index = self._load_index()
+            update(index)
+            _write_json(self._index_path(), index)
+
+    def _read(self, content_hash: str) -> Dict[str, Dict]:
+        with open(self._object_path(content_hash), encoding="utf8") as file:
+            return json.load(file)
+
+    def _store(self, url: str, content: bytes, etag: Optional[str]) -> Dict:
+        prompts = json.loads(content)
+        content_hash = sha256(content).hexdigest()
+        path = self._object_path(content_hash)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _write_json(path, prompts)
+
+        def update(index):
+            index["urls"][url] = {
+                "hash": content_hash,
+                "etag": etag,
+                "fetched_at": time.time(),
+            }
+            for prompt_id in prompts:
+                index["prompts"][prompt_id] = content_hash
+
+        self._update_index(update)
+        return prompts
+
+    def _touch(self, url: str):
+        def update(index):
+            if url in index["urls"]:
+                index["urls"][url]["fetched_at"] = time.time()
+
+        self._update_index(update)
+
+    def get(self, url: str, force: bool = False) -> Dict[str, Dict]:
+        """
+        the prompts published at a url, by id
+        Parameters:
+          - force: revalidate the prompts stored even if they are fresh
+        """
+        entry = self._load_index()["urls"].get(url)
+        if entry is not None and not force:
+            fresh = time.time() - entry["fetched_at"] < self.ttl
+            if fresh or config.HF_DATASETS_OFFLINE:
+                return self._read(entry["hash"])
+        if config.HF_DATASETS_OFFLINE:
+            logger.warning(f"Offline mode is enabled, the prompts of {url} are skipped")
+            return {}
+
+        headers = {}
+        if entry is not None and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        try:
+            response = _request_with_retry(
+                "GET", url, headers=headers, timeout=self.timeout
+            )
+            if response.status_code == 304 and entry is not None:
+                self._touch(url)
+                return self._read(entry["hash"])
+            response.raise_for_status()
+        except requests.exceptions.RequestException as error:
+            if entry is None:
+                raise
+            logger.warning(
+                f"Couldn't revalidate the prompts of {url} ({error}), "
+                f"the prompts stored are used"
+            )
+            return self._read(entry["hash"])
+        return self._store(url, response.content, response.headers.get("ETag"))
+
+    def get_prompt(self, prompt_id: str) -> Optional[Dict[str, Any]]:
+        """a prompt stored by id, or None if no prompts stored have it"""
+        content_hash = self._load_index()["prompts"].get(prompt_id)
+        if content_hash is None:
+            return None
+        return self._read(content_hash).get(prompt_id)
+
+    def prefetch(
+        self, urls: Iterable[str], num_workers: int = 8
+    ) -> Dict[str, Union[int, Exception]]:
+        """revalidate the prompts of several urls, and return the number of
+        prompts of each url (or the error raised fetching them)"""
+
+        def fetch(url):
+            try:
+                return len(self.get(url, force=True))
+            except Exception as error:
+                return error
+
+        urls = list(dict.fromkeys(urls))
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            return dict(zip(urls, executor.map(fetch, urls)))
+
+
+prompt_store = PromptStore()
@@ -0,0 +1,176 @@
+"""Process-wide registry of the (expensive) resources used by operations,
+e.g. spacy pipelines, NLTK corpora, rouge scorers, grammaire grammars, json
+files or compiled lexicons.
+
+Each resource is loaded lazily, once per process, the first time it is
+requested:
+
+    nlp = load_resource("spacy", "en_core_web_sm")
+    spell_errors = load_resource("json", "/path/to/spell_errors.json")
+
+Operations can declare the resources they need so that they are loaded
+before the first sample is processed (e.g. in each worker of a process pool):
+
+    @featurizing(name="get_entities_spacy")
+    @requires_resources(("spacy", "en_core_web_sm"))
+    def get_entities_spacy(text: str):
+        ...
+"""
+
+import json
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from datalabs.utils import logging
+
+logger = logging.get_logger(__name__)
+
+
+class ResourceRegistry:
+    """Registry of resource loaders, and cache of the loaded resources.
+
+    A loader is registered for a kind of resource (e.g. "spacy") and is
+    called with the arguments identifying the resource (e.g. the name of the
+    spacy model). The loaded resources are cached by (kind, arguments), so
+    the arguments must be hashable.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[..., Any]] = {}
+        self._resources: Dict[Tuple, Any] = {}
+        self._lock = threading.RLock()
+
+    def register(self, kind: str, loader: Callable[..., Any]):
+        self._loaders[kind] = loader
+
+    def get(self, kind: str, *args) -> Any:
+        """
+        loads a resource if it's not in memory and returns it
+        Parameter:
+          - kind: the kind of resource, e.g. "spacy", "nltk", "json"
+          - args: the arguments passed to the loader of this kind
+        Returns:
+          - the loaded resource
+        """
+        key = (kind,) + args
+        if key in self._resources:
+            return self._resources[key]
+        if kind not in self._loaders:
+            raise ValueError(
+                f"Unknown resource kind {kind}, the registered kinds are "
+                f"{list(self._loaders.keys())}"
+            )
+        with self._lock:
+            if key not in self._resources:
+                logger.info(f"Loading resource {key}")
+                self._resources[key] = self._loaders[kind](*args)
+        return self._resources[key]
+
+    def is_loaded(self, kind: str, *args) -> bool:
+        return (kind,) + args in self._resources
+
+    def warm(self, resources: Iterable[Tuple]):
+        """Load the resources, given as (kind, *args) tuples, in advance"""
+        for resource in resources:
+            self.get(*resource)
+
+    def clear(self):
+        with self._lock:
+            self._resources = {}
+
+
+# singleton registry to keep one copy of each resource per process
+resource_registry = ResourceRegistry()
+
+
+def register_resource(kind: str):
+    """
+    register a loader for a kind of resource
+    """
+
+    def register_resource_loader(loader):
+        resource_registry.register(kind, loader)
+        return loader
+
+    return register_resource_loader
+
+
+def load_resource(kind: str, *args) -> Any:
+    return resource_registry.get(kind, *args)
+
+
+def requires_resources(*resources: Tuple):
+    """
+    declare the resources, as (kind, *args) tuples, used by the function of
+    an operation. It has to be applied before the operation decorator.
+    """
+
+    def set_required_resources(func):
+        func.required_resources = list(resources)
+        return func
+
+    return set_required_resources
+
+
+def get_required_resources(func: Callable) -> List[Tuple]:
+    return getattr(func, "required_resources", [])
+
+
+@register_resource("spacy")
+def _load_spacy_model(name: str, disable: Tuple[str, ...] = ()):
+    import spacy
+
+    return spacy.load(name, disable=list(disable))
+
+
+@register_resource("nltk")
+def _load_nltk_data(resource_path: str, package: str = None):
+    """Make sure the NLTK data (e.g. "corpora/wordnet") is available,
+    downloading it only if it can't be found"""
+    import nltk
+
+    try:
+        return nltk.data.find(resource_path)
+    except LookupError:
+        nltk.download(package or resource_path.split("/")[-1], quiet=True)
+        return nltk.data.find(resource_path)
+
+
+@register_resource("rouge_scorer")
+def _load_rouge_scorer(rouge_types: Tuple[str, ...], use_stemmer: bool = True):
+    from compare_mt.rouge.rouge_scorer import RougeScorer
+
+    return RougeScorer(list(rouge_types), use_stemmer=use_stemmer)
+
+
+@register_resource("grammaire")
+def _load_grammaire_grammar(path: str):
+    import grammaire
+
+    with open(path, encoding="utf8") as input:
+        return grammaire.compile(input.read())
+
+
+@register_resource("checklist_editor")
+def _load_checklist_editor():
+    from checklist.editor import Editor
+
+    return Editor()
+
+
+@register_resource("json")
+def _load_json(path: str):
+    with open(path, "r", encoding="utf8") as file:
+        return json.loads(file.read())
+
+
+@register_resource("lexicon")
+def _load_lexicon(path: str, *keys: str):
+    """a compiled lexicon of the entries of a json file (e.g. the keys of a
+    dict of spell corrections), `keys` select a nested list or dict of it"""
+    from datalabs.utils.lexicon import Lexicon
+
+    entries = load_resource("json", path)
+    for key in keys:
+        entries = entries[key]
+    return Lexicon(entries)
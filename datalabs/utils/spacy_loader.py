@@ -1,18 +1,20 @@
-from typing import Dict
+from typing import Iterable, Iterator, TYPE_CHECKING
 
-import spacy
-from spacy.language import Language
+from datalabs.utils.resource_registry import load_resource
+
+if TYPE_CHECKING:
+    # spacy is only imported when a model is loaded
+    from spacy.language import Language
+    from spacy.tokens import Doc
 
 
 class SpacyLoader:
     """Loader for spacy models. This should be used in a singleton fashion to
     ensure that we don't load the same spacy model multiple times. It also
     encapsulates `spacy.load()` so we don't load big spacy models unless it's
-    necessary."""
-
-    _models: Dict[str, Language] = {}
+    necessary. The models are kept in the process-wide resource registry."""
 
-    def get_model(self, name: str) -> Language:
+    def get_model(self, name: str) -> "Language":
         """
         loads a spacy model if it's not in memory and returns it
         Parameter:
@@ -21,9 +23,35 @@ class SpacyLoader:
         Returns:
           - a spacy `Language` object
         """
-        if name not in self._models:
-            self._models[name] = spacy.load(name)
-        return self._models[name]
+        return load_resource("spacy", name)
+
+    def pipe(
+        self,
+        texts: Iterable[str],
+        name: str,
+        disable: Iterable[str] = (),
+        batch_size: int = 256,
+        n_process: int = 1,
+    ) -> Iterator["Doc"]:
+        """
+        processes texts in batches with `nlp.pipe()`
+        Parameter:
+          - texts: the texts to process, e.g. a column of a dataset
+          - name: name of the model, e.g. en_core_web_sm
+          - disable: names of the pipeline components that are not needed,
+          e.g. ("parser", "ner") when only pos tags are used
+          - batch_size: number of texts buffered by spacy
+          - n_process: number of processes used by spacy
+        Returns:
+          - an iterator of spacy `Doc` objects, in the order of `texts`
+        """
+        nlp = self.get_model(name)
+        return nlp.pipe(
+            texts,
+            batch_size=batch_size,
+            n_process=n_process,
+            disable=list(disable),
+        )
 
 
 # singleton spacy loader to keep one copy of each model in memory
@@ -0,0 +1,107 @@
+"""Cache of the tokens of the text fields of datasets.
+
+Most operations split the texts of a dataset into tokens, again and again.
+The tokens of a field are computed once instead, as an arrow `list<string>`
+column written to the apply cache (see `datalabs.utils.apply_cache`) under
+a key made of the fingerprint of the dataset, the field and the tokenizer,
+and kept memory-mapped:
+
+    tokens = token_cache.get(dataset, "text")  # SingleSpaceTokenizer
+    lengths = pc.list_value_length(tokens)
+
+Operations can request the tokens instead of the texts, see
+`OperationFunction.tokens` for featurizing operations, and
+`get_average_length` for an arrow-native aggregating operation.
+"""
+
+import os
+from typing import Dict, Optional, Union
+
+import pyarrow as pa
+
+from datalabs.arrow_writer import ArrowWriter
+from datalabs.fingerprint import Hasher, is_caching_enabled
+from datalabs.table import MemoryMappedTable
+from datalabs.utils.apply_cache import apply_cache, ApplyCache, COLUMNS_EXTENSION
+from datalabs.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_TOKENIZER = "SingleSpaceTokenizer"
+
+
+class TokenCache:
+    """
+    Parameters
+    cache: the cache the tokens are written to, they are evicted with the
+    other cached results
+    """
+
+    def __init__(self, cache: ApplyCache = apply_cache):
+        self.cache = cache
+        # the memory-mapped columns already loaded by this process
+        self._columns: Dict[str, pa.ChunkedArray] = {}
+
+    @staticmethod
+    def _get_tokenizer(tokenizer):
+        from datalabs.operations.tokenizer import get_tokenizer
+
+        if hasattr(tokenizer, "tokenize_column"):
+            return tokenizer
+        return get_tokenizer(tokenizer or DEFAULT_TOKENIZER)
+
+    def key(self, dataset, field: str, tokenizer=None) -> Optional[str]:
+        """the key of the tokens of a field, or None if they can't be cached"""
+        if not is_caching_enabled() or dataset._fingerprint is None:
+            return None
+        tokenizer = self._get_tokenizer(tokenizer)
+        hasher = Hasher()
+        hasher.update(dataset._fingerprint)
+        hasher.update("tokens")
+        hasher.update(field)
+        hasher.update(tokenizer.name)
+        hasher.update(type(tokenizer).__qualname__)
+        return hasher.hexdigest()
+
+    def get(
+        self, dataset, field: str = "text", tokenizer: Union[str, None] = None
+    ) -> pa.ChunkedArray:
+        """
+        the tokens of a field of a dataset, one list per row (the indices
+        mapping of the dataset is taken into account)
+        Parameters:
+          - tokenizer: the name of the tokenizer (see
+          `datalabs.operations.tokenizer.get_tokenizer`), or a tokenizer,
+          `SingleSpaceTokenizer` by default
+        """
+        from datalabs.operations.aggregate.arrow_compute import get_table
+
+        tokenizer = self._get_tokenizer(tokenizer)
+        key = self.key(dataset, field, tokenizer)
+        if key is not None and key in self._columns:
+            return self._columns[key]
+
+        path = None if key is None else self.cache._path(key, COLUMNS_EXTENSION)
+        if path is None or not self.cache._hit(path):
+            texts = get_table(dataset, [field]).column(field)
+            tokens = tokenizer.tokenize_column(texts)
+            if path is None:
+                return tokens
+            logger.info(f"Caching the tokens of {field} at {path}")
+            os.makedirs(self.cache.cache_dir, exist_ok=True)
+            with ArrowWriter(path=path + ".incomplete", with_metadata=False) as writer:
+                writer.write_table(pa.table({field: tokens}))
+                writer.finalize()
+            os.replace(path + ".incomplete", path)
+            self.cache.evict(keep=path)
+
+        column = MemoryMappedTable.from_file(path).table.column(field)
+        self._columns[key] = column
+        return column
+
+    def clear(self):
+        """forget the columns loaded by this process"""
+        self._columns.clear()
+
+
+token_cache = TokenCache()